@@ -0,0 +1,33 @@
+import asyncio
+import time
+
+from krystalium.component import MainLoop
+
+
+class Loop(MainLoop):
+    def __init__(self) -> None:
+        super().__init__(update_rate = 1, interval = 10)
+        self.updates = []
+
+    async def update(self, elapsed: float) -> None:
+        self.updates.append(time.perf_counter())
+
+
+def test_wake_runs_update_immediately():
+    async def run():
+        loop = Loop()
+        task = asyncio.create_task(loop.run_loop())
+        await asyncio.sleep(0.05)
+
+        start = time.perf_counter()
+        loop.wake()
+        await asyncio.sleep(0.05)
+
+        loop.stop_loop()
+        loop.wake()
+        await task
+
+        assert len(loop.updates) >= 1
+        assert loop.updates[0] - start < 0.05
+
+    asyncio.run(run())
@@ -0,0 +1,31 @@
+import pytest
+
+import krystalium.effect_table as et
+from krystalium.types import ParameterModifier
+
+
+def test_get_modifiers():
+    modifiers = et.get_modifiers("Increasing", "Energy")
+    assert modifiers == [ParameterModifier("base_movement_speed", 2.0, "mul")]
+
+    assert et.get_modifiers("increasing", "ENERGY") is modifiers
+    assert et.get_modifiers(et.Action.Increasing, et.Target.Energy) is modifiers
+
+    assert et.get_modifiers("None", "None") == []
+    assert et.get_modifiers("Increasing", "Unknown") is None
+    assert et.get_modifiers("Unknown", "Energy") is None
+
+
+def test_index_matches_table():
+    for action, targets in et.effect_table.items():
+        for target, modifiers in targets.items():
+            assert et.get_modifiers(action, target) is modifiers
+
+
+@pytest.mark.parametrize("table", [
+    {"Increasing": {}, "increasing": {}},
+    {"Increasing": {"Energy": [], "ENERGY": []}},
+])
+def test_compile_table_ambiguous(table):
+    with pytest.raises(ValueError):
+        et.compile_table(table)
@@ -0,0 +1,257 @@
+import asyncio
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import krystalium.effect_table as et
+import krystalium.effects as effects
+import krystalium.unreal as unreal
+from krystalium.types import Color, ParameterModifier
+
+
+TablePath = Path(__file__).parent.parent / "effect_table.csv"
+
+
+@pytest.mark.parametrize("value, expected", [
+    (0.5, (0.5, "add")),
+    ("-0.5", (-0.5, "add")),
+    ("*2.0", (2.0, "mul")),
+    ("=1.0", (1.0, "set")),
+    ("==0.2", (0.2, "set_unscaled")),
+    ("+Color(0.25, -0.5, -0.5)", (Color(0.25, -0.5, -0.5), "add")),
+    ("=Color(1, 2, 3, 4)", (Color(1.0, 2.0, 3.0, 4.0), "set")),
+])
+def test_parse_value(value, expected):
+    assert effects.parse_value(value) == expected
+
+
+@pytest.mark.parametrize("value", ["*abc", "Color(1, 2)", True, None, "+Color(a, b, c)"])
+def test_parse_value_invalid(value):
+    with pytest.raises(ValueError):
+        effects.parse_value(value)
+
+
+def test_parse_rows_reports_all_errors():
+    rows = [
+        ["Action", "Energy", "Flesh"],
+        ["Increasing", "{broken", '{"rbc_scale": "*x"}'],
+        ["Increasing", "", ""],
+    ]
+
+    with pytest.raises(ValueError) as e:
+        effects.parse_rows(rows)
+
+    message = str(e.value)
+    assert "Increasing/Energy" in message
+    assert "Increasing/Flesh" in message
+    assert "Duplicate action" in message
+
+
+def test_csv_matches_builtin_table():
+    assert effects.read_csv(TablePath) == et.effect_table
+
+
+def test_compile_rejects_unknown_parameter():
+    table = {"Increasing": {"Energy": [ParameterModifier("unknown", 1.0)]}}
+    with pytest.raises(ValueError):
+        effects.EffectTable.compile(table, unreal.ParameterSlots)
+
+
+def test_watcher_reload(tmp_path):
+    path = tmp_path / "effects.csv"
+    path.write_text('Action,Energy\nIncreasing,{"rbc_scale": "*2.0"}\n')
+
+    loaded = []
+    watcher = effects.EffectTableWatcher(effects.Config(path = path), slots = unreal.ParameterSlots, fields = unreal.ParameterFields, callback = loaded.append)
+
+    async def reload():
+        await watcher.update(1.0)
+        assert watcher.reloading
+        while watcher.reloading:
+            await asyncio.sleep(0.01)
+
+    async def run():
+        await watcher.start()
+        assert len(loaded) == 1
+        assert loaded[0].index[("increasing", "energy")] == [ParameterModifier("rbc_scale", 2.0, "mul")]
+
+        path.write_text('Action,Energy\nIncreasing,{"unknown": "*2.0"}\n')
+        await reload()
+        assert len(loaded) == 1
+        assert watcher.stats()["rejected"] == 1
+
+        # A value of the wrong type for the parameter is rejected as well.
+        path.write_text('Action,Energy\nIncreasing,{"base_spawn_rate": "+Color(1, 1, 1)"}\n')
+        await reload()
+        assert len(loaded) == 1
+        assert watcher.stats()["rejected"] == 2
+
+        path.write_text('Action,Energy\nIncreasing,{"rbc_scale": "*3.0"}\n')
+        await reload()
+        assert len(loaded) == 2
+
+        await watcher.stop()
+
+    asyncio.run(run())
+
+
+def test_watcher_rejects_corrupt_binary(tmp_path, monkeypatch):
+    path = tmp_path / "effect_table.bin"
+    path.write_bytes(b"KEFT" + bytes(40))
+
+    loaded = []
+    watcher = effects.EffectTableWatcher(effects.Config(path = path), slots = unreal.ParameterSlots, callback = loaded.append)
+
+    async def run():
+        # The station starts without a table from the file.
+        await watcher.start()
+        assert loaded == []
+        assert watcher.stats()["rejected"] == 1
+
+        effects.write_binary(et.effect_table, path)
+        assert await watcher.reload()
+        assert len(loaded) == 1
+
+        # Unexpected errors are rejected as well.
+        def broken(*args, **kwargs):
+            raise TypeError("Broken")
+
+        monkeypatch.setattr(effects, "load", broken)
+        assert not await watcher.reload()
+        assert len(loaded) == 1
+        assert watcher.stats()["rejected"] == 2
+
+    asyncio.run(run())
+
+
+def test_load_checks_fields(tmp_path):
+    table = {"Increasing": {"Energy": [ParameterModifier("base_spawn_rate", Color(1, 1, 1), "add")]}}
+    path = tmp_path / "effect_table.bin"
+    effects.write_binary(table, path)
+
+    assert effects.load(path, unreal.ParameterSlots).index[("increasing", "energy")] == table["Increasing"]["Energy"]
+    with pytest.raises(ValueError):
+        effects.load(path, unreal.ParameterSlots, unreal.ParameterFields)
+
+
+def test_parse_rows_checks_fields():
+    fields = {"rbc_scale": float, "rbc_tint": Color}
+    rows = [
+        ["Action", "Energy", "Flesh", "Gas"],
+        ["Increasing", '{"unknown": 1.0}', '{"rbc_scale": "+Color(1, 1, 1)"}', '{"rbc_tint": "=1.0"}'],
+        ["Decreasing", '{"rbc_scale": "*2.0"}', '{"rbc_tint": "*0.5"}', '{"rbc_tint": "+Color(1, 0, 0)"}'],
+    ]
+
+    with pytest.raises(ValueError) as e:
+        effects.parse_rows(rows, fields)
+
+    assert len(str(e.value).splitlines()) == 3
+
+    table = effects.parse_rows(rows[:1] + rows[2:], fields)
+    assert table["Decreasing"]["Flesh"] == [ParameterModifier("rbc_tint", 0.5, "mul")]
+
+
+def test_binary_roundtrip(tmp_path):
+    path = tmp_path / "effect_table.bin"
+    digest = bytes(range(32))
+
+    effects.write_binary(et.effect_table, path, digest)
+
+    assert effects.read_binary_header(path.read_bytes()) == (effects.BinaryVersion, digest)
+    assert effects.read(path) == et.effect_table
+    assert effects.load(path, unreal.ParameterSlots).index == et.effect_index
+
+
+def test_binary_corrupt(tmp_path):
+    path = tmp_path / "effect_table.bin"
+    effects.write_binary(et.effect_table, path)
+
+    with pytest.raises(ValueError):
+        effects.parse_binary(path.read_bytes()[:100])
+
+    with pytest.raises(ValueError):
+        effects.parse_binary(b"XXXX" + path.read_bytes()[4:])
+
+    # A modifier with an invalid value kind.
+    effects.write_binary({"Increasing": {"Energy": [ParameterModifier("rbc_scale", 2.0, "mul")]}}, path)
+    data = bytearray(path.read_bytes())
+    data[-9] = 2
+    with pytest.raises(ValueError):
+        effects.parse_binary(bytes(data))
+
+
+def test_compact_table_matches_builtin_table():
+    compact = effects.CompactTable.from_table(et.effect_table)
+
+    assert len(compact) == sum(len(modifiers) for modifiers in et.effect_index.values())
+    for (action, target), modifiers in et.effect_index.items():
+        assert compact.get(action, target) == modifiers
+
+    programs = compact.compile(unreal.ParameterSlots)
+    assert programs == unreal.effect_programs()
+
+
+def test_load_compact(tmp_path):
+    path = tmp_path / "effect_table.bin"
+    effects.write_binary(et.effect_table, path)
+
+    table = effects.load(path, unreal.ParameterSlots, unreal.ParameterFields, compact = True)
+    assert table.index is None
+    assert table.programs == unreal.effect_programs()
+
+    effects.write_binary({"Increasing": {"Energy": [ParameterModifier("base_spawn_rate", Color(1, 1, 1), "add")]}}, path)
+    with pytest.raises(ValueError):
+        effects.load(path, unreal.ParameterSlots, unreal.ParameterFields, compact = True)
+
+    effects.write_binary({"Increasing": {"Energy": []}, "increasing": {"energy": []}}, path)
+    with pytest.raises(ValueError):
+        effects.load(path, unreal.ParameterSlots, compact = True)
+
+    with pytest.raises(ValueError):
+        effects.parse_compact(path.read_bytes()[:-3])
+
+    effects.write_binary({"Increasing": {"Energy": [ParameterModifier("rbc_scale", 2.0, "mul")]}}, path)
+    data = bytearray(path.read_bytes())
+    data[-9] = 5
+    with pytest.raises(ValueError):
+        effects.parse_compact(bytes(data))
+
+
+def test_modifier_names_are_interned():
+    modifier = ParameterModifier("".join(["rbc", "_scale"]), 1.0, "".join(["m", "ul"]))
+    assert modifier.parameter is sys.intern("rbc_scale")
+    assert modifier.operation is sys.intern("mul")
+
+
+def test_csv2dict_regenerates_stale_table(tmp_path):
+    # A built-in table that refers to a parameter that no longer exists must not stop the
+    # compiler from replacing it.
+    root = Path(__file__).parent.parent
+    shutil.copytree(root / "krystalium", tmp_path / "krystalium", ignore = shutil.ignore_patterns("__pycache__"))
+    shutil.copy(root / "csv2dict.py", tmp_path)
+    data = tmp_path / "krystalium" / "effect_data.py"
+    data.write_text(data.read_text().replace("'base_movement_speed'", "'renamed_movement_speed'"))
+
+    assert "renamed_movement_speed" in data.read_text()
+
+    subprocess.run([sys.executable, "csv2dict.py", str(TablePath), "--no-binary", "--force"], cwd = tmp_path, check = True, capture_output = True)
+    assert data.read_text() == (root / "krystalium" / "effect_data.py").read_text()
+
+
+def test_csv2dict_escapes_names(tmp_path):
+    source = tmp_path / "effects.csv"
+    output = tmp_path / "effect_data.py"
+    source.write_text('Action,"Energy\\"\nIncreasing,{"rbc_scale": "*2.0"}\n')
+
+    subprocess.run([sys.executable, "csv2dict.py", str(source), "--python", str(output), "--no-binary"], cwd = TablePath.parent, check = True, capture_output = True)
+    namespace = {}
+    exec(output.read_text().replace("from .types", "from krystalium.types"), namespace)
+    assert namespace["effect_table"]["Increasing"] == {'"Energy\\"': [ParameterModifier("rbc_scale", 2.0, "mul")]}
+
+    source.write_text("Action,Energy\nIncreasing,\0\n")
+    result = subprocess.run([sys.executable, "csv2dict.py", str(source), "--python", str(output), "--no-binary"], cwd = TablePath.parent, capture_output = True, text = True)
+    assert result.returncode == 1
+    assert "Invalid effect table" in result.stderr
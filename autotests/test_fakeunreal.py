@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+import aiohttp
+
+from fakeunreal import Config, FakeUnreal
+from virtual_serial import free_port
+
+
+def call(function_name, variable = None):
+    body = {"objectPath": "/Path", "functionName": function_name}
+    if variable is not None:
+        body["parameters"] = {"InVariableName": variable, "InValue": 1.0}
+    return body
+
+
+def test_calls_are_recorded():
+    async def run():
+        port = free_port()
+        server = FakeUnreal()
+        await server.start("localhost", port)
+
+        try:
+            async with aiohttp.ClientSession(f"http://localhost:{port}") as session:
+                async with session.get("/remote/info") as response:
+                    assert response.ok
+
+                async with session.put("/remote/object/call", json = call("Reset")) as response:
+                    assert response.ok
+
+                batch = {"Requests": [
+                    {"RequestId": 1, "URL": "/remote/object/call", "Verb": "PUT", "Body": call("SetFloatParameter", "Base Movement")},
+                    {"RequestId": 2, "URL": "/remote/object/call", "Verb": "PUT", "Body": call("Message")},
+                ]}
+                async with session.put("/remote/batch", json = batch) as response:
+                    data = await response.json()
+                    assert [entry["RequestId"] for entry in data["Responses"]] == [1, 2]
+                    assert [entry["ResponseCode"] for entry in data["Responses"]] == [200, 200]
+
+                async with session.get("/stub/calls") as response:
+                    calls = await response.json()
+
+            assert [entry["function_name"] for entry in calls] == ["Reset", "SetFloatParameter", "Message"]
+            assert calls[1]["variable"] == "Base Movement"
+            assert [record.function_name for record in server.records] == ["Reset", "SetFloatParameter", "Message"]
+
+            server.clear()
+            assert server.records == []
+        finally:
+            await server.stop()
+
+        assert not server.running
+
+    asyncio.run(run())
+
+
+def test_injected_latency_and_errors():
+    async def run():
+        port = free_port()
+        server = FakeUnreal(Config(latency = 0.05, error_rate = 1.0, seed = 1))
+        await server.start("localhost", port)
+
+        try:
+            async with aiohttp.ClientSession(f"http://localhost:{port}") as session:
+                start = time.perf_counter()
+                async with session.put("/remote/object/call", json = call("Reset")) as response:
+                    assert response.status == 500
+                assert time.perf_counter() - start >= 0.05
+
+                batch = {"Requests": [{"RequestId": 1, "URL": "/remote/object/call", "Verb": "PUT", "Body": call("Reset")}]}
+                async with session.put("/remote/batch", json = batch) as response:
+                    data = await response.json()
+                    assert data["Responses"][0]["ResponseCode"] == 500
+
+            assert [record.status for record in server.records] == [500, 500]
+
+            # Failures can be turned off while running.
+            server.config.error_rate = 0.0
+            server.config.latency = 0.0
+            async with aiohttp.ClientSession(f"http://localhost:{port}") as session:
+                async with session.put("/remote/object/call", json = call("Reset")) as response:
+                    assert response.ok
+        finally:
+            await server.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,136 @@
+import asyncio
+
+from aiohttp import web
+
+import krystalium
+import main
+from fakeunreal import FakeUnreal
+from virtual_serial import VirtualSerial, free_port, wait_for
+
+
+class Station:
+    """
+    Runs main.Main against a fake Unreal, a backend that only answers when told to and a virtual
+    rotary dial.
+    """
+
+    def __init__(self, tmp_path, lookup_timeout: float = 10.0) -> None:
+        self.tmp_path = tmp_path
+        self.lookup_timeout = lookup_timeout
+        self.requests = 0
+        self.answer = asyncio.Event()
+        self.enlisted: dict | None = None
+
+    async def __slow(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await self.answer.wait()
+        if self.enlisted is None:
+            return web.Response(status = 404)
+        return web.json_response(self.enlisted)
+
+    async def __aenter__(self) -> "Station":
+        self.unreal = FakeUnreal()
+        unreal_port = free_port()
+        await self.unreal.start("localhost", unreal_port)
+
+        application = web.Application()
+        application.router.add_route("*", "/{path:.*}", self.__slow)
+        self.backend = web.AppRunner(application)
+        await self.backend.setup()
+        api_port = free_port()
+        await web.TCPSite(self.backend, "localhost", api_port).start()
+
+        root = self.tmp_path / "dev"
+        root.mkdir()
+        self.dial = VirtualSerial("rotary")
+        (root / "ttyFAKE0").symlink_to(self.dial.path)
+
+        config = main.Config(
+            lookup_timeout = self.lookup_timeout,
+            api = krystalium.api.Config(url = f"http://localhost:{api_port}/"),
+            unreal = krystalium.unreal.Config(port = unreal_port),
+            serial = krystalium.serialcontroller.Config(root_path = root, patterns = ["ttyFAKE*"], by_id_path = None),
+            rfid = krystalium.rfid.Config(lookup = False),
+        )
+        self.station = main.Main(config)
+        self.task = asyncio.create_task(self.station.run_loop())
+        await asyncio.to_thread(self.dial.answer_name)
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.answer.set()
+        self.station.stop_loop()
+        self.station.wake()
+        await self.task
+        self.dial.close()
+        await self.backend.cleanup()
+        await self.unreal.stop()
+
+    def enter(self, digits: str) -> None:
+        for digit in digits:
+            self.dial.write(digit)
+
+    def messages(self) -> list[str]:
+        return [record.body["parameters"]["Message"] for record in self.unreal.records if record.function_name == "Message"]
+
+
+def test_lookup_can_be_reset(tmp_path):
+    async def run():
+        async with Station(tmp_path) as station:
+            station.enter("12345")
+            await wait_for(lambda: station.station.state == main.Main.State.EnlistedLookup and station.requests == 1)
+            await wait_for(lambda: any(message.startswith("Looking Up") for message in station.messages()))
+
+            # The backend does not answer, but the station still handles input.
+            station.enter("000")
+            await wait_for(lambda: station.station.state == main.Main.State.Input)
+
+            # The answer to the cancelled lookup is ignored.
+            station.answer.set()
+            await asyncio.sleep(0.2)
+            assert station.station.state == main.Main.State.Input
+
+    asyncio.run(run())
+
+
+def test_lookup_times_out(tmp_path):
+    async def run():
+        async with Station(tmp_path, lookup_timeout = 0.2) as station:
+            station.enter("12345")
+            await wait_for(lambda: station.station.state == main.Main.State.EnlistedLookup)
+            await wait_for(lambda: station.station.state == main.Main.State.InputLocked)
+            await wait_for(lambda: station.station.state == main.Main.State.Input)
+
+    asyncio.run(run())
+
+
+def test_lookup_succeeds(tmp_path):
+    async def run():
+        async with Station(tmp_path) as station:
+            station.enlisted = {
+                "data": [{
+                    "id": "1",
+                    "type": "enlisted",
+                    "attributes": {"name": "Test", "number": "12345"},
+                    "relationships": {"effects": {"data": []}},
+                }],
+                "included": [],
+            }
+
+            station.enter("12345")
+            await wait_for(lambda: any(message.startswith("Looking Up") for message in station.messages()))
+
+            # Digits entered while waiting are dropped.
+            station.enter("7")
+            await asyncio.sleep(0.1)
+            station.answer.set()
+            await wait_for(lambda: station.station.state == main.Main.State.Enlisted)
+            await wait_for(lambda: station.messages()[-1] == "Enter Code:")
+
+            station.enter("00")
+            await asyncio.sleep(0.2)
+            assert station.station.state == main.Main.State.Enlisted
+            station.enter("0")
+            await wait_for(lambda: station.station.state == main.Main.State.Input)
+
+    asyncio.run(run())
@@ -0,0 +1,101 @@
+import random
+
+import pytest
+
+import krystalium.effect_table as et
+import krystalium.modifiers as md
+import krystalium.unreal as unreal
+from krystalium.types import Color, ParameterModifier
+
+
+def reference_apply(values, modifiers, strength):
+    # The original, interpreted implementation of applying modifiers.
+    for modifier in modifiers:
+        slot = unreal.ParameterSlots[modifier.parameter]
+        current_value = values[slot]
+        modifier_strength = 0.05 + ((strength - 2) / 10) * 0.95
+
+        if modifier.operation == "add":
+            values[slot] = current_value + modifier.value * modifier_strength
+        elif modifier.operation == "mul":
+            values[slot] = current_value * (modifier.value * (1.0 + modifier_strength / 2))
+        elif modifier.operation == "set":
+            values[slot] = modifier.value * modifier_strength
+        elif modifier.operation == "set_unscaled":
+            values[slot] = modifier.value
+
+
+@pytest.mark.parametrize("strength", [0, 2, 7, 12, 15])
+def test_programs_match_reference(strength):
+    for key, modifiers in et.effect_index.items():
+        expected = list(unreal.DefaultValues)
+        reference_apply(expected, modifiers, strength)
+
+        values = list(unreal.DefaultValues)
+        unreal.effect_programs()[key].apply(values, strength)
+
+        assert values == expected, key
+
+
+def test_strength_table():
+    assert md.StrengthTable[2] == pytest.approx(0.05)
+    assert md.StrengthTable[12] == pytest.approx(1.0)
+    assert md.scale(22) == pytest.approx(md.strength_scale(22))
+
+
+def test_compile_errors():
+    slots = {"scale": 0, "tint": 1}
+
+    program = md.compile_modifiers([ParameterModifier("tint", Color(1.0, 0.0, 0.0), "set_unscaled")], slots)
+    values = [1.0, Color(0.0, 0.0, 0.0)]
+    program.apply(values, 12)
+    assert values[1] == Color(1.0, 0.0, 0.0)
+
+    with pytest.raises(ValueError):
+        md.compile_modifiers([ParameterModifier("unknown", 1.0, "add")], slots)
+
+    with pytest.raises(ValueError):
+        md.compile_modifiers([ParameterModifier("scale", 1.0, "pow")], slots)
+
+    with pytest.raises(ValueError, match = "broken"):
+        md.compile_table({"broken": [ParameterModifier("unknown", 1.0)]}, slots)
+
+
+def assert_values_equal(actual, expected):
+    for first, second in zip(actual, expected):
+        if isinstance(second, Color):
+            assert (first.r, first.g, first.b) == pytest.approx((second.r, second.g, second.b))
+            if second.a is None:
+                assert first.a is None
+            else:
+                assert first.a == pytest.approx(second.a)
+        else:
+            assert first == pytest.approx(second)
+
+
+def test_fold_matches_sequential():
+    rng = random.Random(1234)
+    programs = list(unreal.effect_programs().values())
+
+    for _ in range(500):
+        steps = [(rng.choice(programs), rng.randint(2, 12)) for _ in range(rng.randint(1, 20))]
+
+        expected = list(unreal.DefaultValues)
+        for program, strength in steps:
+            program.apply(expected, strength)
+
+        values = list(unreal.DefaultValues)
+        md.apply_transforms(values, md.fold(steps))
+
+        assert_values_equal(values, expected)
+
+
+def test_transform_compose():
+    add = md.Transform(offset = 2.0)
+    mul = md.Transform(scale = 3.0)
+    overwrite = md.Transform(offset = 5.0, overwrite = True)
+
+    assert add.then(mul).apply(1.0) == (1.0 + 2.0) * 3.0
+    assert mul.then(add).apply(1.0) == 1.0 * 3.0 + 2.0
+    assert add.then(overwrite).apply(1.0) == 5.0
+    assert overwrite.then(mul).then(add).apply(1.0) == 5.0 * 3.0 + 2.0
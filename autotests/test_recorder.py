@@ -0,0 +1,47 @@
+import asyncio
+
+from krystalium.recorder import Recorder, read_log
+from krystalium.serialcontroller import Config, SerialController
+from virtual_serial import VirtualSerial, wait_for
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "device.log"
+    recorder = Recorder(path, "/dev/ttyUSB0")
+    recorder.record(b"name: rotary")
+    recorder.record(memoryview(b"1"))
+    recorder.record(b"multi\nline")
+    recorder.close()
+
+    entries = list(read_log(path))
+    assert [line for _, line in entries] == [b"name: rotary", b"1", b"multi line"]
+    assert [timestamp for timestamp, _ in entries] == sorted(timestamp for timestamp, _ in entries)
+
+
+def test_controller_records_devices(tmp_path):
+    async def run():
+        root = tmp_path / "dev"
+        root.mkdir()
+        record_path = tmp_path / "recordings"
+
+        terminal = VirtualSerial("rotary")
+        (root / "ttyFAKE0").symlink_to(terminal.path)
+
+        controller = SerialController(config = Config(root_path = root, patterns = ["ttyFAKE*"], by_id_path = None, record_path = record_path))
+        await controller.start()
+        try:
+            await controller.maybe_update()
+            terminal.answer_name()
+            terminal.write("4")
+            terminal.write("2")
+            await wait_for(lambda: controller.devices and controller.devices[0].stats()["lines"] == 2)
+        finally:
+            await controller.stop()
+            terminal.close()
+
+        logs = list(record_path.iterdir())
+        assert len(logs) == 1
+        assert logs[0].name.startswith("ttyFAKE0-")
+        assert [line for _, line in read_log(logs[0])] == [b"name: rotary", b"4", b"2"]
+
+    asyncio.run(run())
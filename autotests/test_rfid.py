@@ -0,0 +1,314 @@
+import asyncio
+import random
+from pathlib import Path
+
+import pytest
+
+import krystalium.rfid as rfid
+from krystalium.api import BloodSample, Effect
+from krystalium.serialcontroller import Serial
+from virtual_serial import VirtualSerial, wait_for
+
+
+BloodLine = "tag found: {} blood increasing energy x x x pristine"
+RefinedLine = "tag found: {} refined decreasing flesh increasing energy x perfect"
+
+
+class Device:
+    def __init__(self, path: str, device_name: str) -> None:
+        self.path = Path(path)
+        self.stable_path = self.path
+        self.device_name = device_name
+        self.name = f"Serial@{path}"
+        self.callback = None
+
+    def set_callback(self, callback) -> None:
+        self.callback = callback
+
+
+def test_readers_do_not_share_tag_state():
+    reader = rfid.Rfid()
+    first = Device("/dev/ttyUSB0", "rfid")
+    second = Device("/dev/ttyUSB1", "rfid")
+    reader.add_device(first)
+    reader.add_device(second)
+
+    first.callback(BloodLine.format("aaaa"))
+    second.callback(RefinedLine.format("bbbb"))
+
+    assert reader.blood_sample.rfid_id == "aaaa"
+    assert reader.refined_sample.rfid_id == "bbbb"
+
+    second.callback("tag lost: bbbb")
+
+    assert reader.blood_sample.rfid_id == "aaaa"
+    assert reader.refined_sample is None
+    assert reader.reader(first).rfid_id == "aaaa"
+    assert reader.reader(second).rfid_id == ""
+
+
+def test_roles():
+    config = rfid.Config(roles = {"rfid-blood": rfid.Role.Blood, "/dev/ttyUSB1": rfid.Role.Krystal})
+    reader = rfid.Rfid(config)
+    blood = Device("/dev/ttyUSB0", "rfid-blood")
+    krystal = Device("/dev/ttyUSB1", "rfid")
+    reader.add_device(blood)
+    reader.add_device(krystal)
+
+    assert reader.reader(blood).role == rfid.Role.Blood
+    assert reader.reader(krystal).role == rfid.Role.Krystal
+
+    blood.callback(RefinedLine.format("aaaa"))
+    krystal.callback(BloodLine.format("bbbb"))
+
+    assert reader.blood_sample is None
+    assert reader.refined_sample is None
+
+    blood.callback(BloodLine.format("cccc"))
+    krystal.callback(RefinedLine.format("dddd"))
+
+    assert reader.blood_sample.rfid_id == "cccc"
+    assert reader.refined_sample.rfid_id == "dddd"
+
+
+def test_remove_device():
+    reader = rfid.Rfid()
+    device = Device("/dev/ttyUSB0", "rfid")
+    reader.add_device(device)
+    device.callback(BloodLine.format("aaaa"))
+
+    reader.remove_device(device)
+
+    assert device.callback is None
+    assert reader.blood_sample is None
+    assert reader.readers == []
+
+
+def test_repeated_reports_are_skipped():
+    reader = rfid.Rfid()
+    device = Device("/dev/ttyUSB0", "rfid")
+    reader.add_device(device)
+    changed = []
+    reader.set_changed_callback(changed.append)
+
+    device.callback(BloodLine.format("aaaa"))
+    sample = reader.blood_sample
+    for _ in range(10):
+        device.callback("traits: aaaa blood increasing energy x x x pristine")
+
+    assert reader.blood_sample is sample
+    assert reader.stats()["duplicates"] == 10
+    assert changed == [reader.reader(device)]
+
+    device.callback("traits: aaaa blood increasing energy x x x perfect")
+    assert reader.blood_sample.strength == 12
+    assert len(changed) == 2
+
+    device.callback("tag lost: aaaa")
+    device.callback(BloodLine.format("aaaa"))
+    assert reader.blood_sample == sample
+    assert reader.changes == 4
+    assert reader.reader(device).changes == 4
+
+
+class LookupApi:
+    def __init__(self) -> None:
+        self.requests = []
+        self.release = asyncio.Event()
+
+    async def get_blood_sample(self, id: str):
+        self.requests.append(id)
+        await self.release.wait()
+        if id == "unknown":
+            return None
+        effect = Effect(id = 7, name = "Energizing", strength = 3, action = "increasing", target = "energy")
+        return BloodSample(id = 42, rfid_id = id, strength = 4, effect = effect)
+
+    async def get_refined_sample(self, id: str):
+        return None
+
+
+def test_backend_lookup():
+    async def run():
+        api = LookupApi()
+        reader = rfid.Rfid(api = api)
+        await reader.start()
+
+        device = Device("/dev/ttyUSB0", "rfid")
+        reader.add_device(device)
+        device.callback(BloodLine.format("aaaa"))
+
+        # The tag data is used until the lookup returns.
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert api.requests == ["aaaa"]
+        assert reader.blood_sample.id == -1
+
+        api.release.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        assert reader.blood_sample.id == 42
+        assert reader.blood_sample.strength == 4
+        assert reader.stats()["lookups"] == {"corrected": 1}
+
+        device.callback("tag lost: aaaa")
+        device.callback(BloodLine.format("unknown"))
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        assert reader.blood_sample.id == -1
+        assert reader.stats()["lookups"] == {"corrected": 1, "unknown": 1}
+
+        await reader.stop()
+
+    asyncio.run(run())
+
+
+def test_lookup_cancelled_on_remove():
+    async def run():
+        api = LookupApi()
+        reader = rfid.Rfid(api = api)
+        await reader.start()
+
+        device = Device("/dev/ttyUSB0", "rfid")
+        reader.add_device(device)
+        device.callback(BloodLine.format("aaaa"))
+        for _ in range(10):
+            await asyncio.sleep(0)
+        assert api.requests == ["aaaa"]
+
+        reader.remove_device(device)
+        api.release.set()
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        assert reader.readers == []
+        assert reader.stats()["lookups"] == {}
+
+        await reader.stop()
+
+    asyncio.run(run())
+
+
+CorpusPath = Path(__file__).parent / "data" / "rfid_corpus.txt"
+
+
+def corpus() -> list[str]:
+    return CorpusPath.read_text(encoding = "utf-8").splitlines()
+
+
+@pytest.mark.parametrize("purity, expected", [("polluted", 2), ("PRISTINE", 10), ("Perfect", 12), ("shiny", None)])
+def test_purity_to_int(purity, expected):
+    assert rfid.purity_to_int(purity) == expected
+
+
+@pytest.mark.parametrize("line, kind, rfid_id, error", [
+    ("tag found: aaaa blood increasing energy x x x pristine", rfid.Kind.TagFound, "aaaa", None),
+    ("traits: aaaa refined decreasing flesh increasing energy x perfect", rfid.Kind.Traits, "aaaa", None),
+    ("tag lost: aaaa", rfid.Kind.TagLost, "aaaa", None),
+    ("tag found: aaaa raw x x x x x pristine", rfid.Kind.TagFound, "aaaa", "unsupported sample"),
+    ("tag found: aaaa blood increasing energy x x x shiny", rfid.Kind.TagFound, "aaaa", "unknown purity"),
+    ("tag found: aaaa blood increasing", rfid.Kind.TagFound, "aaaa", "insufficient parts"),
+    ("tag found: aaaa", rfid.Kind.TagFound, "", "no sample"),
+    ("garbage", None, "", "unknown message"),
+])
+def test_parse_line(line, kind, rfid_id, error):
+    message = rfid.parse_line(line)
+    assert message.kind == kind
+    assert message.rfid_id == rfid_id
+    assert message.error == error
+    assert (message.sample is not None) == (error is None and kind in (rfid.Kind.TagFound, rfid.Kind.Traits))
+
+
+def test_parse_name():
+    assert rfid.parse_line("name: rfid-1") == rfid.Message(rfid.Kind.Name, name = "rfid-1")
+
+
+def test_parse_corpus():
+    for line in corpus():
+        rfid.parse_line(line)
+
+
+def test_fuzz():
+    # Mutate the corpus at random, none of the results may raise or stop processing.
+    generator = random.Random(0)
+    lines = corpus()
+    alphabet = " :abcdefghijklmnopqrstuvwxyz0123456789\x00\xff"
+
+    reader = rfid.Rfid()
+    device = Device("/dev/ttyUSB0", "rfid")
+    reader.add_device(device)
+
+    for _ in range(5000):
+        line = list(generator.choice(lines))
+        for _ in range(generator.randint(1, 4)):
+            position = generator.randint(0, len(line))
+            match generator.randint(0, 2):
+                case 0: line.insert(position, generator.choice(alphabet))
+                case 1: del line[position:position + generator.randint(1, 8)]
+                case 2: line[position:position] = generator.choice(lines)
+        device.callback("".join(line))
+
+    stats = reader.stats()
+    assert stats["lines"] == 5000
+    assert sum(stats["errors"].values()) > 0
+
+
+def test_errors_are_counted():
+    reader = rfid.Rfid()
+    device = Device("/dev/ttyUSB0", "rfid")
+    reader.add_device(device)
+
+    device.callback("tag found: aaaa blood increasing energy x x x shiny")
+    device.callback("garbage")
+    device.callback(BloodLine.format("aaaa"))
+
+    assert reader.stats()["errors"] == {"unknown purity": 1, "unknown message": 1}
+    assert reader.blood_sample.strength == 10
+
+
+class Controller:
+    def __init__(self, reader: rfid.Rfid) -> None:
+        self.reader = reader
+        self.lost = []
+        self.received = 0
+
+    def device_identified(self, device) -> None:
+        self.reader.add_device(device)
+
+    def device_lost(self, device) -> None:
+        self.lost.append(device)
+
+    def data_received(self, device) -> None:
+        self.received += 1
+
+
+def test_virtual_serial_readers():
+    async def run():
+        reader = rfid.Rfid(rfid.Config(roles = {"rfid-1": rfid.Role.Blood, "rfid-2": rfid.Role.Krystal}))
+        controller = Controller(reader)
+        terminals = [VirtualSerial("rfid-1"), VirtualSerial("rfid-2")]
+        devices = [Serial(path = terminal.path, controller = controller) for terminal in terminals]
+
+        try:
+            for device, terminal in zip(devices, terminals):
+                await device.start()
+                terminal.answer_name()
+            await wait_for(lambda: len(reader.readers) == 2)
+
+            terminals[0].write(BloodLine.format("aaaa"))
+            terminals[1].write(RefinedLine.format("bbbb"))
+            await wait_for(lambda: reader.blood_sample is not None and reader.refined_sample is not None)
+
+            terminals[1].write("tag lost: bbbb")
+            await wait_for(lambda: reader.refined_sample is None)
+            assert reader.blood_sample.rfid_id == "aaaa"
+            assert controller.received >= 3
+        finally:
+            for device in devices:
+                await device.stop()
+            for terminal in terminals:
+                terminal.close()
+
+    asyncio.run(run())
@@ -0,0 +1,452 @@
+import asyncio
+import threading
+import time
+
+from krystalium.serialcontroller import Config, Serial, SerialController
+from virtual_serial import VirtualSerial, wait_for
+
+
+class Controller:
+    def __init__(self) -> None:
+        self.identified = []
+        self.lost = []
+        self.received = 0
+
+    def device_identified(self, device) -> None:
+        self.identified.append(device)
+
+    def device_lost(self, device) -> None:
+        self.lost.append(device)
+
+    def data_received(self, device) -> None:
+        self.received += 1
+
+
+def test_lines_are_delivered_on_the_event_loop():
+    async def run():
+        controller = Controller()
+        terminal = VirtualSerial("rotary")
+        device = Serial(path = terminal.path, controller = controller)
+
+        threads = []
+        lines = []
+        device.set_callback(lambda line: (lines.append(line), threads.append(threading.get_ident())))
+
+        try:
+            await device.start()
+            terminal.answer_name()
+            await wait_for(lambda: controller.identified == [device])
+
+            for value in range(5):
+                terminal.write(str(value))
+            await wait_for(lambda: len(lines) == 5)
+
+            assert lines == ["0", "1", "2", "3", "4"]
+            assert set(threads) == {threading.get_ident()}
+            assert controller.received >= 1
+            assert device.stats()["lines"] == 5
+        finally:
+            await device.stop()
+            terminal.close()
+
+    asyncio.run(run())
+
+
+def test_partial_and_long_lines():
+    async def run():
+        controller = Controller()
+        terminal = VirtualSerial("rotary")
+        device = Serial(path = terminal.path, max_line_length = 16, controller = controller)
+
+        lines = []
+        device.set_callback(lines.append)
+
+        try:
+            await device.start()
+            terminal.answer_name()
+            await wait_for(lambda: controller.identified == [device])
+
+            terminal.write_raw(b"tag fo")
+            await asyncio.sleep(0.05)
+            terminal.write_raw(b"und\r\nA" + b"x" * 40)
+            await asyncio.sleep(0.05)
+            terminal.write_raw(b"x" * 40 + b"\n1\n2\n")
+            await wait_for(lambda: len(lines) == 3)
+
+            assert lines == ["tag found", "1", "2"]
+            assert device.stats()["overflows"] == 1
+
+            # A long line that arrives in one piece is dropped as well.
+            terminal.write_raw(b"y" * 2000 + b"\n3\n")
+            await wait_for(lambda: len(lines) == 4)
+
+            assert lines[3] == "3"
+            assert device.stats()["overflows"] == 2
+        finally:
+            await device.stop()
+            terminal.close()
+
+    asyncio.run(run())
+
+
+def frame(text: str) -> bytes:
+    payload = text.encode("utf-8")
+    return bytes([0x02]) + len(payload).to_bytes(2, "little") + payload
+
+
+def test_binary_frames():
+    async def run():
+        controller = Controller()
+        terminal = VirtualSerial("rfid-1")
+        device = Serial(path = terminal.path, max_line_length = 64, controller = controller)
+
+        lines = []
+        device.set_callback(lines.append)
+
+        try:
+            await device.start()
+            terminal.answer_name("+frames")
+            await wait_for(lambda: controller.identified == [device])
+            terminal.expect(b"FRAMES\n")
+
+            assert device.device_name == "rfid-1"
+            assert device.frames
+
+            data = frame("tag found: aaaa") + b"text line\n" + frame("x" * 100) + frame("tag lost: aaaa")
+            terminal.write_raw(data[:7])
+            await asyncio.sleep(0.05)
+            terminal.write_raw(data[7:])
+            await wait_for(lambda: len(lines) == 3)
+
+            assert lines == ["tag found: aaaa", "text line", "tag lost: aaaa"]
+            assert device.stats()["frames"] == 2
+            assert device.stats()["overflows"] == 1
+        finally:
+            await device.stop()
+            terminal.close()
+
+    asyncio.run(run())
+
+
+def test_frames_can_be_disabled():
+    async def run():
+        controller = Controller()
+        terminal = VirtualSerial("rfid-1")
+        device = Serial(path = terminal.path, frames = False, controller = controller)
+
+        try:
+            await device.start()
+            terminal.answer_name("+frames")
+            await wait_for(lambda: controller.identified == [device])
+
+            assert device.device_name == "rfid-1"
+            assert not device.frames
+        finally:
+            await device.stop()
+            terminal.close()
+
+    asyncio.run(run())
+
+
+def test_no_threads_and_immediate_stop():
+    async def run():
+        controller = Controller()
+        terminals = [VirtualSerial(f"rfid-{index}") for index in range(8)]
+        devices = [Serial(path = terminal.path, controller = controller) for terminal in terminals]
+        threads = threading.active_count()
+
+        try:
+            for device, terminal in zip(devices, terminals):
+                await device.start()
+                terminal.answer_name()
+            await wait_for(lambda: len(controller.identified) == len(devices))
+
+            assert threading.active_count() == threads
+        finally:
+            start = time.perf_counter()
+            for device in devices:
+                await device.stop()
+            assert time.perf_counter() - start < 0.1
+
+            for terminal in terminals:
+                terminal.close()
+
+    asyncio.run(run())
+
+
+def test_closed_device_is_lost():
+    async def run():
+        controller = Controller()
+        terminal = VirtualSerial("rotary")
+        device = Serial(path = terminal.path, controller = controller)
+
+        await device.start()
+        terminal.answer_name()
+        await wait_for(lambda: controller.identified == [device])
+
+        terminal.close()
+        await wait_for(lambda: controller.lost == [device])
+        await device.stop()
+
+    asyncio.run(run())
+
+
+def test_hotplug(tmp_path):
+    async def run(hotplug: bool):
+        root = tmp_path / ("hotplug" if hotplug else "polling")
+        by_id = root / "by-id"
+        by_id.mkdir(parents = True)
+
+        controller = SerialController(config = Config(root_path = root, patterns = ["ttyFAKE*"], hotplug = hotplug, poll_interval = 0.05, by_id_path = by_id))
+        await controller.start()
+        assert controller.watching == hotplug
+
+        terminal = VirtualSerial("rfid")
+        try:
+            await controller.maybe_update()
+            assert controller.devices == []
+
+            (by_id / "usb-Krystalium_Reader-if00").symlink_to(terminal.path)
+            (root / "ttyFAKE0").symlink_to(terminal.path)
+
+            start = time.perf_counter()
+            while not controller.devices:
+                await asyncio.sleep(0.001)
+                await controller.maybe_update()
+                assert time.perf_counter() - start < 1.0
+
+            device = controller.devices[0]
+            assert device.path == root / "ttyFAKE0"
+            assert device.stable_path == by_id / "usb-Krystalium_Reader-if00"
+        finally:
+            await controller.stop()
+            terminal.close()
+
+    asyncio.run(run(True))
+    asyncio.run(run(False))
+
+
+def test_probe_backoff():
+    async def run():
+        controller = Controller()
+        terminal = VirtualSerial("rotary")
+        device = Serial(path = terminal.path, probe_delay = 0.01, max_probe_delay = 0.04, controller = controller)
+
+        try:
+            await device.start()
+            await asyncio.sleep(0.3)
+            probes = device.stats()["probes"]
+            # 0.01 + 0.02 + 0.04 * n, sending every 0.01s would be 30 probes.
+            assert 5 <= probes <= 10
+
+            terminal.answer_name()
+            await wait_for(lambda: controller.identified == [device])
+            await asyncio.sleep(0.1)
+            assert device.stats()["probes"] == probes
+            assert device.stats()["identify_time"] >= 0.3
+        finally:
+            await device.stop()
+            terminal.close()
+
+    asyncio.run(run())
+
+
+def test_known_devices_are_reattached(tmp_path):
+    async def run():
+        root = tmp_path / "dev"
+        root.mkdir()
+
+        added = []
+        controller = SerialController(config = Config(root_path = root, patterns = ["ttyFAKE*"], by_id_path = None))
+        controller.set_callbacks(added.append, lambda device: None)
+        await controller.start()
+
+        terminal = VirtualSerial("rfid-1")
+        (root / "ttyFAKE0").symlink_to(terminal.path)
+        try:
+            await controller.maybe_update()
+            terminal.answer_name()
+            await wait_for(lambda: len(added) == 1)
+        finally:
+            terminal.close()
+
+        # Replug the device, it should be attached without waiting for its answer.
+        while controller.devices:
+            await asyncio.sleep(0.01)
+            await controller.maybe_update()
+        (root / "ttyFAKE0").unlink()
+        terminal = VirtualSerial("rfid-1")
+        (root / "ttyFAKE0").symlink_to(terminal.path)
+        try:
+            while not controller.devices:
+                await asyncio.sleep(0.01)
+                await controller.maybe_update()
+
+            assert len(added) == 2
+            assert added[1].device_name == "rfid-1"
+            assert not added[1].verified
+
+            terminal.answer_name()
+            await wait_for(lambda: added[1].verified)
+            assert len(added) == 2
+
+            stats = controller.stats()
+            assert stats["lost"] == 1
+            assert list(stats["reconnects"].values()) == [1]
+            assert stats[added[1].name]["device_name"] == "rfid-1"
+        finally:
+            await controller.stop()
+            terminal.close()
+
+    asyncio.run(run())
+
+
+def test_lost_devices_are_rescanned(tmp_path):
+    async def run():
+        root = tmp_path / "dev"
+        ports = tmp_path / "ports"
+        root.mkdir()
+        ports.mkdir()
+
+        added = []
+        controller = SerialController(config = Config(root_path = root, patterns = ["ttyFAKE*"], hotplug = True, by_id_path = None))
+        controller.set_callbacks(added.append, lambda device: None)
+        await controller.start()
+        assert controller.watching
+
+        # The node in root stays the same, only the device behind it changes, so there is no
+        # inotify event for the new device.
+        first = VirtualSerial("rfid-1")
+        (ports / "port0").symlink_to(first.path)
+        (root / "ttyFAKE0").symlink_to(ports / "port0")
+        second = VirtualSerial("rotary")
+        try:
+            await controller.maybe_update()
+            await asyncio.to_thread(first.answer_name)
+            await wait_for(lambda: len(added) == 1)
+
+            (ports / "port1").symlink_to(second.path)
+            (ports / "port1").replace(ports / "port0")
+            first.close()
+
+            # The device is reattached as rfid-1, answers with another name and is then
+            # identified from scratch.
+            answers = asyncio.create_task(asyncio.to_thread(lambda: (second.answer_name(), second.answer_name())))
+            start = time.perf_counter()
+            while not (added[-1].device_name == "rotary" and added[-1].verified):
+                await asyncio.sleep(0.01)
+                await controller.maybe_update()
+                assert time.perf_counter() - start < 5.0
+            await answers
+
+            assert controller.devices == [added[-1]]
+            assert [device.device_name for device in added] == ["rfid-1", "rfid-1", "rotary"]
+        finally:
+            await controller.stop()
+            second.close()
+
+    asyncio.run(run())
+
+
+def test_device_stats():
+    async def run():
+        controller = Controller()
+        terminal = VirtualSerial("rotary")
+        device = Serial(path = terminal.path, controller = controller)
+        lines = []
+        device.set_callback(lambda line: lines.append(line) or line.isdigit())
+
+        try:
+            await device.start()
+            terminal.answer_name()
+            await wait_for(lambda: controller.identified == [device])
+
+            terminal.write("1")
+            terminal.write("nonsense")
+            terminal.write_raw(b"\xff2\n")
+            await wait_for(lambda: len(lines) == 3)
+            await device.update(0.5)
+
+            stats = device.stats()
+            assert stats["device_name"] == "rotary"
+            assert stats["lines"] == 3
+            assert stats["unknown_lines"] == 2
+            assert stats["decode_errors"] == 1
+            assert stats["callback"]["count"] == 3
+            assert stats["lines_per_second"] == 6
+            assert stats["bytes_per_second"] == stats["bytes"] * 2
+        finally:
+            await device.stop()
+            terminal.close()
+
+    asyncio.run(run())
+
+
+def test_commands_are_batched_and_coalesced():
+    async def run():
+        controller = Controller()
+        terminal = VirtualSerial("rfid-1")
+        device = Serial(path = terminal.path, controller = controller)
+
+        try:
+            await device.start()
+            terminal.answer_name()
+            await wait_for(lambda: controller.identified == [device])
+
+            writes = device.stats()["writes"]
+            assert device.send("BUZZ")
+            assert device.send("LED 255 0 0", key = "led")
+            assert device.send("LED 0 255 0", key = "led")
+            assert device.send("LED 0 0 255", key = "led")
+
+            data = b""
+            while data.count(b"\n") < 2:
+                await asyncio.sleep(0.01)
+                data += terminal.read_available()
+
+            assert data == b"BUZZ\nLED 0 0 255\n"
+            stats = device.stats()
+            assert stats["writes"] == writes + 1
+            assert stats["coalesced"] == 2
+            assert stats["write_latency"]["count"] >= 2
+        finally:
+            await device.stop()
+            terminal.close()
+
+    asyncio.run(run())
+
+
+def test_stalled_device_does_not_block():
+    async def run():
+        controller = Controller()
+        terminal = VirtualSerial("rfid-1")
+        device = Serial(path = terminal.path, max_write_buffer = 1 << 20, controller = controller)
+        command = "X" * 1023
+
+        try:
+            await device.start()
+            terminal.answer_name()
+            await wait_for(lambda: controller.identified == [device])
+
+            # Nobody reads from the terminal, so the device stops accepting data at some point.
+            sent = 0
+            while device.stats()["write_queue"] == 0:
+                assert device.send(command)
+                sent += 1
+                await asyncio.sleep(0)
+                assert sent < 10000
+
+            # Commands are dropped once the limit is reached instead of queueing without bounds.
+            while device.send(command):
+                sent += 1
+            assert device.stats()["dropped_commands"] == 1
+
+            received = bytearray()
+            await wait_for(lambda: received.extend(terminal.read_available()) or len(received) == sent * 1024)
+            assert received == (command + "\n").encode() * sent
+            assert device.stats()["write_queue"] == 0
+        finally:
+            await device.stop()
+            terminal.close()
+
+    asyncio.run(run())
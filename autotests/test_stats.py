@@ -0,0 +1,26 @@
+import pytest
+
+import krystalium.stats as stats
+
+
+def test_histogram():
+    histogram = stats.Histogram()
+    assert histogram.to_dict() == {"count": 0}
+
+    for value in range(1, 101):
+        histogram.record(value / 1000)
+
+    assert histogram.count == 100
+    assert histogram.mean == pytest.approx(0.0505)
+
+    result = histogram.to_dict()
+    assert result["min"] == pytest.approx(1)
+    assert result["max"] == pytest.approx(100)
+    assert 50 <= result["p50"] <= 102.4
+    assert result["p50"] <= result["p90"] <= result["p99"] <= result["max"]
+
+
+def test_histogram_overflow():
+    histogram = stats.Histogram(bounds = (1.0, 2.0))
+    histogram.record(10.0)
+    assert histogram.percentile(50) == 10.0
@@ -0,0 +1,60 @@
+import pytest
+
+from krystalium.types import Color, ColorArray
+
+
+def test_color_operators():
+    assert Color(1.0, 2.0, 3.0) + Color(1.0, 1.0, 1.0, 0.5) == Color(2.0, 3.0, 4.0, 0.5)
+    assert Color(1.0, 2.0, 3.0, 0.5) + Color(1.0, 1.0, 1.0, 0.5) == Color(2.0, 3.0, 4.0, 1.0)
+    assert Color(1.0, 2.0, 3.0) * Color(2.0, 2.0, 2.0) == Color(2.0, 4.0, 6.0)
+    assert Color(1.0, 2.0, 3.0, 0.0) * 2.0 == Color(2.0, 4.0, 6.0, 0.0)
+    assert 2.0 * Color(1.0, 2.0, 3.0) == Color(2.0, 4.0, 6.0)
+
+    with pytest.raises(TypeError):
+        Color(1.0, 2.0, 3.0) + 1.0
+
+
+def test_color_mix():
+    assert Color.mix(Color(0.0, 0.0, 0.0), Color(1.0, 2.0, 4.0), 0.5) == Color(0.5, 1.0, 2.0)
+    assert Color.mix(Color(0.0, 0.0, 0.0, 0.0), Color(1.0, 1.0, 1.0), 0.5) == Color(0.5, 0.5, 0.5, 0.5)
+
+
+Colors = [
+    Color(0.7, 0.7, 0.7, 1.0),
+    Color(0.0, 0.0, 0.0, 0.0),
+    Color(-0.2, -0.1, -0.2),
+]
+
+Others = [
+    Color(0.25, -0.5, -0.5),
+    Color(1.0, 1.0, 1.0, 0.5),
+    Color(0.1, 0.2, 0.3),
+]
+
+
+def test_color_array_roundtrip():
+    colors = ColorArray.from_colors(Colors)
+    assert len(colors) == 3
+    assert colors.to_colors() == Colors
+
+    colors[2] = Color(1.0, 1.0, 1.0, 1.0)
+    assert colors[2] == Color(1.0, 1.0, 1.0, 1.0)
+
+    assert ColorArray(2).to_colors() == [Color(0.0, 0.0, 0.0), Color(0.0, 0.0, 0.0)]
+
+
+def test_color_array_matches_color():
+    colors = ColorArray.from_colors(Colors)
+    colors.add(ColorArray.from_colors(Others), 0.5)
+    assert colors.to_colors() == [first + second * 0.5 for first, second in zip(Colors, Others)]
+
+    colors = ColorArray.from_colors(Colors)
+    colors.scale(2.0)
+    assert colors.to_colors() == [color * 2.0 for color in Colors]
+
+    colors = ColorArray(len(Colors))
+    colors.mix(ColorArray.from_colors(Colors), ColorArray.from_colors(Others), 0.25)
+    assert colors.to_colors() == [Color.mix(first, second, 0.25) for first, second in zip(Colors, Others)]
+
+    assert colors.difference(0, colors[0]) == 0.0
+    assert ColorArray.from_colors([Color(0.0, 0.0, 0.0)]).difference(0, Color(0.0, 0.5, 0.0, 1.0)) == 0.5
@@ -0,0 +1,254 @@
+import asyncio
+import json
+
+import pytest
+
+import fakeunreal
+import krystalium.unreal as unreal
+from krystalium.api import Effect, Enlisted
+from virtual_serial import free_port
+
+
+def command(key, name):
+    return unreal.Command(key = key, calls = [{"functionName": name}])
+
+
+def names(commands):
+    return [c.calls[0]["functionName"] for c in commands]
+
+
+def test_command_queue_coalesce():
+    queue = unreal.CommandQueue()
+
+    queue.put(command("parameters", "first"))
+    queue.put(command("reinitialize", "reinitialize"))
+    queue.put(command("message", "message"))
+    queue.put(command("parameters", "second"))
+    queue.put(command("reinitialize", "reinitialize"))
+
+    assert names(queue.pending) == ["message", "second", "reinitialize"]
+
+    assert queue.pop().key == "message"
+    assert len(queue) == 2
+
+
+def test_command_queue_replay():
+    queue = unreal.CommandQueue()
+
+    queue.put(command("controller", "reset"))
+    queue.put(command("message", "first"))
+    queue.put(command("message", "second"))
+
+    while queue.pop():
+        pass
+
+    assert len(queue) == 0
+
+    queue.replay()
+    assert names(queue.pending) == ["reset", "second"]
+
+
+def test_command_queue_replay_state():
+    queue = unreal.CommandQueue()
+    rendered = []
+
+    def state():
+        rendered.append(True)
+        return command("parameters", "all")
+
+    queue.put(command("parameters", "first"), state)
+    queue.put(command("parameters", "second"), state)
+    assert names(queue.pending) == ["second"]
+    assert rendered == []
+
+    queue.pop()
+    queue.replay()
+    assert names(queue.pending) == ["all"]
+    assert len(rendered) == 1
+
+
+async def serve(port):
+    server = fakeunreal.FakeUnreal()
+    await server.start("localhost", port)
+    return server
+
+
+def call_bodies(server):
+    return [record.body for record in server.records]
+
+
+def test_late_start_catches_up():
+    async def run():
+        port = free_port()
+        config = unreal.Config(port = port, reconnect_delay = 0.05, max_reconnect_delay = 0.1)
+        communication = unreal.UnrealCommunication(config)
+        await communication.start()
+
+        await communication.message("First")
+        await communication.message("Second")
+        await communication.set_numbers([1, 2])
+
+        await asyncio.sleep(0.1)
+        assert not communication.connected
+
+        server = await serve(port)
+        try:
+            await asyncio.wait_for(communication.wait_connected(), 1)
+            await asyncio.wait_for(communication.flush(), 1)
+
+            stats = communication.stats()
+            assert stats["connects"] == 1
+            assert stats["calls"]["Message"]["successes"] == 1
+            assert stats["calls"]["Message"]["latency"]["count"] == 1
+            assert stats["commands"]["message"]["count"] == 1
+            # Commands replayed after connecting do not count the time spent disconnected.
+            assert stats["commands"]["message"]["max"] < 100
+
+            await communication.stop()
+        finally:
+            await server.stop()
+
+        return call_bodies(server)
+
+    calls = asyncio.run(run())
+
+    assert [c["functionName"] for c in calls] == ["Reset", "Message", "SetNumbers", "ClearNumbers"]
+    assert calls[1]["parameters"]["Message"] == "Second"
+
+
+def test_failed_commands():
+    async def run():
+        port = free_port()
+        server = await serve(port)
+        server.config.error_rate = 1.0
+
+        communication = unreal.UnrealCommunication(unreal.Config(port = port))
+        await communication.start()
+        try:
+            await asyncio.wait_for(communication.wait_connected(), 1)
+            await asyncio.wait_for(communication.flush(), 1)
+
+            stats = communication.stats()
+            assert stats["failed_commands"] == {"controller": 1, "message": 1}
+            assert stats["commands"] == {}
+            assert stats["calls"]["Message"]["http_errors"] == 1
+        finally:
+            await communication.stop()
+            await server.stop()
+
+    asyncio.run(run())
+
+
+def test_broken_responses_reconnect():
+    async def run():
+        broken = True
+
+        async def respond(reader, writer):
+            request = await reader.readuntil(b"\r\n\r\n")
+            length = int(next((line.split(b":")[1] for line in request.split(b"\r\n") if line.lower().startswith(b"content-length")), b"0"))
+            await reader.readexactly(length)
+
+            if request.startswith(b"PUT") and broken:
+                # Announce more data than is sent, so reading the body fails.
+                writer.write(b"HTTP/1.1 500 Error\r\nContent-Length: 100\r\n\r\nshort")
+            else:
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: close\r\n\r\n{}")
+            await writer.drain()
+            writer.close()
+
+        port = free_port()
+        server = await asyncio.start_server(respond, "localhost", port)
+
+        config = unreal.Config(port = port, reconnect_delay = 0.05, max_reconnect_delay = 0.1)
+        communication = unreal.UnrealCommunication(config)
+        await communication.start()
+        try:
+            for _ in range(200):
+                if communication.stats()["disconnects"] >= 2:
+                    break
+                await asyncio.sleep(0.01)
+            assert communication.stats()["disconnects"] >= 2
+
+            broken = False
+            await communication.message("Hello")
+            await asyncio.wait_for(communication.flush(), 1)
+            assert communication.stats()["calls"]["Message"]["successes"] == 1
+        finally:
+            await communication.stop()
+            server.close()
+            await server.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_request_template():
+    template = unreal.RequestTemplate("/Path", "Message", variable = "Message")
+    request = template.render(unreal.json_encode("Hello \"World\""))
+    assert json.loads(request.body) == {
+        "objectPath": "/Path",
+        "functionName": "Message",
+        "parameters": {"Message": "Hello \"World\""},
+    }
+
+    template = unreal.RequestTemplate("/Path", "Reset")
+    assert template.render() is template.render()
+    assert json.loads(template.render().body) == {"objectPath": "/Path", "functionName": "Reset"}
+
+    with pytest.raises(ValueError):
+        unreal.RequestTemplate("/Path", "Message", variable = "Message").render()
+
+
+@pytest.mark.parametrize("encoder", unreal.Encoders.keys())
+def test_parameter_requests(encoder):
+    communication = unreal.UnrealCommunication(unreal.Config(json_encoder = encoder))
+    parameters = unreal.SystemParameters(base_spawn_rate = 3.5)
+
+    requests = communication.parameter_requests(parameters)
+    expected = [entry["Body"] for entry in parameters.to_batch()]
+
+    assert [json.loads(request.body) for request in requests] == expected
+
+
+def enlisted(action, target):
+    effect = Effect(id = 0, name = "Test", strength = 12, action = action, target = target)
+    return Enlisted(id = 0, name = "Test", number = "12345", effects = [effect])
+
+
+def test_transition():
+    async def run():
+        port = free_port()
+        server = await serve(port)
+
+        config = unreal.Config(port = port, transition_duration = 0.3, transition_rate = 50)
+        communication = unreal.UnrealCommunication(config)
+        await communication.start()
+        await asyncio.wait_for(communication.wait_connected(), 1)
+
+        try:
+            await communication.update_from_enlisted(enlisted("None", "None"))
+            await asyncio.wait_for(communication.flush(), 1)
+            server.clear()
+
+            await communication.update_from_enlisted(enlisted("Increasing", "Energy"))
+            assert communication.transitioning
+
+            await asyncio.sleep(0.5)
+            await asyncio.wait_for(communication.flush(), 1)
+            assert not communication.transitioning
+            assert communication.stats()["transition_frames_sent"] > 1
+
+            await communication.stop()
+        finally:
+            await server.stop()
+
+        return call_bodies(server)
+
+    calls = asyncio.run(run())
+
+    names = {c["parameters"]["InVariableName"] for c in calls if "InVariableName" in c.get("parameters", {})}
+    assert names == {"Base Movement"}
+
+    values = [c["parameters"]["InValue"] for c in calls if c.get("parameters", {}).get("InVariableName") == "Base Movement"]
+    assert len(values) > 2
+    assert values == sorted(values)
+    assert values[-1] == pytest.approx(18.0)
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import select
+import socket
+import time
+from pathlib import Path
+
+
+async def wait_for(condition, timeout = 5.0) -> None:
+    end = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > end:
+            raise TimeoutError()
+        await asyncio.sleep(0.01)
+
+
+def free_port() -> int:
+    """
+    A TCP port on localhost that is not in use, for test servers.
+    """
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+class VirtualSerial:
+    """
+    A pseudo terminal standing in for a serial device, like the ones created by
+    setup_virtual_serial.sh.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.master, self.slave = os.openpty()
+        self.path = Path(os.ttyname(self.slave))
+
+    def expect(self, request: bytes) -> None:
+        buffer = b""
+        while request not in buffer:
+            ready, _, _ = select.select([self.master], [], [], 5.0)
+            if not ready:
+                raise TimeoutError()
+            buffer += os.read(self.master, 1024)
+
+    def read_available(self) -> bytes:
+        """
+        Read everything the device has written so far, without waiting.
+        """
+        data = b""
+        while select.select([self.master], [], [], 0)[0]:
+            data += os.read(self.master, 65536)
+        return data
+
+    def answer_name(self, capabilities: str = "") -> None:
+        self.expect(b"NAME\n")
+        self.write(f"name: {self.name} {capabilities}".rstrip())
+
+    def write(self, line: str) -> None:
+        self.write_raw(f"{line}\n".encode("utf-8"))
+
+    def write_raw(self, data: bytes) -> None:
+        os.write(self.master, data)
+
+    def close(self) -> None:
+        os.close(self.master)
+        os.close(self.slave)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""
+Compare the build time and memory use of the effect table representations.
+
+"dataclass" is the previous representation, a plain frozen dataclass per modifier. "slotted" is
+the current ParameterModifier and "compact" is the parallel array CompactTable. The table can be
+replicated with --scale to approximate larger effect sheets. Resident memory of each
+representation and the import time of krystalium.effect_data are measured in fresh interpreters.
+"""
+
+import argparse
+import dataclasses
+import subprocess
+import sys
+import timeit
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import krystalium.effect_data
+import krystalium.effects as effects
+from krystalium.types import Color, ParameterModifier
+
+
+@dataclasses.dataclass(frozen = True)
+class DataclassModifier:
+    parameter: str
+    value: Any
+    operation: str = "add"
+
+
+def source(scale: int) -> str:
+    text = Path(krystalium.effect_data.__file__).read_text()
+    table = text[text.index("effect_table = {") + len("effect_table = "):]
+
+    if scale == 1:
+        return f"effect_table = {table}"
+
+    entries = ", ".join(f"**{{f'{{k}}{index}': v for k, v in ({table}).items()}}" for index in range(scale))
+    return f"effect_table = {{{entries}}}"
+
+
+def build(code, modifier_type) -> dict:
+    namespace = {"Color": Color, "ParameterModifier": modifier_type}
+    exec(code, namespace)
+    return namespace["effect_table"]
+
+
+def rss() -> int:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def create(name: str, code) -> Any:
+    if name == "dataclass":
+        return build(code, DataclassModifier)
+
+    table = build(code, ParameterModifier)
+    if name == "compact":
+        return effects.CompactTable.from_table(table)
+    return table
+
+
+def measure(name: str, code) -> tuple[float, int]:
+    duration = min(timeit.repeat(lambda: create(name, code), number = 5, repeat = 5)) / 5
+
+    tracemalloc.start()
+    result = create(name, code)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    return duration, size
+
+
+def child(name: str, scale: int) -> None:
+    # Run in a fresh interpreter so the resident memory of a single representation is measured.
+    code = compile(source(scale), "effect_data", "exec")
+    before = rss()
+    table = create(name, code)
+    print(rss() - before)
+
+
+def import_time() -> float:
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import krystalium"], capture_output = True, text = True, cwd = Path(__file__).parent.parent, check = True)
+    for line in output.stderr.splitlines():
+        if line.strip().endswith("krystalium.effect_data"):
+            return int(line.split("|")[0].split(":")[1]) / 1e6
+    return 0.0
+
+
+Representations = ("dataclass", "slotted", "compact")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", type = int, default = 1)
+    parser.add_argument("--child", choices = Representations, help = argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child, args.scale)
+        sys.exit(0)
+
+    code = compile(source(args.scale), "effect_data", "exec")
+    print(f"Modifiers: {len(effects.CompactTable.from_table(build(code, ParameterModifier)))}")
+
+    for name in Representations:
+        duration, size = measure(name, code)
+        output = subprocess.run([sys.executable, __file__, "--scale", str(args.scale), "--child", name], capture_output = True, text = True, check = True)
+        print(f"{name:>10}: {duration * 1000:8.2f}ms build, {size / 1024:8.1f}KiB allocated, {int(output.stdout):6d}KiB resident")
+
+    times = sorted(import_time() for _ in range(5))
+    print(f"Import of krystalium.effect_data: {times[len(times) // 2] * 1000:.2f}ms (median self time of 5 runs)")
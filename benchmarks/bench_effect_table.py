@@ -0,0 +1,45 @@
+#!/usr/bin/env python
+"""
+Compare the previous linear scan in effect_table.get_modifiers with the compiled index.
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import krystalium.effect_table as et
+
+
+def linear_get_modifiers(action, target):
+    targets = {}
+    for table_action in et.effect_table:
+        if action.lower() == table_action.lower():
+            targets = et.effect_table[table_action]
+
+    if not targets:
+        return None
+
+    for table_target in targets:
+        if target.lower() == table_target.lower():
+            return targets[table_target]
+
+    return None
+
+
+if __name__ == "__main__":
+    lookups = [
+        ("increasing", "energy"),
+        ("Solidifying", "Solid"),
+        ("Releasing", "Plant"),
+        ("unknown", "energy"),
+    ]
+
+    for action, target in lookups:
+        assert linear_get_modifiers(action, target) is et.get_modifiers(action, target)
+
+    number = 20000
+    for name, function in (("linear", linear_get_modifiers), ("index", et.get_modifiers)):
+        result = min(timeit.repeat(lambda: [function(a, t) for a, t in lookups], number = number, repeat = 5))
+        print(f"{name:>8}: {result / number / len(lookups) * 1e9:8.1f} ns per lookup")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+"""
+Measure how fast reader output is parsed and handled.
+
+"legacy" is the previous prefix chain with a match based purity lookup, which raised on an
+unknown purity. "cold" parses every line without the result cache, "warm" is the steady state of
+a reader repeating its current tag. "repeat" is the cost of a repeated report in Rfid, which
+skips parsing altogether. "burst" feeds the fuzz corpus through Rfid the way Serial does from
+its event loop reader callback and reports the slowest line.
+"""
+
+import argparse
+import random
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import krystalium.rfid as rfid
+from krystalium.api import BloodSample, Effect, RefinedSample
+
+
+CorpusPath = Path(__file__).parent.parent / "autotests" / "data" / "rfid_corpus.txt"
+
+
+def legacy_purity(purity: str) -> int:
+    match purity.upper():
+        case "POLLUTED": return 2
+        case "TARNISHED": return 3
+        case "DIRTY": return 4
+        case "BLEMISHED": return 5
+        case "IMPURE": return 6
+        case "UNBLEMISHED": return 7
+        case "LUCID": return 8
+        case "STAINLESS": return 9
+        case "PRISTINE": return 10
+        case "IMMACULATE": return 11
+        case "PERFECT": return 12
+        case _: raise RuntimeError(f"Unknown purity {purity}")
+
+
+def legacy_tag(line: str):
+    parts = line.split(" ")
+    if len(parts) <= 2:
+        return None
+
+    rest = parts[2:]
+    if len(rest) < 6:
+        return None
+
+    match parts[1]:
+        case "refined":
+            return RefinedSample(id = -1, rfid_id = parts[0], strength = legacy_purity(rest[5]), primary_action = rest[0], primary_target = rest[1], secondary_action = rest[2], secondary_target = rest[3])
+        case "blood":
+            return BloodSample(id = -1, rfid_id = parts[0], strength = legacy_purity(rest[5]), effect = Effect(id = -1, name = "Blood Sample Effect", strength = -1, action = rest[0], target = rest[1]))
+
+    return None
+
+
+def legacy_parse(line: str):
+    if line.startswith("tag found:"):
+        return legacy_tag(line.replace("tag found: ", ""))
+    elif line.startswith("tag lost:"):
+        return None
+    elif line.startswith("traits: "):
+        return legacy_tag(line.replace("traits: ", ""))
+
+
+def cold_parse(line: str):
+    rfid.parse_line.cache_clear()
+    return rfid.parse_line(line)
+
+
+class Device:
+    path = Path("/dev/ttyUSB0")
+    stable_path = path
+    device_name = "rfid"
+    name = "Benchmark"
+
+    def set_callback(self, callback) -> None:
+        self.callback = callback
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type = int, default = 20000)
+    parser.add_argument("--burst", type = int, default = 100000)
+    args = parser.parse_args()
+
+    lines = [
+        "tag found: 04a1b2c3 blood increasing energy x x x pristine",
+        "traits: 04a1b2c3 refined decreasing flesh increasing energy x perfect",
+        "tag lost: 04a1b2c3",
+    ]
+
+    for name, function in (("legacy", legacy_parse), ("cold", cold_parse), ("warm", rfid.parse_line)):
+        result = min(timeit.repeat(lambda: [function(line) for line in lines], number = args.number, repeat = 5)) / (args.number * len(lines))
+        print(f"{name:>10}: {result * 1e6:8.2f} us per line")
+
+    reader = rfid.Rfid()
+    device = Device()
+    reader.add_device(device)
+    result = min(timeit.repeat(lambda: device.callback(lines[1]), number = args.number, repeat = 5)) / args.number
+    print(f"{'repeat':>10}: {result * 1e6:8.2f} us per line")
+
+    corpus = CorpusPath.read_text(encoding = "utf-8").splitlines()
+    generator = random.Random(0)
+    burst = [generator.choice(corpus) + (str(generator.randint(0, 999)) if generator.random() < 0.5 else "") for _ in range(args.burst)]
+
+    reader = rfid.Rfid()
+    device = Device()
+    reader.add_device(device)
+
+    slowest = 0.0
+    start = time.perf_counter()
+    for line in burst:
+        line_start = time.perf_counter()
+        device.callback(line)
+        slowest = max(slowest, time.perf_counter() - line_start)
+    duration = time.perf_counter() - start
+
+    errors = sum(reader.stats()["errors"].values())
+    print(f"{'burst':>10}: {args.burst / duration:10.0f} lines/s, slowest line {slowest * 1e6:.1f} us, {errors} errors counted")
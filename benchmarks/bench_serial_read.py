@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+"""
+Measure how many lines per second a single serial device can deliver.
+
+The device is a pseudo terminal, like the ones setup_virtual_serial.sh creates, that is flooded
+with RFID reader output from a writer thread. "readline" is the previous path: a thread per
+device calling readline() and handling every line on its own. "lines" and "frames" are Serial
+reading in bulk on the event loop, with text lines and with negotiated binary frames.
+"""
+
+import argparse
+import asyncio
+import os
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+
+import serial
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from krystalium.serialcontroller import Serial
+
+
+Line = "traits: 04a1b2c3 refined decreasing flesh increasing energy x perfect"
+
+
+class Controller:
+    def device_identified(self, device) -> None:
+        pass
+
+    def device_lost(self, device) -> None:
+        pass
+
+    def data_received(self, device) -> None:
+        pass
+
+
+def flood(master: int, data: bytes) -> None:
+    view = memoryview(data)
+    while view:
+        written = os.write(master, view[:65536])
+        view = view[written:]
+
+
+def encode(count: int, frames: bool) -> bytes:
+    if not frames:
+        return f"{Line}\n".encode("utf-8") * count
+
+    payload = Line.encode("utf-8")
+    return (struct.pack("<BH", 0x02, len(payload)) + payload) * count
+
+
+def readline(count: int) -> float:
+    master, slave = os.openpty()
+    device = serial.Serial(os.ttyname(slave), timeout = 1)
+    received = 0
+
+    writer = threading.Thread(target = flood, args = (master, encode(count, False)))
+    start = time.perf_counter()
+    writer.start()
+
+    while received < count:
+        line = device.readline().decode("utf-8").rstrip().lower()
+        if line:
+            received += 1
+
+    duration = time.perf_counter() - start
+    writer.join()
+    device.close()
+    os.close(master)
+    os.close(slave)
+    return duration
+
+
+async def bulk(count: int, frames: bool) -> float:
+    master, slave = os.openpty()
+    device = Serial(path = Path(os.ttyname(slave)), controller = Controller())
+
+    received = 0
+    done = asyncio.Event()
+
+    def callback(line: str) -> None:
+        nonlocal received
+        received += 1
+        if received == count:
+            done.set()
+
+    device.set_callback(callback)
+    await device.start()
+    os.read(master, 1024)
+
+    os.write(master, b"name: benchmark +frames\n" if frames else b"name: benchmark\n")
+    while device.frames != frames or not device.device_name:
+        await asyncio.sleep(0.001)
+
+    writer = threading.Thread(target = flood, args = (master, encode(count, frames)))
+    start = time.perf_counter()
+    writer.start()
+    await done.wait()
+    duration = time.perf_counter() - start
+
+    writer.join()
+    await device.stop()
+    os.close(master)
+    os.close(slave)
+    return duration
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--lines", type = int, default = 100000)
+    args = parser.parse_args()
+
+    results = {
+        "readline": readline(args.lines),
+        "lines": asyncio.run(bulk(args.lines, False)),
+        "frames": asyncio.run(bulk(args.lines, True)),
+    }
+
+    for name, duration in results.items():
+        print(f"{name:>10}: {args.lines / duration:10.0f} lines/s ({results['readline'] / duration:.1f}x)")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+Measure push latency, throughput and recovery of UnrealCommunication against the fake Unreal
+Remote Control server.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import krystalium.unreal as unreal
+from fakeunreal import Config, FakeUnreal
+from krystalium.api import Effect, Enlisted
+from replay import free_port, print_histogram
+
+
+def enlisted(index: int) -> Enlisted:
+    actions = ["Increasing", "Decreasing", "Creating"]
+    effect = Effect(id = index, name = "Benchmark", strength = 2 + index % 11, action = actions[index % len(actions)], target = "Energy")
+    return Enlisted(id = index, name = "Benchmark", number = "00000", effects = [effect])
+
+
+async def run(args: argparse.Namespace) -> None:
+    port = free_port()
+    server = FakeUnreal(Config(latency = args.latency, jitter = args.jitter, error_rate = args.error_rate, seed = 0))
+    await server.start("localhost", port)
+
+    communication = unreal.UnrealCommunication(unreal.Config(port = port, reconnect_delay = 0.05, max_reconnect_delay = 0.5))
+    await communication.start()
+    await communication.wait_connected()
+    await communication.flush()
+
+    print(f"Pushes: {args.pushes}, latency: {args.latency * 1000:.1f}ms, jitter: {args.jitter * 1000:.1f}ms, error rate: {args.error_rate:.0%}")
+
+    # Push latency: one full parameter push at a time.
+    server.clear()
+    start = time.perf_counter()
+    for index in range(args.pushes):
+        await communication.update_from_enlisted(enlisted(index))
+        await communication.flush()
+    duration = time.perf_counter() - start
+
+    stats = communication.stats()
+    print_histogram("parameter push", stats["commands"]["parameters"])
+    print(f"{'throughput':>24}: {len(server.records) / duration:8.1f} calls/s, {args.pushes / duration:8.1f} pushes/s")
+
+    # Burst: queue many pushes without waiting, coalescing should keep the backlog at one push.
+    server.clear()
+    start = time.perf_counter()
+    for index in range(args.pushes):
+        await communication.update_from_enlisted(enlisted(index))
+        await asyncio.sleep(0)
+    await communication.flush()
+    duration = time.perf_counter() - start
+    print(f"{'burst':>24}: {args.pushes} pushes queued, {len(server.records)} calls sent in {duration * 1000:.1f}ms")
+
+    # Recovery: take the server down, queue state and measure the time until it is replayed.
+    await server.stop()
+    await communication.message("Recovery")
+    await asyncio.sleep(args.outage)
+
+    server.clear()
+    start = time.perf_counter()
+    await server.start("localhost", port)
+    while not any(record.function_name == "Message" for record in server.records):
+        await asyncio.sleep(0.001)
+    print(f"{'recovery':>24}: state replayed {(time.perf_counter() - start) * 1000:.1f}ms after restart")
+
+    await communication.stop()
+    await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pushes", type = int, default = 100)
+    parser.add_argument("--latency", type = float, default = 0.001)
+    parser.add_argument("--jitter", type = float, default = 0.0)
+    parser.add_argument("--error-rate", type = float, default = 0.0)
+    parser.add_argument("--outage", type = float, default = 1.0)
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+"""
+Compare the CPU cost of building the request bodies for a full parameter push.
+
+The "dict" path is what used to happen on every push: build a dict per parameter and let the
+HTTP client encode it with json.dumps. The "template" paths render pre-encoded request templates
+with the available JSON encoders.
+"""
+
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import krystalium.unreal as unreal
+
+
+def dict_push(parameters: unreal.SystemParameters) -> list[bytes]:
+    return [json.dumps(entry["Body"]).encode("utf-8") for entry in parameters.to_batch()]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type = int, default = 2000)
+    args = parser.parse_args()
+
+    parameters = unreal.SystemParameters()
+
+    baseline = min(timeit.repeat(lambda: dict_push(parameters), number = args.number, repeat = 5)) / args.number
+    print(f"{'dict':>10}: {baseline * 1e6:8.1f} us per push")
+
+    for name in unreal.Encoders:
+        communication = unreal.UnrealCommunication(unreal.Config(json_encoder = name))
+        result = min(timeit.repeat(lambda: communication.parameter_requests(parameters), number = args.number, repeat = 5)) / args.number
+        print(f"{name:>10}: {result * 1e6:8.1f} us per push ({baseline / result:.1f}x)")
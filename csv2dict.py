@@ -1,81 +1,145 @@
 #!/usr/bin/env python
+"""
+Compile an effect table CSV file into the Python module used as the built-in effect table and
+into a compact binary table that can be loaded at runtime.
 
+The CSV is parsed row by row and every cell is validated against the fields of SystemParameters.
+All problems are reported at once. Outputs are only rebuilt when the CSV has changed since they
+were last generated, unless --force is given.
+"""
+
+import argparse
 import csv
+import hashlib
+import re
 import sys
-import json
-
-
-if len(sys.argv) < 2:
-    print("Usage: csv2dict [file]")
-    exit(1)
-
-
-targets = []
-actions = []
-rows = []
-with open(sys.argv[1], newline = "") as f:
-    reader = csv.reader(f, quotechar = "'")
-
-    first = True
-    for row in reader:
-        if first:
-            targets = row[1:]
-            first = False
-        else:
-            actions.append(row[0])
-            rows.append(row[1:])
-
-table = {}
-
-for r in range(len(rows)):
-    row_data = {}
-    row = rows[r]
-    for i in range(len(row)):
-        if not row[i] or row[i].strip() == "None":
-            row_data[targets[i]] = []
-            continue
-
-        try:
-            decoded = json.loads(row[i])
-        except json.JSONDecodeError:
-            print("Invalid JSON: ", row[i])
-
-        modifiers = []
-        for key, value in decoded.items():
-            operation = "add"
-            if str(value).startswith("+"):
-                operation = "add"
-                value = value[1:]
-            elif str(value).startswith("-"):
-                operation = "add"
-            elif str(value).startswith("*"):
-                operation = "mul"
-                value = value[1:]
-            elif str(value).startswith("="):
-                operation = "set"
-                value = value[1:]
-
-            modifiers.append(f"ParameterModifier(\"{key}\", {value}, \"{operation}\")")
-
-        row_data[targets[i]] = modifiers
-    table[actions[r]] = row_data
-
-
-output = json.dumps(table, indent = 4)
-
-with open("effect_table.py", "w") as f:
-    f.write("from .types import Color, ParameterModifier\n")
-    f.write("\n")
-    f.write("effect_table = ")
-
-    for line in output.splitlines(True):
-        if line.strip().startswith("\"ParameterModifier"):
-            line = line.replace("\"Param", "Param")
-            line = line.replace(r'\"', r'"')
-            line = line.replace("\"Color", "Color")
-            line = line.replace(r')"', ')')
-            f.write(line)
-        else:
-            f.write(line)
-
-    f.write("\n")
+from pathlib import Path
+
+from krystalium import effects
+from krystalium.types import Color, ParameterModifier
+from krystalium.unreal import ParameterFields
+
+
+# Increase when the generated output changes, so existing outputs are rebuilt.
+CompilerVersion = 3
+
+RootPath = Path(__file__).parent
+HashPattern = re.compile(r'^source_hash = "([0-9a-f]+)"$', re.MULTILINE)
+
+
+def source_hash(path: Path) -> bytes:
+    digest = hashlib.sha256(f"csv2dict {CompilerVersion}\n".encode("utf-8"))
+    with open(path, "rb") as f:
+        while chunk := f.read(65536):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def python_hash(path: Path) -> bytes | None:
+    try:
+        match = HashPattern.search(path.read_text())
+    except OSError:
+        return None
+
+    return bytes.fromhex(match.group(1)) if match else None
+
+
+def binary_hash(path: Path) -> bytes | None:
+    try:
+        with open(path, "rb") as f:
+            _, digest = effects.read_binary_header(f.read(effects.BinaryHeader.size))
+    except (OSError, ValueError):
+        return None
+
+    return digest
+
+
+def format_value(value) -> str:
+    if isinstance(value, Color):
+        channels = [value.r, value.g, value.b] + ([value.a] if value.a is not None else [])
+        return f"Color({', '.join(repr(channel) for channel in channels)})"
+
+    return repr(value)
+
+
+def format_modifier(modifier: ParameterModifier) -> str:
+    return f"ParameterModifier({modifier.parameter!r}, {format_value(modifier.value)}, {modifier.operation!r})"
+
+
+def write_python(table: dict[str, dict[str, list[ParameterModifier]]], path: Path, source: Path, digest: bytes) -> None:
+    with open(path, "w") as f:
+        f.write(f"# Generated by csv2dict.py from {source.name}, do not edit.\n")
+        f.write("from .types import Color, ParameterModifier\n")
+        f.write("\n")
+        f.write(f"source_hash = \"{digest.hex()}\"\n")
+        f.write("\n")
+        f.write("effect_table = {\n")
+
+        actions = list(table.items())
+        for action_index, (action, targets) in enumerate(actions):
+            f.write(f"    {action!r}: {{\n")
+
+            target_items = list(targets.items())
+            for target_index, (target, modifiers) in enumerate(target_items):
+                separator = "," if target_index < len(target_items) - 1 else ""
+                if not modifiers:
+                    f.write(f"        {target!r}: []{separator}\n")
+                    continue
+
+                f.write(f"        {target!r}: [\n")
+                f.write(",\n".join(f"            {format_modifier(modifier)}" for modifier in modifiers))
+                f.write(f"\n        ]{separator}\n")
+
+            f.write("    }" + ("," if action_index < len(actions) - 1 else "") + "\n")
+
+        f.write("}\n")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description = "Compile an effect table CSV file.")
+    parser.add_argument("file", type = Path)
+    parser.add_argument("--python", type = Path, default = RootPath / "krystalium" / "effect_data.py", help = "Path of the Python module to generate")
+    parser.add_argument("--binary", type = Path, default = None, help = "Path of the binary table to generate, defaults to the input with a .bin extension")
+    parser.add_argument("--no-python", action = "store_true", help = "Do not generate the Python module")
+    parser.add_argument("--no-binary", action = "store_true", help = "Do not generate the binary table")
+    parser.add_argument("--force", action = "store_true", help = "Rebuild even if the input did not change")
+    args = parser.parse_args()
+
+    binary_path = args.binary if args.binary is not None else args.file.with_suffix(".bin")
+
+    try:
+        digest = source_hash(args.file)
+    except OSError as e:
+        print(f"Could not read {args.file}: {e}", file = sys.stderr)
+        return 1
+
+    outputs = []
+    if not args.no_python and (args.force or python_hash(args.python) != digest):
+        outputs.append("python")
+    if not args.no_binary and (args.force or binary_hash(binary_path) != digest):
+        outputs.append("binary")
+
+    if not outputs:
+        print("Effect table is up to date")
+        return 0
+
+    try:
+        table = effects.read_csv(args.file, ParameterFields)
+    except (ValueError, csv.Error) as e:
+        print(f"Invalid effect table {args.file}:", file = sys.stderr)
+        print(e, file = sys.stderr)
+        return 1
+
+    if "python" in outputs:
+        write_python(table, args.python, args.file, digest)
+        print(f"Wrote {args.python}")
+
+    if "binary" in outputs:
+        effects.write_binary(table, binary_path, digest)
+        print(f"Wrote {binary_path}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
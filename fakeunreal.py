@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+"""
+A stand-in for the Unreal Remote Control API, for testing and benchmarking without Unreal.
+
+This implements the /remote/info, /remote/object/call and /remote/batch endpoints. Every call is
+recorded with a timestamp and can be delayed or made to fail to simulate a slow or unreliable
+Unreal application. Recorded calls can be retrieved from /stub/calls.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import logging
+import random
+import time
+from typing import Any
+
+from aiohttp import web
+
+
+log = logging.getLogger(__name__)
+
+
+@dataclasses.dataclass(kw_only = True)
+class Config:
+    # Base latency in seconds added to every call.
+    latency: float = 0.0
+    # Random latency in seconds added on top of the base latency, uniformly distributed.
+    jitter: float = 0.0
+    # Fraction of calls that fail with an HTTP 500 error.
+    error_rate: float = 0.0
+    seed: int | None = None
+
+
+@dataclasses.dataclass(kw_only = True, frozen = True)
+class Record:
+    time: float
+    path: str
+    function_name: str
+    variable: str | None
+    body: dict[str, Any]
+    status: int
+
+    def to_dict(self) -> dict[str, Any]:
+        return dataclasses.asdict(self)
+
+
+class FakeUnreal:
+    def __init__(self, config: Config | None = None) -> None:
+        self.__config = config if config is not None else Config()
+        self.__random = random.Random(self.__config.seed)
+        self.__records: list[Record] = []
+        self.__runner: web.AppRunner | None = None
+
+        self.__app = web.Application()
+        self.__app.router.add_get("/remote/info", self.__info)
+        self.__app.router.add_put("/remote/object/call", self.__call)
+        self.__app.router.add_put("/remote/batch", self.__batch)
+        self.__app.router.add_get("/stub/calls", self.__calls)
+
+    @property
+    def config(self) -> Config:
+        return self.__config
+
+    @property
+    def records(self) -> list[Record]:
+        return self.__records
+
+    @property
+    def running(self) -> bool:
+        return self.__runner is not None
+
+    def clear(self) -> None:
+        self.__records.clear()
+
+    async def start(self, host: str = "localhost", port: int = 30010) -> None:
+        self.__runner = web.AppRunner(self.__app)
+        await self.__runner.setup()
+        await web.TCPSite(self.__runner, host, port).start()
+        log.info(f"Fake Unreal listening on {host}:{port}")
+
+    async def stop(self) -> None:
+        if self.__runner is not None:
+            await self.__runner.cleanup()
+            self.__runner = None
+
+    async def __info(self, request: web.Request) -> web.Response:
+        return web.json_response({"HttpRoutes": [], "ActivePreset": None})
+
+    async def __call(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        status = await self.__execute(request.path, body)
+        if status != 200:
+            return web.json_response({"errorMessage": "Injected failure"}, status = status)
+        return web.json_response({})
+
+    async def __batch(self, request: web.Request) -> web.Response:
+        data = await request.json()
+
+        responses = []
+        for entry in data.get("Requests", []):
+            status = await self.__execute(entry.get("URL", ""), entry.get("Body", {}))
+            responses.append({"RequestId": entry.get("RequestId", -1), "ResponseCode": status, "ResponseBody": {}})
+
+        return web.json_response({"Responses": responses})
+
+    async def __calls(self, request: web.Request) -> web.Response:
+        return web.json_response([record.to_dict() for record in self.__records])
+
+    async def __execute(self, path: str, body: dict[str, Any]) -> int:
+        delay = self.__config.latency + self.__random.uniform(0, self.__config.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        status = 500 if self.__random.random() < self.__config.error_rate else 200
+
+        self.__records.append(Record(
+            time = time.perf_counter(),
+            path = path,
+            function_name = body.get("functionName", ""),
+            variable = body.get("parameters", {}).get("InVariableName"),
+            body = body,
+            status = status,
+        ))
+
+        return status
+
+
+async def main(args: argparse.Namespace) -> None:
+    config = Config(latency = args.latency, jitter = args.jitter, error_rate = args.error_rate, seed = args.seed)
+    server = FakeUnreal(config)
+    await server.start(args.host, args.port)
+
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level = logging.INFO)
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default = "localhost")
+    parser.add_argument("--port", type = int, default = 30010)
+    parser.add_argument("--latency", type = float, default = 0.0)
+    parser.add_argument("--jitter", type = float, default = 0.0)
+    parser.add_argument("--error-rate", type = float, default = 0.0)
+    parser.add_argument("--seed", type = int, default = None)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
@@ -1,6 +1,10 @@
 from . import component
+from . import stats
 from . import api
+from . import effects
 from . import unreal
 from . import number_input
 from . import rfid
+from . import inotify
+from . import recorder
 from . import serialcontroller
@@ -1,7 +1,9 @@
 import asyncio
+import json
 import time
 import logging
 import signal
+from typing import Any
 
 
 log = logging.getLogger(__name__)
@@ -27,6 +29,7 @@ class Component:
         self.__interval: float | None = interval
         self.__elapsed: float = 0
         self.__last_update: float = 0
+        self.__update_requested = False
 
     @property
     def name(self) -> str:
@@ -46,6 +49,26 @@ class Component:
             log.debug(f"Stopping {child.name}")
             await child.stop()
 
+    def stats(self) -> dict[str, Any]:
+        """
+        Statistics about this component, for diagnostics.
+
+        By default this contains the statistics of all children that have any, keyed by name.
+        Components that track statistics should override this and extend the result.
+        """
+        result = {}
+        for child in self.__children:
+            child_stats = child.stats()
+            if child_stats:
+                result[child.name] = child_stats
+        return result
+
+    def request_update(self) -> None:
+        """
+        Run update at the next call to maybe_update, even if the interval has not passed yet.
+        """
+        self.__update_requested = True
+
     async def maybe_update(self) -> None:
         if self.__interval is None:
             return
@@ -54,7 +77,8 @@ class Component:
         self.__elapsed += now - self.__last_update
         self.__last_update = now
 
-        if self.__elapsed >= self.__interval:
+        if self.__elapsed >= self.__interval or self.__update_requested:
+            self.__update_requested = False
             await self.update(self.__elapsed)
             self.__elapsed = 0
 
@@ -70,12 +94,23 @@ class MainLoop(Component):
     A standardised "main loop" component that will run a loop as an async task. The loop will run
     at most update_rate times per second. It will ensure to call start() before starting the loop
     and stop() at the end.
+
+    Sending SIGUSR1 to the process logs the statistics of all components. Calling wake() ends the
+    wait for the next iteration early, so new input can be handled right away.
     """
 
     def __init__(self, *, name: str | None = None, update_rate: int = 100, interval: float | None = None):
         super().__init__(name = name, interval = interval)
         self.__update_rate = update_rate
         self.__running = True
+        self.__wake_event = asyncio.Event()
+
+    def wake(self) -> None:
+        """
+        Update this component as soon as possible. This must be called on the event loop.
+        """
+        self.request_update()
+        self.__wake_event.set()
 
     async def run_loop(self):
         await self.start()
@@ -89,8 +124,12 @@ class MainLoop(Component):
                 await self.maybe_update()
 
                 remain = interval - (time.perf_counter() - start)
-                if remain > 0:
-                    await asyncio.sleep(remain)
+                if remain > 0 and not self.__wake_event.is_set():
+                    try:
+                        await asyncio.wait_for(self.__wake_event.wait(), remain)
+                    except TimeoutError:
+                        pass
+                self.__wake_event.clear()
         finally:
             await self.stop()
 
@@ -101,8 +140,12 @@ class MainLoop(Component):
 
         for s in signal.SIGINT, signal.SIGTERM:
             loop.add_signal_handler(s, run_task.cancel)
+        loop.add_signal_handler(signal.SIGUSR1, self.dump_stats)
 
         loop.run_until_complete(run_task)
 
+    def dump_stats(self) -> None:
+        log.info(f"Statistics: {json.dumps(self.stats(), indent = 4)}")
+
     def stop_loop(self):
         self.__running = False
@@ -0,0 +1,681 @@
+import asyncio
+import csv
+import dataclasses
+import json
+import logging
+import re
+import struct
+from array import array
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterable
+
+import pydantic
+
+from .component import Component
+from .types import Color, ParameterModifier
+from . import effect_table as et
+from . import modifiers as md
+
+
+log = logging.getLogger(__name__)
+
+
+# Value prefixes used in effect table cells and the operations they map to. Values without a
+# prefix are added.
+Prefixes: tuple[tuple[str, str], ...] = (
+    ("==", "set_unscaled"),
+    ("=", "set"),
+    ("*", "mul"),
+    ("+", "add"),
+)
+
+ColorPattern = re.compile(r"^Color\((.*)\)$")
+
+
+@pydantic.dataclasses.dataclass(kw_only = True, frozen = True)
+class Config:
+    # Path of an effect table CSV or binary file. When not set, the built-in effect table is used.
+    path: Path | None = None
+    # Interval in seconds at which the file is checked for changes.
+    poll_interval: float = 1.0
+    # Load binary tables into a CompactTable and compile them from there, so no
+    # ParameterModifier objects are created and only the compiled programs are kept.
+    compact: bool = False
+
+
+def parse_value(value: Any) -> tuple[Any, str]:
+    """
+    Parse a single modifier value from an effect table cell.
+
+    :return: A tuple of the parsed value and the name of the operation.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value), "add"
+
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid value {value!r}")
+
+    text = value.strip()
+    operation = "add"
+    for prefix, name in Prefixes:
+        if text.startswith(prefix):
+            operation = name
+            text = text[len(prefix):].strip()
+            break
+
+    match = ColorPattern.match(text)
+    if match:
+        try:
+            channels = [float(channel) for channel in match.group(1).split(",")]
+        except ValueError:
+            raise ValueError(f"Invalid color {value!r}") from None
+
+        if len(channels) not in (3, 4):
+            raise ValueError(f"Invalid number of color channels in {value!r}")
+
+        return Color(*channels), operation
+
+    try:
+        return float(text), operation
+    except ValueError:
+        raise ValueError(f"Invalid value {value!r}") from None
+
+
+def parse_cell(cell: str) -> list[ParameterModifier]:
+    """
+    Parse the modifiers of a single effect table cell.
+
+    A cell is either empty, "None" or a JSON object that maps parameter names to values, see
+    parse_value() for the format of values.
+    """
+    if not cell or cell.strip() == "None":
+        return []
+
+    data = json.loads(cell)
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object")
+
+    result = []
+    for parameter, value in data.items():
+        parsed, operation = parse_value(value)
+        result.append(ParameterModifier(parameter, parsed, operation))
+    return result
+
+
+def check_modifier(modifier: ParameterModifier, fields: dict[str, type]) -> str | None:
+    """
+    Check a modifier against the fields of the parameters it modifies.
+
+    :return: A description of the problem, or None if the modifier is valid.
+    """
+    if modifier.parameter not in fields:
+        return f"Unknown parameter {modifier.parameter}"
+
+    if modifier.operation not in md.Operations:
+        return f"Unknown operation {modifier.operation} for {modifier.parameter}"
+
+    field_type = fields[modifier.parameter]
+    value_type = type(modifier.value)
+    if field_type is Color and value_type is not Color and modifier.operation != "mul":
+        return f"Parameter {modifier.parameter} requires a color for operation {modifier.operation}"
+    if field_type is not Color and value_type is Color:
+        return f"Parameter {modifier.parameter} does not accept a color"
+
+    return None
+
+
+def check_table(table: dict[str, dict[str, list[ParameterModifier]]], fields: dict[str, type]) -> None:
+    """
+    Check all modifiers of a table against the fields of the parameters they modify.
+
+    Raises ValueError with all problems if any modifier is invalid.
+    """
+    errors = []
+    for action, targets in table.items():
+        for target, modifiers in targets.items():
+            for modifier in modifiers:
+                problem = check_modifier(modifier, fields)
+                if problem:
+                    errors.append(f"{action}/{target}: {problem}")
+
+    if errors:
+        raise ValueError("\n".join(errors))
+
+
+def parse_rows(rows: Iterable[list[str]], fields: dict[str, type] | None = None) -> dict[str, dict[str, list[ParameterModifier]]]:
+    """
+    Parse an effect table from CSV rows.
+
+    The first row contains the targets, starting at the second column. Every other row contains
+    an action in the first column followed by one cell per target. Rows are processed one at a
+    time, and all errors are collected and reported together in a single ValueError.
+
+    An empty "None"/"None" entry is added if the table does not contain it, as samples without a
+    secondary effect use it.
+
+    :param fields: If given, a mapping of parameter name to type that modifiers are checked
+                   against.
+    """
+    table: dict[str, dict[str, list[ParameterModifier]]] = {}
+    errors: list[str] = []
+    targets: list[str] | None = None
+
+    for line, row in enumerate(rows, start = 1):
+        if targets is None:
+            targets = [target.strip() for target in row[1:]]
+            continue
+
+        if not row or not any(cell.strip() for cell in row):
+            continue
+
+        action = row[0].strip()
+        if action in table:
+            errors.append(f"line {line}: Duplicate action {action}")
+            continue
+
+        if len(row) - 1 > len(targets):
+            errors.append(f"line {line}: More cells than targets")
+
+        table[action] = {}
+        for target, cell in zip(targets, row[1:]):
+            try:
+                modifiers = parse_cell(cell)
+            except ValueError as e:
+                errors.append(f"line {line}, {action}/{target}: {e}")
+                continue
+
+            if fields is not None:
+                for modifier in modifiers:
+                    problem = check_modifier(modifier, fields)
+                    if problem:
+                        errors.append(f"line {line}, {action}/{target}: {problem}")
+
+            table[action][target] = modifiers
+
+    if targets is None:
+        errors.append("Empty effect table")
+
+    try:
+        et.compile_table(table)
+    except ValueError as e:
+        errors.append(str(e))
+
+    if errors:
+        raise ValueError("\n".join(errors))
+
+    if "None" not in table:
+        table = {"None": {"None": []}} | table
+    return table
+
+
+def read_csv(path: Path, fields: dict[str, type] | None = None) -> dict[str, dict[str, list[ParameterModifier]]]:
+    with open(path, newline = "") as f:
+        return parse_rows(csv.reader(f, quotechar = "'"), fields)
+
+
+# Binary effect table format. All values are little-endian.
+#
+# Header: magic, format version (u16), SHA-256 of the source (32 bytes), string count (u16)
+# Strings: length (u16) followed by UTF-8 data, for each string
+# Entries: entry count (u16), then per entry action and target string index (u16, u16) and
+#          modifier count (u16)
+# Modifiers: parameter string index (u16), operation (u8), value kind (u8) and the value as
+#            doubles, one for a float, three or four for a color
+BinaryMagic = b"KEFT"
+BinaryVersion = 1
+BinaryHeader = struct.Struct("<4sH32sH")
+BinaryOperations: tuple[str, ...] = ("add", "mul", "set", "set_unscaled")
+
+# Value kinds: 0 for a float, otherwise the number of color channels.
+BinaryKinds: tuple[int, ...] = (0, 3, 4)
+
+_u16 = struct.Struct("<H")
+_entry = struct.Struct("<HHH")
+_modifier = struct.Struct("<HBB")
+
+
+class CompactTable:
+    """
+    An effect table stored as parallel arrays instead of lists of ParameterModifier objects.
+
+    Modifier i has the parameter names[parameters[i]] and the operation
+    BinaryOperations[operations[i]]. Its value starts at values[value_offsets[i]] and is either a
+    float or, if kinds[i] is not 0, a color with that number of channels. The modifiers of entry e
+    are offsets[e] up to offsets[e + 1], entries maps lookup keys to entry numbers.
+    """
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self.parameters = array("H")
+        self.operations = array("B")
+        self.kinds = array("B")
+        self.value_offsets = array("I")
+        self.values = array("d")
+        self.offsets = array("I", [0])
+        self.entries: dict[tuple[str, str], int] = {}
+
+    @classmethod
+    def from_table(cls, table: dict[str, dict[str, list[ParameterModifier]]]) -> "CompactTable":
+        result = cls()
+        name_indices: dict[str, int] = {}
+
+        for action, targets in table.items():
+            action_key = et.normalize(action)
+            for target, modifiers in targets.items():
+                for modifier in modifiers:
+                    if modifier.parameter not in name_indices:
+                        name_indices[modifier.parameter] = len(result.names)
+                        result.names.append(modifier.parameter)
+
+                    result.parameters.append(name_indices[modifier.parameter])
+                    result.operations.append(BinaryOperations.index(modifier.operation))
+                    result.value_offsets.append(len(result.values))
+
+                    value = modifier.value
+                    if isinstance(value, Color):
+                        channels = (value.r, value.g, value.b) if value.a is None else (value.r, value.g, value.b, value.a)
+                        result.kinds.append(len(channels))
+                        result.values.extend(channels)
+                    else:
+                        result.kinds.append(0)
+                        result.values.append(value)
+
+                result.entries[(action_key, et.normalize(target))] = len(result.offsets) - 1
+                result.offsets.append(len(result.operations))
+
+        return result
+
+    def __len__(self) -> int:
+        return len(self.operations)
+
+    @property
+    def nbytes(self) -> int:
+        """
+        The size of the arrays holding modifier data, in bytes.
+        """
+        arrays = (self.parameters, self.operations, self.kinds, self.value_offsets, self.values, self.offsets)
+        return sum(data.itemsize * len(data) for data in arrays)
+
+    def value(self, index: int) -> Any:
+        offset = self.value_offsets[index]
+        kind = self.kinds[index]
+        if kind == 0:
+            return self.values[offset]
+
+        return Color(*self.values[offset:offset + kind])
+
+    def modifier(self, index: int) -> ParameterModifier:
+        return ParameterModifier(self.names[self.parameters[index]], self.value(index), BinaryOperations[self.operations[index]])
+
+    def get(self, action: str, target: str) -> list[ParameterModifier] | None:
+        """
+        Create the modifiers for an action/target combination, like effect_table.get_modifiers.
+        """
+        entry = self.entries.get(et.lookup_key(action, target))
+        if entry is None:
+            return None
+
+        return [self.modifier(index) for index in range(self.offsets[entry], self.offsets[entry + 1])]
+
+    def check(self, fields: dict[str, type]) -> None:
+        """
+        Check all modifiers against the fields of the parameters they modify, like check_table().
+        """
+        errors = []
+        for (action, target), entry in self.entries.items():
+            for index in range(self.offsets[entry], self.offsets[entry + 1]):
+                problem = check_modifier(self.modifier(index), fields)
+                if problem:
+                    errors.append(f"{action}/{target}: {problem}")
+
+        if errors:
+            raise ValueError("\n".join(errors))
+
+    def compile(self, slots: dict[str, int]) -> dict[tuple[str, str], md.Program]:
+        """
+        Compile all entries into programs, without creating ParameterModifier objects.
+        """
+        name_slots = []
+        for name in self.names:
+            if name not in slots:
+                raise ValueError(f"Unknown parameter {name}")
+            name_slots.append(slots[name])
+
+        operations = [md.Operations[name] for name in BinaryOperations]
+
+        programs = {}
+        for key, entry in self.entries.items():
+            programs[key] = md.Program(tuple(
+                (name_slots[self.parameters[index]], operations[self.operations[index]], self.value(index))
+                for index in range(self.offsets[entry], self.offsets[entry + 1])
+            ))
+
+        return programs
+
+
+def write_binary(table: dict[str, dict[str, list[ParameterModifier]]], path: Path, source_hash: bytes = bytes(32)) -> None:
+    strings: dict[str, int] = {}
+
+    def string_index(value: str) -> int:
+        if value not in strings:
+            strings[value] = len(strings)
+        return strings[value]
+
+    body = bytearray()
+    entries = [(action, target, modifiers) for action, targets in table.items() for target, modifiers in targets.items()]
+    body += _u16.pack(len(entries))
+    for action, target, modifiers in entries:
+        body += _entry.pack(string_index(action), string_index(target), len(modifiers))
+        for modifier in modifiers:
+            if isinstance(modifier.value, Color):
+                channels = [modifier.value.r, modifier.value.g, modifier.value.b]
+                if modifier.value.a is not None:
+                    channels.append(modifier.value.a)
+            else:
+                channels = [modifier.value]
+
+            kind = len(channels) if len(channels) > 1 else 0
+            body += _modifier.pack(string_index(modifier.parameter), BinaryOperations.index(modifier.operation), kind)
+            body += struct.pack(f"<{len(channels)}d", *channels)
+
+    data = bytearray(BinaryHeader.pack(BinaryMagic, BinaryVersion, source_hash, len(strings)))
+    for value in strings:
+        encoded = value.encode("utf-8")
+        data += _u16.pack(len(encoded)) + encoded
+    data += body
+
+    path.write_bytes(bytes(data))
+
+
+def read_binary_header(data: bytes) -> tuple[int, bytes]:
+    """
+    Read the header of a binary effect table.
+
+    :return: A tuple of the format version and the source hash.
+    """
+    if len(data) < BinaryHeader.size:
+        raise ValueError("Truncated effect table")
+
+    magic, version, source_hash, _ = BinaryHeader.unpack_from(data)
+    if magic != BinaryMagic:
+        raise ValueError("Not a binary effect table")
+
+    return version, source_hash
+
+
+def _read_strings(data: bytes) -> tuple[list[str], int]:
+    """
+    Read the strings of a binary effect table.
+
+    :return: A tuple of the strings and the offset of the entries.
+    """
+    _, _, _, string_count = BinaryHeader.unpack_from(data)
+    offset = BinaryHeader.size
+
+    strings = []
+    for _ in range(string_count):
+        (length,) = _u16.unpack_from(data, offset)
+        offset += _u16.size
+        strings.append(data[offset:offset + length].decode("utf-8"))
+        offset += length
+
+    return strings, offset
+
+
+def parse_binary(data: bytes) -> dict[str, dict[str, list[ParameterModifier]]]:
+    version, _ = read_binary_header(data)
+    if version != BinaryVersion:
+        raise ValueError(f"Unsupported effect table version {version}")
+
+    try:
+        strings, offset = _read_strings(data)
+
+        (entry_count,) = _u16.unpack_from(data, offset)
+        offset += _u16.size
+
+        table: dict[str, dict[str, list[ParameterModifier]]] = {}
+        for _ in range(entry_count):
+            action, target, modifier_count = _entry.unpack_from(data, offset)
+            offset += _entry.size
+
+            modifiers = []
+            for _ in range(modifier_count):
+                parameter, operation, kind = _modifier.unpack_from(data, offset)
+                offset += _modifier.size
+
+                if kind not in BinaryKinds:
+                    raise ValueError(f"Corrupt effect table: invalid value kind {kind}")
+
+                count = kind if kind > 0 else 1
+                values = struct.unpack_from(f"<{count}d", data, offset)
+                offset += count * 8
+
+                value = Color(*values) if kind > 0 else values[0]
+                modifiers.append(ParameterModifier(strings[parameter], value, BinaryOperations[operation]))
+
+            table.setdefault(strings[action], {})[strings[target]] = modifiers
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"Corrupt effect table: {e}") from e
+
+    return table
+
+
+def parse_compact(data: bytes) -> CompactTable:
+    """
+    Parse a binary effect table directly into a CompactTable.
+
+    Raises ValueError if the table is corrupt or contains ambiguous names.
+    """
+    version, _ = read_binary_header(data)
+    if version != BinaryVersion:
+        raise ValueError(f"Unsupported effect table version {version}")
+
+    result = CompactTable()
+    name_indices: dict[int, int] = {}
+
+    try:
+        strings, offset = _read_strings(data)
+
+        (entry_count,) = _u16.unpack_from(data, offset)
+        offset += _u16.size
+
+        for _ in range(entry_count):
+            action, target, modifier_count = _entry.unpack_from(data, offset)
+            offset += _entry.size
+
+            key = (et.normalize(strings[action]), et.normalize(strings[target]))
+            if key in result.entries:
+                raise ValueError(f"Ambiguous entry {strings[action]}/{strings[target]}")
+
+            for _ in range(modifier_count):
+                parameter, operation, kind = _modifier.unpack_from(data, offset)
+                offset += _modifier.size
+
+                if operation >= len(BinaryOperations):
+                    raise ValueError(f"Unknown operation {operation}")
+                if kind not in BinaryKinds:
+                    raise ValueError(f"Corrupt effect table: invalid value kind {kind}")
+
+                if parameter not in name_indices:
+                    name_indices[parameter] = len(result.names)
+                    result.names.append(strings[parameter])
+
+                count = kind if kind > 0 else 1
+                result.parameters.append(name_indices[parameter])
+                result.operations.append(operation)
+                result.kinds.append(kind)
+                result.value_offsets.append(len(result.values))
+                result.values.extend(struct.unpack_from(f"<{count}d", data, offset))
+                offset += count * 8
+
+            result.entries[key] = len(result.offsets) - 1
+            result.offsets.append(len(result.operations))
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"Corrupt effect table: {e}") from e
+
+    return result
+
+
+def read_binary(path: Path) -> dict[str, dict[str, list[ParameterModifier]]]:
+    return parse_binary(path.read_bytes())
+
+
+def read(path: Path, fields: dict[str, type] | None = None) -> dict[str, dict[str, list[ParameterModifier]]]:
+    """
+    Read an effect table from either a CSV or a binary file, depending on the file's extension.
+
+    :param fields: If given, a mapping of parameter name to type that modifiers are checked
+                   against.
+    """
+    if path.suffix.lower() == ".csv":
+        return read_csv(path, fields)
+
+    table = read_binary(path)
+    if fields is not None:
+        check_table(table, fields)
+    return table
+
+
+@dataclasses.dataclass(frozen = True, kw_only = True)
+class EffectTable:
+    """
+    An effect table with its lookup index and compiled modifier programs.
+
+    Tables compiled from a CompactTable only keep the programs, their table and index are None.
+    """
+    table: dict[str, dict[str, list[ParameterModifier]]] | None
+    index: dict[tuple[str, str], list[ParameterModifier]] | None
+    programs: dict[Hashable, md.Program]
+
+    @classmethod
+    def compile(cls, table: dict[str, dict[str, list[ParameterModifier]]], slots: dict[str, int]) -> "EffectTable":
+        """
+        Validate and compile an effect table.
+
+        Raises ValueError if the table contains ambiguous names, unknown parameters or unknown
+        operations.
+        """
+        index = et.compile_table(table)
+        return cls(table = table, index = index, programs = md.compile_table(index, slots))
+
+    @classmethod
+    def compile_compact(cls, table: CompactTable, slots: dict[str, int]) -> "EffectTable":
+        """
+        Compile a CompactTable, without creating ParameterModifier objects.
+
+        Raises ValueError if the table contains unknown parameters.
+        """
+        return cls(table = None, index = None, programs = table.compile(slots))
+
+
+def load(path: Path, slots: dict[str, int], fields: dict[str, type] | None = None, *, compact: bool = False) -> EffectTable:
+    """
+    Read, validate and compile an effect table from a CSV or binary data file.
+
+    This does blocking IO and can take a while for large tables, so it should not be called on
+    the event loop.
+
+    :param fields: If given, a mapping of parameter name to type that modifiers are checked
+                   against, so values of the wrong type are rejected.
+    :param compact: Load binary files with parse_compact() and only keep the compiled programs.
+    """
+    if compact and path.suffix.lower() != ".csv":
+        table = parse_compact(path.read_bytes())
+        if fields is not None:
+            table.check(fields)
+        return EffectTable.compile_compact(table, slots)
+
+    return EffectTable.compile(read(path, fields), slots)
+
+
+class EffectTableWatcher(Component):
+    """
+    Loads the effect table from a data file and reloads it whenever the file changes.
+
+    Loading and compiling happens in a worker thread, in the background after the initial load,
+    so updates continue while a table is reloaded. Only once a table has been validated and
+    compiled is it passed to the callback, so a broken file is rejected and the previous table
+    stays in use.
+    """
+
+    def __init__(self, config: Config, *, slots: dict[str, int], fields: dict[str, type] | None = None, callback: Callable[[EffectTable], None]) -> None:
+        super().__init__(interval = config.poll_interval if config.path is not None else None)
+        self.__config = config
+        self.__slots = slots
+        self.__fields = fields
+        self.__callback = callback
+        self.__signature: tuple[int, int] | None = None
+        self.__reload_task: asyncio.Task | None = None
+        self.__reloads = 0
+        self.__rejected = 0
+
+    def stats(self) -> dict[str, Any]:
+        return super().stats() | {
+            "reloads": self.__reloads,
+            "rejected": self.__rejected,
+        }
+
+    @property
+    def reloading(self) -> bool:
+        return self.__reload_task is not None
+
+    async def start(self) -> None:
+        await super().start()
+        if self.__changed():
+            await self.reload()
+
+    async def stop(self) -> None:
+        if self.__reload_task is not None:
+            self.__reload_task.cancel()
+            self.__reload_task = None
+        await super().stop()
+
+    async def update(self, elapsed: float) -> None:
+        # A change while reloading is picked up by the next update after the reload.
+        if self.__reload_task is not None or not self.__changed():
+            return
+
+        self.__reload_task = asyncio.create_task(self.reload())
+        self.__reload_task.add_done_callback(self.__reloaded)
+
+    async def reload(self) -> bool:
+        path = self.__config.path
+        if path is None:
+            return False
+
+        try:
+            table = await asyncio.to_thread(load, path, self.__slots, self.__fields, compact = self.__config.compact)
+        except (OSError, ValueError, csv.Error) as e:
+            self.__rejected += 1
+            log.error(f"Rejected effect table {path}, keeping the current table:\n{e}")
+            return False
+        except Exception:
+            # A broken file must never take down the station, whatever goes wrong with it.
+            self.__rejected += 1
+            log.exception(f"Rejected effect table {path}, keeping the current table")
+            return False
+
+        self.__reloads += 1
+        log.info(f"Loaded effect table {path}")
+        self.__callback(table)
+        return True
+
+    def __changed(self) -> bool:
+        if self.__config.path is None:
+            return False
+
+        try:
+            stat = self.__config.path.stat()
+        except OSError:
+            return False
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self.__signature:
+            return False
+
+        self.__signature = signature
+        return True
+
+    def __reloaded(self, task: asyncio.Task) -> None:
+        if task is self.__reload_task:
+            self.__reload_task = None
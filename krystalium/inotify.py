@@ -0,0 +1,81 @@
+import ctypes
+import ctypes.util
+import os
+import struct
+from pathlib import Path
+
+
+# Event masks from <sys/inotify.h>.
+Attrib = 0x00000004
+MovedTo = 0x00000080
+Create = 0x00000100
+Delete = 0x00000200
+
+_event = struct.Struct("iIII")
+
+
+def _libc() -> ctypes.CDLL | None:
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno = True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+
+    return libc
+
+
+class Inotify:
+    """
+    A minimal wrapper around the Linux inotify API that watches a single directory.
+
+    The file descriptor is non-blocking, so it can be registered with an event loop and read
+    whenever it becomes readable.
+
+    Raises OSError if inotify is not available or the directory can not be watched.
+    """
+
+    def __init__(self, path: Path, mask: int) -> None:
+        libc = _libc()
+        if libc is None:
+            raise OSError("inotify is not available")
+
+        self.__fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.__fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+        if libc.inotify_add_watch(self.__fd, os.fsencode(path), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(self.__fd)
+            raise OSError(error, os.strerror(error), str(path))
+
+    def fileno(self) -> int:
+        return self.__fd
+
+    def read(self) -> list[tuple[int, str]]:
+        """
+        Read all pending events.
+
+        :return: A list of (mask, name) tuples.
+        """
+        try:
+            data = os.read(self.__fd, 65536)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + _event.size <= len(data):
+            _, mask, _, length = _event.unpack_from(data, offset)
+            offset += _event.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            events.append((mask, os.fsdecode(name)))
+
+        return events
+
+    def close(self) -> None:
+        if self.__fd >= 0:
+            os.close(self.__fd)
+            self.__fd = -1
@@ -0,0 +1,195 @@
+import dataclasses
+from typing import Any, Callable, Hashable, Iterable
+
+from .types import ParameterModifier
+
+
+Operation = Callable[[Any, Any, float], Any]
+
+
+def add(current: Any, value: Any, strength: float) -> Any:
+    return current + value * strength
+
+
+def mul(current: Any, value: Any, strength: float) -> Any:
+    return current * (value * (1.0 + strength / 2))
+
+
+def assign(current: Any, value: Any, strength: float) -> Any:
+    return value * strength
+
+
+def set_unscaled(current: Any, value: Any, strength: float) -> Any:
+    return value
+
+
+Operations: dict[str, Operation] = {
+    "add": add,
+    "mul": mul,
+    "set": assign,
+    "set_unscaled": set_unscaled,
+}
+
+
+@dataclasses.dataclass(frozen = True, slots = True)
+class Transform:
+    """
+    The combined effect of one or more operations on a single parameter.
+
+    This is either the affine transform `value * scale + offset` or, when overwrite is set, a
+    replacement of the value by offset. A scale or offset of None means the respective step is
+    skipped, so an identity transform does not touch the value at all.
+    """
+    scale: Any = None
+    offset: Any = None
+    overwrite: bool = False
+
+    def then(self, other: "Transform") -> "Transform":
+        """
+        Compose two transforms into one that is equivalent to applying this one and then other.
+        """
+        if other.overwrite:
+            return other
+
+        scale = self.scale
+        offset = self.offset
+
+        if other.scale is not None:
+            scale = other.scale if scale is None else scale * other.scale
+            if offset is not None:
+                offset = offset * other.scale
+
+        if other.offset is not None:
+            offset = other.offset if offset is None else offset + other.offset
+
+        return Transform(scale = scale, offset = offset, overwrite = self.overwrite)
+
+    def apply(self, value: Any) -> Any:
+        if self.overwrite:
+            return self.offset
+
+        if self.scale is not None:
+            value = value * self.scale
+        if self.offset is not None:
+            value = value + self.offset
+        return value
+
+
+# The transform equivalent to each operation, given the modifier's value and strength.
+Transforms: dict[Operation, Callable[[Any, float], Transform]] = {
+    add: lambda value, strength: Transform(offset = value * strength),
+    mul: lambda value, strength: Transform(scale = value * (1.0 + strength / 2)),
+    assign: lambda value, strength: Transform(offset = value * strength, overwrite = True),
+    set_unscaled: lambda value, strength: Transform(offset = value, overwrite = True),
+}
+
+
+def strength_scale(strength: int) -> float:
+    """
+    Convert an effect strength to the factor used to scale modifiers.
+    """
+    return 0.05 + ((strength - 2) / 10) * 0.95
+
+
+# Precomputed scale factors for the strengths used by samples and effects.
+StrengthTable: dict[int, float] = {strength: strength_scale(strength) for strength in range(2, 13)}
+
+
+def scale(strength: int) -> float:
+    factor = StrengthTable.get(strength)
+    return factor if factor is not None else strength_scale(strength)
+
+
+@dataclasses.dataclass(frozen = True, slots = True)
+class Program:
+    """
+    A list of modifiers compiled against a fixed set of parameter slots.
+
+    Each instruction is a (slot, operation, value) tuple, so applying a program does not involve
+    any name lookups.
+    """
+    instructions: tuple[tuple[int, Operation, Any], ...] = ()
+    _transforms: dict[int, dict[int, Transform]] = dataclasses.field(default_factory = dict, init = False, repr = False, compare = False)
+
+    def apply(self, values: list[Any], strength: int) -> None:
+        factor = scale(strength)
+        for slot, operation, value in self.instructions:
+            values[slot] = operation(values[slot], value, factor)
+
+    def transforms(self, strength: int) -> dict[int, Transform]:
+        """
+        Fold this program into a single transform per parameter slot.
+
+        The result is cached per strength and must not be modified.
+        """
+        if strength in self._transforms:
+            return self._transforms[strength]
+
+        factor = scale(strength)
+
+        result: dict[int, Transform] = {}
+        for slot, operation, value in self.instructions:
+            transform = Transforms[operation](value, factor)
+            result[slot] = result[slot].then(transform) if slot in result else transform
+
+        self._transforms[strength] = result
+        return result
+
+
+def fold(steps: Iterable[tuple[Program, int]]) -> dict[int, Transform]:
+    """
+    Fold a sequence of (program, strength) steps into a single transform per parameter slot.
+
+    Applying the result gives the same values as applying each program in turn, up to floating
+    point rounding. The transforms of each program are cached per strength, so the cost depends
+    on the number of programs and the parameters they touch rather than on their length.
+    """
+    result: dict[int, Transform] = {}
+    for program, strength in steps:
+        for slot, transform in program.transforms(strength).items():
+            result[slot] = result[slot].then(transform) if slot in result else transform
+
+    return result
+
+
+def apply_transforms(values: list[Any], transforms: dict[int, Transform]) -> None:
+    for slot, transform in transforms.items():
+        values[slot] = transform.apply(values[slot])
+
+
+def compile_modifiers(modifiers: list[ParameterModifier], slots: dict[str, int]) -> Program:
+    """
+    Compile a list of modifiers into a program.
+
+    :param modifiers: The modifiers to compile.
+    :param slots: A mapping of parameter name to the index of the parameter's value.
+
+    Raises ValueError if a modifier refers to an unknown parameter or operation.
+    """
+    instructions = []
+    for modifier in modifiers:
+        if modifier.parameter not in slots:
+            raise ValueError(f"Unknown parameter {modifier.parameter}")
+
+        if modifier.operation not in Operations:
+            raise ValueError(f"Unknown operation {modifier.operation} for parameter {modifier.parameter}")
+
+        instructions.append((slots[modifier.parameter], Operations[modifier.operation], modifier.value))
+
+    return Program(tuple(instructions))
+
+
+def compile_table(table: dict[Hashable, list[ParameterModifier]], slots: dict[str, int]) -> dict[Hashable, Program]:
+    """
+    Compile all modifier lists of a table into programs.
+
+    Raises ValueError if any of the lists can not be compiled, mentioning the entry it belongs to.
+    """
+    programs = {}
+    for key, modifiers in table.items():
+        try:
+            programs[key] = compile_modifiers(modifiers, slots)
+        except ValueError as e:
+            raise ValueError(f"Invalid modifiers for {key}: {e}") from e
+
+    return programs
@@ -34,14 +34,15 @@ class NumberInput(Component):
             self.__serial.set_callback(self.__process)
             log.info(f"Using serial device {self.__serial.name}")
 
-    def __process(self, line):
+    def __process(self, line) -> bool:
         try:
             value = int(line)
         except ValueError:
-            return
+            return False
 
         if value < 0 or value > 9:
-            return
+            return False
 
         self.__input_values.append(value)
         self.__last_input = time.perf_counter()
+        return True
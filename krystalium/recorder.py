@@ -0,0 +1,67 @@
+import datetime
+import time
+from pathlib import Path
+from typing import Iterator
+
+
+Header = "# krystalium serial recording"
+
+
+class Recorder:
+    """
+    Writes the raw lines received from a serial device to a log file.
+
+    Every line is stored as the time in seconds since the recording started, a space and the
+    line as it was received. Writes are buffered, flush() is called periodically by the device.
+    """
+
+    def __init__(self, path: Path, device: str) -> None:
+        path.parent.mkdir(parents = True, exist_ok = True)
+        self.__file = open(path, "wb")
+        self.__start = time.perf_counter()
+        self.__path = path
+
+        started = datetime.datetime.now().astimezone().isoformat(timespec = "seconds")
+        self.__file.write(f"{Header} {device} {started}\n".encode("utf-8"))
+
+    @property
+    def path(self) -> Path:
+        return self.__path
+
+    def record(self, data: bytes | memoryview) -> None:
+        self.__file.write(f"{time.perf_counter() - self.__start:.6f} ".encode("ascii"))
+        self.__file.write(bytes(data).replace(b"\n", b" "))
+        self.__file.write(b"\n")
+
+    def flush(self) -> None:
+        self.__file.flush()
+
+    def close(self) -> None:
+        self.__file.close()
+
+
+def read_log(path: Path) -> Iterator[tuple[float, bytes]]:
+    """
+    Read a log written by Recorder.
+
+    :return: An iterator of (time, line) tuples.
+
+    Raises ValueError if a line is malformed.
+    """
+    with open(path, "rb") as f:
+        for number, line in enumerate(f, 1):
+            if line.startswith(b"#"):
+                continue
+
+            timestamp, _, data = line.rstrip(b"\n").partition(b" ")
+            try:
+                yield float(timestamp), data
+            except ValueError:
+                raise ValueError(f"{path}:{number}: Invalid timestamp") from None
+
+
+def log_path(directory: Path, device: Path) -> Path:
+    """
+    The path of a new log for a device, named after the device and the current time.
+    """
+    return directory / f"{device.name}-{datetime.datetime.now():%Y%m%d-%H%M%S}.log"
@@ -1,117 +1,446 @@
+import asyncio
+import collections
+import dataclasses
+import enum
+import functools
 import logging
+from pathlib import Path
+from typing import Any, Callable
 
-from .api import BloodSample, RefinedSample, Effect
+import pydantic
+
+from .api import Api, BloodSample, RefinedSample, Effect
 from .component import Component
 
 
 log = logging.getLogger(__name__)
 
 
-def purity_to_int(purity: str) -> int:
-    match purity.upper():
-        case "POLLUTED": return 2
-        case "TARNISHED": return 3
-        case "DIRTY": return 4
-        case "BLEMISHED": return 5
-        case "IMPURE": return 6
-        case "UNBLEMISHED": return 7
-        case "LUCID": return 8
-        case "STAINLESS": return 9
-        case "PRISTINE": return 10
-        case "IMMACULATE": return 11
-        case "PERFECT": return 12
-        case _: raise RuntimeError(f"Unknown purity {purity}")
+Purities: dict[str, int] = {
+    "polluted": 2,
+    "tarnished": 3,
+    "dirty": 4,
+    "blemished": 5,
+    "impure": 6,
+    "unblemished": 7,
+    "lucid": 8,
+    "stainless": 9,
+    "pristine": 10,
+    "immaculate": 11,
+    "perfect": 12,
+}
+
+
+def purity_to_int(purity: str) -> int | None:
+    """
+    Convert a purity name to a sample strength, or None if the purity is not known.
+    """
+    return Purities.get(purity.lower())
+
+
+class Kind(enum.Enum):
+    TagFound = enum.auto()
+    TagLost = enum.auto()
+    Traits = enum.auto()
+    Name = enum.auto()
+
+
+# Message prefixes of the reader protocol, without the colon.
+Prefixes: dict[str, Kind] = {
+    "tag found": Kind.TagFound,
+    "tag lost": Kind.TagLost,
+    "traits": Kind.Traits,
+    "name": Kind.Name,
+}
+
+
+@dataclasses.dataclass(frozen = True, slots = True)
+class Message:
+    """
+    The result of parsing a single line from a reader.
+
+    kind is None if the line could not be parsed. A line that was recognised but has an invalid
+    sample keeps its kind and rfid_id and only lacks the sample. error is one of a fixed set of
+    reasons, detail has the offending part of the line.
+    """
+    kind: Kind | None
+    rfid_id: str = ""
+    sample: BloodSample | RefinedSample | None = None
+    name: str = ""
+    error: str | None = None
+    detail: str = ""
+
+
+class ParseError(ValueError):
+    def __init__(self, reason: str, detail: str = "") -> None:
+        super().__init__(f"{reason} {detail}".strip())
+        self.reason = reason
+        self.detail = detail
+
+
+def parse_strength(parts: list[str]) -> int:
+    if len(parts) < 6:
+        raise ParseError("insufficient parts", " ".join(parts))
+
+    strength = purity_to_int(parts[5])
+    if strength is None:
+        raise ParseError("unknown purity", parts[5])
+
+    return strength
+
+
+def parse_blood_sample(rfid_id: str, parts: list[str]) -> BloodSample:
+    strength = parse_strength(parts)
+
+    return BloodSample(
+        id = -1,
+        rfid_id = rfid_id,
+        strength = strength,
+        effect = Effect(
+            id = -1,
+            name = "Blood Sample Effect",
+            strength = -1,
+            action = parts[0],
+            target = parts[1],
+        )
+    )
+
+
+def parse_refined_sample(rfid_id: str, parts: list[str]) -> RefinedSample:
+    strength = parse_strength(parts)
+
+    return RefinedSample(
+        id = -1,
+        rfid_id = rfid_id,
+        strength = strength,
+        primary_action = parts[0],
+        primary_target = parts[1],
+        secondary_action = parts[2],
+        secondary_target = parts[3],
+    )
+
+
+# Parsers for the sample types, taking the tag ID and the parts after the sample type. They raise
+# ParseError if the sample is invalid.
+SampleParsers: dict[str, Callable[[str, list[str]], BloodSample | RefinedSample]] = {
+    "blood": parse_blood_sample,
+    "refined": parse_refined_sample,
+}
+
+
+@functools.lru_cache(maxsize = 256)
+def parse_line(line: str) -> Message:
+    """
+    Parse a line of the reader protocol.
+
+    This never raises. Readers repeat the same lines while a tag is present, so results are
+    cached.
+    """
+    prefix, separator, rest = line.partition(":")
+    kind = Prefixes.get(prefix) if separator else None
+    if kind is None:
+        return Message(None, error = "unknown message", detail = prefix)
+
+    rest = rest.strip()
+    if kind == Kind.Name:
+        return Message(kind, name = rest)
+
+    parts = rest.split()
+    if kind == Kind.TagLost:
+        return Message(kind, rfid_id = parts[0] if parts else "")
+
+    if len(parts) <= 2:
+        return Message(kind, error = "no sample", detail = rest)
+
+    rfid_id = parts[0]
+    sample_parser = SampleParsers.get(parts[1])
+    if sample_parser is None:
+        return Message(kind, rfid_id = rfid_id, error = "unsupported sample", detail = parts[1])
+
+    try:
+        sample = sample_parser(rfid_id, parts[2:])
+    except ParseError as e:
+        return Message(kind, rfid_id = rfid_id, error = e.reason, detail = e.detail)
+    except Exception as e:
+        return Message(kind, rfid_id = rfid_id, error = "invalid sample", detail = str(e))
+
+    return Message(kind, rfid_id = rfid_id, sample = sample)
+
+
+def sample_traits(sample: BloodSample | RefinedSample) -> tuple:
+    """
+    The parts of a sample that are stored on its tag.
+    """
+    if isinstance(sample, BloodSample):
+        return (sample.strength, sample.effect.action, sample.effect.target)
+
+    return (sample.strength, sample.primary_action, sample.primary_target, sample.secondary_action, sample.secondary_target)
+
+
+class Role(enum.StrEnum):
+    # The reader accepts any kind of sample.
+    Any = "any"
+    # The reader is the slot for blood samples.
+    Blood = "blood"
+    # The reader is the slot for refined krystal samples.
+    Krystal = "krystal"
+
+
+@pydantic.dataclasses.dataclass(kw_only = True, frozen = True)
+class Config:
+    # Roles of readers, keyed by device name, /dev/serial/by-id link or device path. Readers that
+    # are not listed get the Any role.
+    roles: dict[str, Role] = pydantic.Field(default_factory = dict)
+    # Look up samples in the backend as soon as a tag is seen and use the backend's records
+    # instead of the data on the tag once they arrive.
+    lookup: bool = True
+
+
+@dataclasses.dataclass(kw_only = True)
+class Reader:
+    """
+    The tag state of a single RFID reader.
+    """
+    path: Path
+    name: str
+    role: Role = Role.Any
+    rfid_id: str = ""
+    blood_sample: BloodSample | None = None
+    refined_sample: RefinedSample | None = None
+    # The raw payload of the last tag report, to skip reports that did not change.
+    payload: str = ""
+    # The number of times the samples of this reader changed.
+    changes: int = 0
+
+    def accepts(self, kind: str) -> bool:
+        match self.role:
+            case Role.Any: return True
+            case Role.Blood: return kind == "blood"
+            case Role.Krystal: return kind == "refined"
+
+        return False
+
+    def clear(self) -> bool:
+        """
+        Forget the current tag.
+
+        :return: Whether the reader had a sample.
+        """
+        changed = self.blood_sample is not None or self.refined_sample is not None
+        self.rfid_id = ""
+        self.blood_sample = None
+        self.refined_sample = None
+        self.payload = ""
+        return changed
 
 
 class Rfid(Component):
-    def __init__(self) -> None:
+    """
+    Tracks the samples on any number of RFID readers.
+
+    Every reader has its own tag state, so tags found or lost on one reader do not affect the
+    others. Readers can be given a role to restrict them to a single kind of sample.
+
+    Readers keep reporting a tag while it is present. Reports with the same payload as the
+    previous one are skipped before parsing, and the changed callback is only called when the
+    samples of a reader actually change.
+
+    When an Api is given, every new sample is looked up in the backend in the background. Until
+    the lookup returns the sample built from the tag data is used, after that the backend record
+    replaces it.
+    """
+
+    def __init__(self, config: Config | None = None, *, api: Api | None = None) -> None:
         super().__init__()
-        self.__blood_sample: BloodSample | None = None
-        self.__refined_sample: RefinedSample | None = None
+        self.__config = config if config is not None else Config()
+        self.__api = api if self.__config.lookup else None
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__lookups: dict[Path, asyncio.Task] = {}
+        self.__lookup_results: collections.Counter[str] = collections.Counter()
+        self.__readers: dict[Path, Reader] = {}
+        self.__lines = 0
+        self.__errors: collections.Counter[str] = collections.Counter()
+        self.__duplicates = 0
+        self.__changes = 0
+        self.__changed_callback: Callable[[Reader], None] | None = None
+
+    def stats(self) -> dict[str, Any]:
+        return super().stats() | {
+            "readers": len(self.__readers),
+            "lines": self.__lines,
+            "errors": dict(self.__errors),
+            "duplicates": self.__duplicates,
+            "changes": self.__changes,
+            "lookups": dict(self.__lookup_results),
+        }
+
+    async def start(self) -> None:
+        self.__loop = asyncio.get_running_loop()
+        await super().start()
+
+    async def stop(self) -> None:
+        for task in self.__lookups.values():
+            task.cancel()
+        self.__lookups.clear()
+        await super().stop()
+
+    @property
+    def changes(self) -> int:
+        """
+        The number of times the samples of any reader changed.
+        """
+        return self.__changes
+
+    def set_changed_callback(self, callback: Callable[[Reader], None] | None) -> None:
+        self.__changed_callback = callback
+
+    @property
+    def readers(self) -> list[Reader]:
+        return list(self.__readers.values())
 
     @property
-    def rfid_id(self):
-        return self.__rfid_id
+    def rfid_id(self) -> str:
+        """
+        The ID of the most recently added reader that currently has a tag.
+        """
+        for reader in reversed(self.__readers.values()):
+            if reader.rfid_id:
+                return reader.rfid_id
+        return ""
 
     @property
     def blood_sample(self) -> BloodSample | None:
-        return self.__blood_sample
+        for reader in self.__readers.values():
+            if reader.blood_sample is not None:
+                return reader.blood_sample
+        return None
 
     @property
     def refined_sample(self) -> RefinedSample | None:
-        return self.__refined_sample
+        for reader in self.__readers.values():
+            if reader.refined_sample is not None:
+                return reader.refined_sample
+        return None
+
+    def reader(self, device) -> Reader | None:
+        return self.__readers.get(device.path)
 
     def add_device(self, device) -> None:
-        device.set_callback(self.__process)
-        log.info(f"Added serial device {device.name}")
+        roles = self.__config.roles
+        role = roles.get(device.device_name, roles.get(str(device.stable_path), roles.get(str(device.path), Role.Any)))
+        reader = Reader(path = device.path, name = device.device_name, role = role)
+        self.__readers[device.path] = reader
+
+        device.set_callback(lambda line: self.__process(reader, line))
+        log.info(f"Added serial device {device.name} as {role} reader")
 
     def remove_device(self, device) -> None:
         device.set_callback(None)
+        self.__readers.pop(device.path, None)
+
+        lookup = self.__lookups.pop(device.path, None)
+        if lookup is not None:
+            lookup.cancel()
+
+    def __process(self, reader: Reader, line: str) -> bool:
+        self.__lines += 1
+
+        prefix, _, payload = line.partition(":")
+        if payload == reader.payload and Prefixes.get(prefix) in (Kind.TagFound, Kind.Traits):
+            self.__duplicates += 1
+            return True
 
-    def __process(self, line):
-        if line.startswith("tag found:"):
-            self.__handle_tag(line.replace("tag found: ", ""))
-        elif line.startswith("tag lost:"):
-            log.debug(f"Lost tag {self.__rfid_id}")
-            if self.__blood_sample and self.__blood_sample.rfid_id == self.__rfid_id:
-                self.__blood_sample = None
-            if self.__refined_sample and self.__refined_sample.rfid_id == self.__rfid_id:
-                self.__refined_sample = None
-            self.__rfid_id = ""
-        elif line.startswith("traits: "):
-            self.__handle_tag(line.replace("traits: ", ""))
-
-    def __handle_tag(self, line: str):
-        parts = line.split(" ")
-        if len(parts) <= 2:
+        message = parse_line(line)
+
+        if message.error is not None:
+            self.__errors[message.error] += 1
+            log.debug(f"Could not parse \"{line}\" from {reader.name}: {message.error} {message.detail}")
+
+        match message.kind:
+            case Kind.TagFound | Kind.Traits:
+                self.__handle_tag(reader, message, payload)
+            case Kind.TagLost:
+                log.debug(f"Lost tag {reader.rfid_id} on {reader.name}")
+                if reader.clear():
+                    self.__changed(reader)
+
+        return message.kind is not None
+
+    def __handle_tag(self, reader: Reader, message: Message, payload: str) -> None:
+        if not message.rfid_id:
             return
 
-        self.__rfid_id = parts[0]
-
-        match parts[1]:
-            case "raw":
-                log.warning("Raw samples are not supported")
-            case "refined":
-                self.__handle_refined_sample(parts[2:])
-            case "blood":
-                self.__handle_blood_sample(parts[2:])
-            case _:
-                log.warning(f"Unrecognised sample {parts[1]} detected")
-
-    def __handle_refined_sample(self, parts: list[str]) -> None:
-        if len(parts) < 6:
-            log.debug("Insufficient parts for refined sample")
+        reader.rfid_id = message.rfid_id
+        reader.payload = payload
+
+        match message.sample:
+            case BloodSample() as sample if reader.accepts("blood"):
+                if sample != reader.blood_sample:
+                    reader.blood_sample = sample
+                    log.debug(f"Found tag with blood sample on {reader.name}: {sample}")
+                    self.__changed(reader)
+                    self.__request_lookup(reader, sample)
+            case RefinedSample() as sample if reader.accepts("refined"):
+                if sample != reader.refined_sample:
+                    reader.refined_sample = sample
+                    log.debug(f"Found tag with refined sample on {reader.name}: {sample}")
+                    self.__changed(reader)
+                    self.__request_lookup(reader, sample)
+            case None:
+                pass
+            case sample:
+                log.warning(f"Ignoring {type(sample).__name__} on {reader.role} reader {reader.name}")
+
+    def __changed(self, reader: Reader) -> None:
+        reader.changes += 1
+        self.__changes += 1
+        if self.__changed_callback:
+            self.__changed_callback(reader)
+
+    def __request_lookup(self, reader: Reader, sample: BloodSample | RefinedSample) -> None:
+        if self.__api is None or self.__loop is None:
             return
 
-        self.__refined_sample = RefinedSample(
-            id = -1,
-            rfid_id = self.__rfid_id,
-            strength = purity_to_int(parts[5]),
-            primary_action = parts[0],
-            primary_target = parts[1],
-            secondary_action = parts[2],
-            secondary_target = parts[3],
-        )
+        previous = self.__lookups.pop(reader.path, None)
+        if previous is not None:
+            previous.cancel()
 
-        log.debug(f"Found tag with refined sample: {self.__refined_sample}")
+        self.__lookups[reader.path] = self.__loop.create_task(self.__lookup(reader, sample))
 
-    def __handle_blood_sample(self, parts: list[str]) -> None:
-        if len(parts) < 6:
-            log.debug("Insufficient parts for blood sample")
+    async def __lookup(self, reader: Reader, sample: BloodSample | RefinedSample) -> None:
+        try:
+            if isinstance(sample, BloodSample):
+                record = await self.__api.get_blood_sample(sample.rfid_id)
+            else:
+                record = await self.__api.get_refined_sample(sample.rfid_id)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            log.warning(f"Could not look up sample {sample.rfid_id}", exc_info = True)
+            self.__lookup_results["failed"] += 1
             return
+        finally:
+            if self.__lookups.get(reader.path) is asyncio.current_task():
+                del self.__lookups[reader.path]
 
-        self.__blood_sample = BloodSample(
-            id = -1,
-            rfid_id = self.__rfid_id,
-            # strength = int(parts[2]),
-            strength = purity_to_int(parts[5]),
-            effect = Effect(
-                id = -1,
-                name = "Blood Sample Effect",
-                strength = -1,
-                action = parts[0],
-                target = parts[1],
-            )
-        )
+        if record is None:
+            log.warning(f"Sample {sample.rfid_id} on {reader.name} is not known to the backend, using tag data")
+            self.__lookup_results["unknown"] += 1
+            return
+
+        if reader.blood_sample is not sample and reader.refined_sample is not sample:
+            # The tag was removed or replaced while looking it up.
+            self.__lookup_results["stale"] += 1
+            return
+
+        if sample_traits(record) != sample_traits(sample):
+            log.info(f"Backend corrected sample {sample.rfid_id} from {sample_traits(sample)} to {sample_traits(record)}")
+            self.__lookup_results["corrected"] += 1
+        else:
+            self.__lookup_results["verified"] += 1
 
-        log.debug(f"Found tag with blood sample: {self.__blood_sample}")
+        if isinstance(record, BloodSample):
+            reader.blood_sample = record
+        else:
+            reader.refined_sample = record
+        self.__changed(reader)
@@ -1,14 +1,22 @@
 # from typing import List, Callable, Dict
 from pathlib import Path
-from typing import Callable
+from typing import Any, Callable
+import asyncio
+import collections
+import fnmatch
 import logging
-import threading
+import os
+import struct
+import time
 
 import pydantic
 import serial
-from serial import SerialException
+from serial.tools import list_ports_linux
 
 from .component import Component
+from . import inotify
+from .stats import Histogram
+from .recorder import Recorder, log_path
 
 
 log = logging.getLogger(__name__)
@@ -19,115 +27,606 @@ class Config:
     baud_rate: int = 115200
     root_path: Path = pydantic.Field(default_factory = Path)
     patterns: list[str] = pydantic.Field(default_factory = list)
+    # Longer lines are assumed to be garbage and dropped.
+    max_line_length: int = 1024
+    # Commands to a device are dropped while more than this many bytes are waiting to be written
+    # to it, so a stalled device can not make its queue grow without bounds.
+    max_write_buffer: int = 4096
+    # Allow devices to switch to length-prefixed binary frames.
+    frames: bool = True
+    # Delay before the first repeated NAME request, doubled after every request up to
+    # max_probe_delay.
+    probe_delay: float = 0.1
+    max_probe_delay: float = 2.0
+    # Directory to record all lines received from devices to, for replaying them with replay.py.
+    record_path: Path | None = None
+    # Watch root_path for new devices with inotify. When that is not possible, root_path is
+    # scanned every poll_interval seconds instead.
+    hotplug: bool = True
+    poll_interval: float = 5.0
+    # Directory with stable links to serial devices. Devices that have a link in there are
+    # identified by it, so their path does not change when they are plugged in elsewhere.
+    by_id_path: Path | None = Path("/dev/serial/by-id")
+
+
+# Binary frames are a start byte followed by the payload length and the payload, which is the
+# same text that would otherwise be sent as a line.
+FrameStart = 0x02
+FrameHeader = struct.Struct("<BH")
 
 
 class Serial(Component):
-    def __init__(self, *, path: Path, baud_rate: int = 115200, controller):
-        super().__init__(name = f"Serial@{path}")
+    """
+    A serial device that is read line by line on the event loop.
+
+    The file descriptor of the device is registered with the event loop, which reads whatever is
+    available whenever the device becomes readable and splits it into lines. No thread is
+    needed per device and callbacks are called on the event loop.
+
+    Until the device has identified itself, NAME requests are sent with an exponentially growing
+    delay, starting at probe_delay and up to max_probe_delay. When the name of the device is
+    already known from an earlier connection, it is identified right away and a single NAME
+    request verifies the name. A device that
+    answers with a "+frames" capability after its name, like "name: rfid-1 +frames", is sent
+    FRAMES and from then on may send length-prefixed frames instead of lines.
+
+    Commands to the device are queued with send() and written without blocking once the event
+    loop is idle, with everything queued by then combined into a single write. A command sent
+    with a key replaces a queued command with the same key that has not been written yet, so
+    only the latest state is sent when commands arrive faster than the device accepts them.
+    """
+
+    ReadSize = 65536
+
+    def __init__(self, *, path: Path, stable_path: Path | None = None, baud_rate: int = 115200, max_line_length: int = 1024, max_write_buffer: int = 4096, frames: bool = True, probe_delay: float = 0.1, max_probe_delay: float = 2.0, known_name: str | None = None, controller):
+        super().__init__(name = f"Serial@{stable_path or path}", interval = 1)
         self.__controller = controller
         self.__baud_rate: int = baud_rate
         self.__path: Path = path
-        self.__callback: Callable[[str], None] | None = None
-        self.__device_name = ""
+        self.__stable_path: Path = stable_path or path
+        self.__max_line_length = max_line_length
+        self.__allow_frames = frames
+        self.__recorder: Recorder | None = None
+        self.__callback: Callable[[str], bool | None] | None = None
+        self.__device_name = known_name or ""
         self.__serial: serial.Serial | None = None
+        self.__loop: asyncio.AbstractEventLoop | None = None
+
+        self.__probe_delay = probe_delay
+        self.__max_probe_delay = max_probe_delay
+        self.__probe_handle: asyncio.TimerHandle | None = None
+        # Whether the device answered a NAME request.
+        self.__verified = False
+        self.__probes = 0
+        self.__started = 0.0
+        self.__identify_time: float | None = None
+
+        self.__chunk = bytearray(self.ReadSize)
+        self.__pending = bytearray()
+        # Position in pending up to which there is no line break, so it is not searched again.
+        self.__scanned = 0
+        # Drop everything up to the next line break.
+        self.__discarding = False
+        # Number of bytes of an overlong frame that still need to be dropped.
+        self.__skip = 0
+        self.__frames = False
+
+        self.__max_write_buffer = max_write_buffer
+        # Commands that still need to be written, in order, keyed by their key or a sequence
+        # number for commands without one. Each has the time it was first queued.
+        self.__outbox: dict[Any, tuple[bytes, float]] = {}
+        self.__outbox_size = 0
+        self.__sequence = 0
+        # Data of an earlier write that did not fit and the queue times of its commands.
+        self.__unsent = bytearray()
+        self.__unsent_times: list[float] = []
+        self.__flush_handle: asyncio.Handle | None = None
+        self.__writing = False
+
+        self.__bytes = 0
+        self.__lines = 0
+        self.__frame_count = 0
+        self.__overflows = 0
+        self.__commands = 0
+        self.__coalesced = 0
+        self.__dropped_commands = 0
+        self.__writes = 0
+        self.__bytes_written = 0
+        self.__write_latency = Histogram()
+        self.__decode_errors = 0
+        self.__unknown_lines = 0
+        self.__callback_time = Histogram()
+        # Bytes and lines per second over the last update interval.
+        self.__rate_counts = (0, 0)
+        self.__byte_rate = 0.0
+        self.__line_rate = 0.0
+
+    def stats(self) -> dict[str, Any]:
+        return super().stats() | {
+            "device_name": self.__device_name,
+            "bytes": self.__bytes,
+            "lines": self.__lines,
+            "frames": self.__frame_count,
+            "bytes_per_second": self.__byte_rate,
+            "lines_per_second": self.__line_rate,
+            "overflows": self.__overflows,
+            "decode_errors": self.__decode_errors,
+            "unknown_lines": self.__unknown_lines,
+            "callback": self.__callback_time.to_dict(),
+            "commands": self.__commands,
+            "coalesced": self.__coalesced,
+            "dropped_commands": self.__dropped_commands,
+            "writes": self.__writes,
+            "bytes_written": self.__bytes_written,
+            "write_queue": self.__outbox_size + len(self.__unsent),
+            "write_latency": self.__write_latency.to_dict(),
+            "probes": self.__probes,
+            "identify_time": self.__identify_time,
+        }
 
     @property
     def path(self):
         return self.__path
 
+    @property
+    def stable_path(self) -> Path:
+        """
+        The /dev/serial/by-id link of this device if it has one, otherwise its path.
+        """
+        return self.__stable_path
+
     @property
     def device_name(self):
         return self.__device_name
 
-    def set_callback(self, callback: Callable[[str], None] | None) -> None:
+    @property
+    def verified(self) -> bool:
+        """
+        Whether the device itself reported its name, rather than it being known from before.
+        """
+        return self.__verified
+
+    @property
+    def frames(self) -> bool:
+        """
+        Whether binary frames were negotiated with the device.
+        """
+        return self.__frames
+
+    def set_callback(self, callback: Callable[[str], bool | None] | None) -> None:
+        """
+        Set the function that handles lines from this device.
+
+        The callback may return False to indicate it did not recognise a line, which is counted
+        as an unknown line.
+        """
         self.__callback = callback
 
+    def send(self, command: str, *, key: Any = None) -> bool:
+        """
+        Queue a command line for the device.
+
+        :param key: Replace the queued command with the same key, if it was not written yet.
+        :return: False when the command was dropped because the device is not connected or too
+                 much data is waiting to be written to it.
+        """
+        return self.__queue(f"{command}\n".encode("utf-8"), key)
+
+    def set_recorder(self, recorder: Recorder | None) -> None:
+        """
+        Record all lines received from now on. The recorder is closed with the device.
+        """
+        if self.__recorder:
+            self.__recorder.close()
+        self.__recorder = recorder
+
     async def start(self) -> None:
-        self.__thread = threading.Thread(target = self.__read, daemon = True)
-        self.__thread.start()
+        self.__loop = asyncio.get_running_loop()
+        self.__serial = serial.Serial(str(self.__path), baudrate = self.__baud_rate, timeout = 0)
+        self.__loop.add_reader(self.__serial.fileno(), self.__read)
+        self.__started = time.perf_counter()
+
+        if self.__device_name:
+            log.debug(f"Reattaching {self.name} as {self.__device_name}")
+            self.__controller.device_identified(self)
+
+        self.__probe()
 
     async def stop(self) -> None:
+        self.__close()
+
+    async def update(self, elapsed: float) -> None:
+        if elapsed > 0:
+            previous_bytes, previous_lines = self.__rate_counts
+            self.__byte_rate = (self.__bytes - previous_bytes) / elapsed
+            self.__line_rate = (self.__lines - previous_lines) / elapsed
+            self.__rate_counts = (self.__bytes, self.__lines)
+
+        if self.__recorder:
+            self.__recorder.flush()
+
+    def __close(self) -> None:
+        if self.__probe_handle:
+            self.__probe_handle.cancel()
+            self.__probe_handle = None
+
+        if self.__flush_handle:
+            self.__flush_handle.cancel()
+            self.__flush_handle = None
+
+        self.__outbox.clear()
+        self.__outbox_size = 0
+        self.__unsent.clear()
+        self.__unsent_times.clear()
+
         if self.__serial:
+            self.__loop.remove_reader(self.__serial.fileno())
+            if self.__writing:
+                self.__loop.remove_writer(self.__serial.fileno())
+                self.__writing = False
             self.__serial.close()
             self.__serial = None
-        self.__thread.join()
 
-    def __read(self):
-        self.__serial = serial.Serial(str(self.__path), baudrate = self.__baud_rate, timeout = 1)
+        if self.__recorder:
+            self.__recorder.close()
+            self.__recorder = None
+
+    def __lost(self) -> None:
+        self.__close()
+        self.__controller.device_lost(self)
+
+    def __queue(self, data: bytes, key: Any) -> bool:
+        if not self.__serial:
+            self.__dropped_commands += 1
+            return False
+
+        if key is None:
+            self.__sequence += 1
+            key = self.__sequence
+
+        previous = self.__outbox.get(key)
+        size = self.__outbox_size + len(self.__unsent) + len(data) - (len(previous[0]) if previous else 0)
+        if size > self.__max_write_buffer:
+            self.__dropped_commands += 1
+            return False
+
+        self.__commands += 1
+        if previous:
+            # Keep the position and queue time of the superseded command.
+            self.__coalesced += 1
+            self.__outbox[key] = (data, previous[1])
+            self.__outbox_size += len(data) - len(previous[0])
+        else:
+            self.__outbox[key] = (data, time.perf_counter())
+            self.__outbox_size += len(data)
+
+        # Wait for the device to accept more when a write is pending, otherwise write once
+        # everything that is ready on the event loop has had the chance to queue commands.
+        if not self.__writing and not self.__flush_handle:
+            self.__flush_handle = self.__loop.call_soon(self.__flush)
+        return True
+
+    def __flush(self) -> None:
+        self.__flush_handle = None
+        if not self.__serial:
+            return
 
-        while serial:
-            try:
-                if not self.__device_name:
-                    self.__serial.write(b"NAME\n")
+        for data, queued in self.__outbox.values():
+            self.__unsent += data
+            self.__unsent_times.append(queued)
+        self.__outbox.clear()
+        self.__outbox_size = 0
+
+        try:
+            count = os.write(self.__serial.fileno(), self.__unsent)
+        except BlockingIOError:
+            count = 0
+        except OSError:
+            self.__lost()
+            return
+
+        self.__writes += 1
+        self.__bytes_written += count
+        del self.__unsent[:count]
+
+        if self.__unsent:
+            if not self.__writing:
+                self.__loop.add_writer(self.__serial.fileno(), self.__flush)
+                self.__writing = True
+            return
+
+        if self.__writing:
+            self.__loop.remove_writer(self.__serial.fileno())
+            self.__writing = False
+
+        now = time.perf_counter()
+        for queued in self.__unsent_times:
+            self.__write_latency.record(now - queued)
+        self.__unsent_times.clear()
+
+    def __probe(self) -> None:
+        self.__probe_handle = None
+        if self.__verified or not self.__serial:
+            return
+
+        self.__probes += 1
+        # Nothing else is sent before a device has identified itself, so there is nothing to wait
+        # for to combine the request with.
+        if self.__queue(b"NAME\n", "name") and self.__flush_handle:
+            self.__flush_handle.cancel()
+            self.__flush()
+        if not self.__serial:
+            return
+
+        # A known device only needs a single request to verify its name.
+        if self.__device_name:
+            return
+
+        self.__probe_handle = self.__loop.call_later(self.__probe_delay, self.__probe)
+        self.__probe_delay = min(self.__probe_delay * 2, self.__max_probe_delay)
+
+    def __read(self) -> None:
+        try:
+            count = os.readv(self.__serial.fileno(), [self.__chunk])
+        except BlockingIOError:
+            return
+        except OSError:
+            self.__lost()
+            return
+
+        if count == 0:
+            self.__lost()
+            return
+
+        self.__bytes += count
+        pending = self.__pending
+        pending += memoryview(self.__chunk)[:count]
+
+        start = self.__split(pending)
+        if start:
+            del pending[:start]
+
+        if start and self.__serial:
+            self.__controller.data_received(self)
+
+    def __split(self, pending: bytearray) -> int:
+        """
+        Handle all complete lines and frames in pending.
+
+        :return: The number of bytes that were consumed.
+        """
+        start = 0
+        size = len(pending)
+        partial_line = False
+
+        with memoryview(pending) as view:
+            while start < size:
+                if self.__skip:
+                    skipped = min(self.__skip, size - start)
+                    self.__skip -= skipped
+                    start += skipped
+                    continue
 
-                line = self.__serial.readline()
-                line = line.decode("utf-8").rstrip().lower()
+                if self.__frames and pending[start] == FrameStart:
+                    if size - start < FrameHeader.size:
+                        break
 
-                if not line:
+                    _, length = FrameHeader.unpack_from(pending, start)
+                    start += FrameHeader.size
+                    if length > self.__max_line_length:
+                        self.__overflows += 1
+                        self.__skip = length
+                        continue
+
+                    if size - start < length:
+                        start -= FrameHeader.size
+                        break
+
+                    self.__frame_count += 1
+                    self.__handle_line(view[start:start + length])
+                    start += length
                     continue
 
-                if line.startswith("name:"):
-                    self.__device_name = line.replace("name: ", "")
-                    self.__controller.device_identified(self)
-                elif self.__callback:
-                    self.__callback(line)
-            except SerialException:
-                self.__controller.device_lost(self)
-                break
-            except Exception:
-                log.exception("Unexpected exception reading serial")
-                self.__controller.device_lost(self)
-                break
+                end = pending.find(b"\n", max(start, self.__scanned))
+                if end < 0:
+                    partial_line = True
+                    break
+
+                if self.__discarding:
+                    self.__discarding = False
+                elif end - start > self.__max_line_length:
+                    self.__overflows += 1
+                else:
+                    self.__handle_line(view[start:end])
+                start = end + 1
+
+        self.__scanned = 0
+        if partial_line:
+            if self.__discarding:
+                start = size
+            elif size - start > self.__max_line_length:
+                self.__overflows += 1
+                self.__discarding = True
+                start = size
+            else:
+                self.__scanned = size - start
+
+        return start
+
+    def __handle_line(self, data: memoryview) -> None:
+        if self.__recorder:
+            self.__recorder.record(data)
+
+        # Lines are only decoded when someone is interested in them.
+        if self.__verified and not self.__callback:
+            self.__lines += 1
+            self.__unknown_lines += 1
+            return
+
+        try:
+            line = str(data, "utf-8")
+        except UnicodeDecodeError:
+            self.__decode_errors += 1
+            line = str(data, "utf-8", "replace")
+
+        line = line.rstrip().lower()
+        if not line:
+            return
+
+        if line.startswith("name:"):
+            self.__identified(line[5:].split())
+            return
+
+        self.__lines += 1
+        if not self.__callback:
+            self.__unknown_lines += 1
+            return
+
+        start = time.perf_counter()
+        try:
+            if self.__callback(line) is False:
+                self.__unknown_lines += 1
+        except Exception:
+            log.exception(f"Unexpected exception handling line from {self.name}")
+        self.__callback_time.record(time.perf_counter() - start)
+
+    def __identified(self, parts: list[str]) -> None:
+        capabilities = {part[1:] for part in parts if part.startswith("+")}
+        name = " ".join(part for part in parts if not part.startswith("+"))
+
+        if self.__probe_handle:
+            self.__probe_handle.cancel()
+            self.__probe_handle = None
+
+        if self.__device_name and name != self.__device_name:
+            # The remembered name was wrong or the device changed. Drop it, it is started again on
+            # the next scan and then identified from scratch.
+            log.warning(f"{self.name} identified as {name} instead of {self.__device_name}")
+            self.__lost()
+            return
+
+        was_identified = bool(self.__device_name)
+        self.__device_name = name
+        self.__verified = True
+        if self.__identify_time is None:
+            self.__identify_time = time.perf_counter() - self.__started
+
+        if "frames" in capabilities and self.__allow_frames and not self.__frames:
+            self.__frames = True
+            self.__queue(b"FRAMES\n", "frames")
+            log.debug(f"Using binary frames for {self.name}")
+
+        if not was_identified:
+            self.__controller.device_identified(self)
 
 
 class SerialController(Component):
+    """
+    Finds serial devices matching the configured patterns and starts them.
+
+    New devices are picked up through inotify on the root path as soon as they appear, with a
+    scan every poll_interval seconds as fallback when inotify can not be used.
+
+    stats() contains the statistics of every device, keyed by its path, and counts how often
+    devices were lost and reconnected.
+    """
+
     def __init__(self, *, config: Config):
-        super().__init__(interval = 5)
+        super().__init__(interval = config.poll_interval)
         self.__config = config
         self.__devices: dict[Path, Serial] = {}
         self.__devices_to_remove: list[Serial] = []
+        self.__watcher: inotify.Inotify | None = None
+        self.__scan_requested = True
+        # Names of devices seen before, keyed by their identity.
+        self.__identities: dict[str, str] = {}
+        self.__device_identities: dict[Path, str] = {}
+
+        self.__scans = 0
+        self.__start_failures = 0
+        self.__lost = 0
+        self.__connections: collections.Counter[str] = collections.Counter()
 
         self.__device_added_callback: Callable[[Serial], None] | None = None
         self.__device_removed_callback: Callable[[Serial], None] | None = None
+        self.__data_received_callback: Callable[[Serial], None] | None = None
 
-    def set_callbacks(self, device_added: Callable[[Serial], None], device_removed: Callable[[Serial], None]) -> None:
+    @property
+    def watching(self) -> bool:
+        """
+        Whether new devices are detected with inotify rather than by polling.
+        """
+        return self.__watcher is not None
+
+    @property
+    def devices(self) -> list[Serial]:
+        return list(self.__devices.values())
+
+    def set_callbacks(self, device_added: Callable[[Serial], None], device_removed: Callable[[Serial], None], data_received: Callable[[Serial], None] | None = None) -> None:
         self.__device_added_callback = device_added
         self.__device_removed_callback = device_removed
+        self.__data_received_callback = data_received
+
+    def stats(self) -> dict[str, Any]:
+        return super().stats() | {
+            "devices": len(self.__devices),
+            "scans": self.__scans,
+            "start_failures": self.__start_failures,
+            "lost": self.__lost,
+            "reconnects": {identity: count - 1 for identity, count in self.__connections.items() if count > 1},
+        }
 
     def devices_by_name(self, name: str) -> list[Serial]:
         return [device for device in self.__devices.values() if device.device_name == name]
 
+    def send(self, name: str, command: str, *, key: Any = None) -> int:
+        """
+        Queue a command for all devices with the given name.
+
+        :return: The number of devices the command was queued for.
+        """
+        return sum(device.send(command, key = key) for device in self.devices_by_name(name))
+
+    async def start(self) -> None:
+        if self.__config.hotplug:
+            try:
+                self.__watcher = inotify.Inotify(self.__config.root_path, inotify.Create | inotify.MovedTo | inotify.Attrib)
+            except OSError as e:
+                log.info(f"Can not watch {self.__config.root_path} for new devices ({e}), polling every {self.__config.poll_interval}s")
+            else:
+                asyncio.get_running_loop().add_reader(self.__watcher.fileno(), self.__watch)
+
+        await super().start()
+
+    async def stop(self) -> None:
+        if self.__watcher is not None:
+            asyncio.get_running_loop().remove_reader(self.__watcher.fileno())
+            self.__watcher.close()
+            self.__watcher = None
+
+        await super().stop()
+
     async def update(self, elapsed: float) -> None:
         for device in self.__devices_to_remove:
             del self.__devices[device.path]
+            del self.__device_identities[device.path]
             self.children.remove(device)
             await device.stop()
             if self.__device_removed_callback:
                 self.__device_removed_callback(device)
-            log.info(f"Lost serial device {device.path}")
+            log.info(f"Lost serial device {device.stable_path}")
         self.__devices_to_remove.clear()
 
-        for pattern in self.__config.patterns:
-            for path in self.__config.root_path.glob(pattern):
-                if path in self.__devices:
-                    continue
-
-                try:
-                    serial = Serial(path = path, baud_rate = self.__config.baud_rate, controller = self)
-                except Exception:
-                    log.warning(f"Could not start serial {path}")
-                    continue
-
-                log.debug(f"Starting serial device {serial.name}")
-                await serial.start()
-
-                self.children.append(serial)
-                self.__devices[path] = serial
+        if self.__scan_requested or self.__watcher is None:
+            self.__scan_requested = False
+            await self.__scan()
 
     def device_identified(self, device: Serial):
         if device.path not in self.__devices:
             return
 
+        self.__identities[self.__device_identities[device.path]] = device.device_name
+
         if self.__device_added_callback:
             self.__device_added_callback(device)
 
@@ -135,4 +634,95 @@ class SerialController(Component):
         if device.path not in self.__devices:
             return
 
+        self.__lost += 1
+        if not device.verified:
+            # The device never confirmed its remembered name, so it may well be wrong.
+            self.__identities.pop(self.__device_identities[device.path], None)
+
         self.__devices_to_remove.append(device)
+        # The node may still exist, for example when the device was dropped because it answered
+        # with another name or after a read error. Nothing notifies about such nodes, so scan
+        # for them right away.
+        self.__scan_requested = True
+        self.request_update()
+
+    def data_received(self, device: Serial):
+        if self.__data_received_callback:
+            self.__data_received_callback(device)
+
+    def __watch(self) -> None:
+        for _, name in self.__watcher.read():
+            # Patterns can contain directories, which a watch on the root path does not cover
+            # precisely, so anything that might match triggers a scan.
+            if any(fnmatch.fnmatch(name, pattern.split("/")[0]) for pattern in self.__config.patterns):
+                self.__scan_requested = True
+                self.request_update()
+
+    def __stable_paths(self) -> dict[Path, Path]:
+        if self.__config.by_id_path is None:
+            return {}
+
+        try:
+            return {link.resolve(): link for link in self.__config.by_id_path.iterdir()}
+        except OSError:
+            return {}
+
+    def __identity(self, path: Path, stable_path: Path) -> str:
+        """
+        A key that identifies the physical device at path, even when it is plugged in elsewhere.
+        """
+        if stable_path != path:
+            return str(stable_path)
+
+        try:
+            serial_number = list_ports_linux.SysFS(str(path.resolve())).serial_number
+        except Exception:
+            serial_number = None
+
+        return f"usb:{serial_number}" if serial_number else str(path)
+
+    async def __scan(self) -> None:
+        self.__scans += 1
+        stable_paths = None
+
+        for pattern in self.__config.patterns:
+            for path in self.__config.root_path.glob(pattern):
+                if path in self.__devices:
+                    continue
+
+                if stable_paths is None:
+                    stable_paths = self.__stable_paths()
+
+                stable_path = stable_paths.get(path.resolve(), path)
+                identity = self.__identity(path, stable_path)
+                serial = Serial(
+                    path = path,
+                    stable_path = stable_path,
+                    baud_rate = self.__config.baud_rate,
+                    max_line_length = self.__config.max_line_length,
+                    max_write_buffer = self.__config.max_write_buffer,
+                    frames = self.__config.frames,
+                    probe_delay = self.__config.probe_delay,
+                    max_probe_delay = self.__config.max_probe_delay,
+                    known_name = self.__identities.get(identity),
+                    controller = self
+                )
+
+                log.debug(f"Starting serial device {serial.name}")
+                self.children.append(serial)
+                self.__devices[path] = serial
+                self.__device_identities[path] = identity
+                try:
+                    await serial.start()
+                except Exception:
+                    log.warning(f"Could not start serial {path}")
+                    self.__start_failures += 1
+                    self.children.remove(serial)
+                    del self.__devices[path]
+                    del self.__device_identities[path]
+                    continue
+
+                self.__connections[identity] += 1
+
+                if self.__config.record_path is not None:
+                    serial.set_recorder(Recorder(log_path(self.__config.record_path, serial.stable_path), str(serial.stable_path)))
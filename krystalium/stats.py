@@ -0,0 +1,68 @@
+import bisect
+from typing import Any
+
+
+class Histogram:
+    """
+    A histogram of durations with fixed, exponentially growing buckets.
+
+    Recording a value is a binary search and an increment, so it is cheap enough to use on every
+    call. Percentiles are estimated from the bucket boundaries.
+    """
+
+    DefaultBounds: tuple[float, ...] = tuple(0.0001 * 2 ** i for i in range(18))
+
+    def __init__(self, bounds: tuple[float, ...] = DefaultBounds) -> None:
+        self.__bounds = bounds
+        self.__buckets = [0] * (len(bounds) + 1)
+        self.__count = 0
+        self.__total = 0.0
+        self.__min = float("inf")
+        self.__max = 0.0
+
+    @property
+    def count(self) -> int:
+        return self.__count
+
+    @property
+    def mean(self) -> float:
+        return self.__total / self.__count if self.__count > 0 else 0.0
+
+    def record(self, value: float) -> None:
+        self.__buckets[bisect.bisect_left(self.__bounds, value)] += 1
+        self.__count += 1
+        self.__total += value
+        if value < self.__min:
+            self.__min = value
+        if value > self.__max:
+            self.__max = value
+
+    def percentile(self, percentile: float) -> float:
+        if self.__count == 0:
+            return 0.0
+
+        target = self.__count * percentile / 100
+        seen = 0
+        for index, count in enumerate(self.__buckets):
+            seen += count
+            if seen >= target:
+                return min(self.__bounds[index], self.__max) if index < len(self.__bounds) else self.__max
+
+        return self.__max
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Summarise the histogram, with all durations in milliseconds.
+        """
+        if self.__count == 0:
+            return {"count": 0}
+
+        return {
+            "count": self.__count,
+            "mean": self.mean * 1000,
+            "min": self.__min * 1000,
+            "max": self.__max * 1000,
+            "p50": self.percentile(50) * 1000,
+            "p90": self.percentile(90) * 1000,
+            "p99": self.percentile(99) * 1000,
+        }
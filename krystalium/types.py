@@ -1,8 +1,11 @@
+import math
+import sys
+from array import array
 from dataclasses import dataclass
-from typing import Any
+from typing import Any, Iterable
 
 
-@dataclass(frozen = True)
+@dataclass(frozen = True, slots = True)
 class Color:
     r: float
     g: float
@@ -11,59 +14,172 @@ class Color:
 
     def __add__(self, other):
         if not isinstance(other, Color):
-            raise TypeError()
-
-        alpha = None
-        if self.a is not None and other.a is not None:
-            alpha = self.a + other.a
-        elif self.a is not None:
-            alpha = self.a
-        elif other.a is not None:
-            alpha = other.a
+            return NotImplemented
 
+        first = self.a
+        second = other.a
         return Color(
             self.r + other.r,
             self.g + other.g,
             self.b + other.b,
-            alpha,
+            second if first is None else (first if second is None else first + second),
         )
 
     def __mul__(self, other):
         if isinstance(other, Color):
-            alpha = None
-            if self.a is not None and other.a is not None:
-                alpha = self.a * other.a
-            elif self.a is not None:
-                alpha = self.a
-            elif other.a is not None:
-                alpha = other.a
-
+            first = self.a
+            second = other.a
             return Color(
                 self.r * other.r,
                 self.g * other.g,
                 self.b * other.b,
-                alpha,
-            )
-        else:
-            return Color(
-                self.r * other,
-                self.g * other,
-                self.b * other,
-                self.a * other if self.a else None,
+                second if first is None else (first if second is None else first * second),
             )
 
-    @classmethod
+        return Color(
+            self.r * other,
+            self.g * other,
+            self.b * other,
+            self.a * other if self.a is not None else None,
+        )
+
+    def __rmul__(self, other):
+        return self * other
+
+    @staticmethod
     def mix(first, second, amount):
+        alpha = None
+        if first.a is not None or second.a is not None:
+            first_alpha = first.a if first.a is not None else 1.0
+            second_alpha = second.a if second.a is not None else 1.0
+            alpha = first_alpha * (1.0 - amount) + second_alpha * amount
+
         return Color(
             first.r * (1.0 - amount) + second.r * amount,
             first.g * (1.0 - amount) + second.g * amount,
             first.b * (1.0 - amount) + second.b * amount,
-            first.a * (1.0 - amount) + second.a * amount,
+            alpha,
         )
 
 
-@dataclass(frozen = True)
+class ColorArray:
+    """
+    A fixed number of colors stored as one contiguous array of floats.
+
+    Each color takes four consecutive entries, red, green, blue and alpha. A missing alpha is
+    stored as NaN. The batch operations work in place and follow the same alpha rules as the
+    Color operators, so they can replace a loop over Color objects without allocating a new
+    object for every operation.
+    """
+
+    __slots__ = ("__data",)
+
+    def __init__(self, size: int = 0) -> None:
+        self.__data = array("d", [0.0, 0.0, 0.0, math.nan]) * size
+
+    @classmethod
+    def from_colors(cls, colors: Iterable[Color]) -> "ColorArray":
+        result = cls()
+        data = result.__data
+        for color in colors:
+            data.extend((color.r, color.g, color.b, color.a if color.a is not None else math.nan))
+        return result
+
+    @property
+    def data(self) -> array:
+        return self.__data
+
+    def __len__(self) -> int:
+        return len(self.__data) // 4
+
+    def __getitem__(self, index: int) -> Color:
+        offset = index * 4
+        data = self.__data
+        alpha = data[offset + 3]
+        return Color(data[offset], data[offset + 1], data[offset + 2], None if alpha != alpha else alpha)
+
+    def __setitem__(self, index: int, color: Color) -> None:
+        offset = index * 4
+        self.__data[offset:offset + 4] = array("d", (color.r, color.g, color.b, color.a if color.a is not None else math.nan))
+
+    def to_colors(self) -> list[Color]:
+        return [self[index] for index in range(len(self))]
+
+    def add(self, other: "ColorArray", factor: float = 1.0) -> None:
+        """
+        Add other, scaled by factor, to all colors.
+        """
+        data = self.__data
+        source = other.__data
+        for index in range(0, len(data), 4):
+            data[index] += source[index] * factor
+            data[index + 1] += source[index + 1] * factor
+            data[index + 2] += source[index + 2] * factor
+
+            first = data[index + 3]
+            second = source[index + 3] * factor
+            if first != first:
+                data[index + 3] = second
+            elif second == second:
+                data[index + 3] = first + second
+
+    def scale(self, factor: float) -> None:
+        """
+        Multiply all colors, including alpha, by factor.
+        """
+        data = self.__data
+        for index in range(len(data)):
+            data[index] *= factor
+
+    def mix(self, first: "ColorArray", second: "ColorArray", amount: float) -> None:
+        """
+        Set all colors to the mix of the respective colors of first and second, like Color.mix.
+        """
+        data = self.__data
+        start = first.__data
+        end = second.__data
+        inverse = 1.0 - amount
+        for index in range(0, len(data), 4):
+            data[index] = start[index] * inverse + end[index] * amount
+            data[index + 1] = start[index + 1] * inverse + end[index + 1] * amount
+            data[index + 2] = start[index + 2] * inverse + end[index + 2] * amount
+
+            first_alpha = start[index + 3]
+            second_alpha = end[index + 3]
+            if first_alpha != first_alpha and second_alpha != second_alpha:
+                data[index + 3] = math.nan
+            else:
+                first_alpha = 1.0 if first_alpha != first_alpha else first_alpha
+                second_alpha = 1.0 if second_alpha != second_alpha else second_alpha
+                data[index + 3] = first_alpha * inverse + second_alpha * amount
+
+    def difference(self, index: int, color: Color) -> float:
+        """
+        The largest difference of any channel between a color in this array and another color.
+
+        A missing alpha counts as 1.0, which is how colors are sent to Unreal.
+        """
+        offset = index * 4
+        data = self.__data
+        alpha = data[offset + 3]
+        alpha = 1.0 if alpha != alpha else alpha
+        other_alpha = color.a if color.a is not None else 1.0
+        return max(
+            abs(data[offset] - color.r),
+            abs(data[offset + 1] - color.g),
+            abs(data[offset + 2] - color.b),
+            abs(alpha - other_alpha),
+        )
+
+
+@dataclass(frozen = True, slots = True)
 class ParameterModifier:
     parameter: str
     value: Any
     operation: str = "add"
+
+    def __post_init__(self):
+        # There are only a few distinct parameters and operations, so share the strings between
+        # all modifiers.
+        object.__setattr__(self, "parameter", sys.intern(self.parameter))
+        object.__setattr__(self, "operation", sys.intern(self.operation))
@@ -1,24 +1,101 @@
+import asyncio
+import collections
+import json
 import logging
 import dataclasses
-from typing import Any
+import functools
+import time
+from typing import Any, Callable
 
 import aiohttp
 from pydantic import Field
 from pydantic.dataclasses import dataclass
 
 from .component import Component
-from .types import Color, ParameterModifier
+from .stats import Histogram
+from .types import Color, ColorArray
 from . import effect_table as et
+from . import modifiers as md
+from .effects import EffectTable
 from .api import BloodSample, RefinedSample, Enlisted
 
 
 log = logging.getLogger(__name__)
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def json_encode(value: Any) -> bytes:
+    return json.dumps(value, separators = (",", ":")).encode("utf-8")
+
+
+Encoders: dict[str, Callable[[Any], bytes]] = {
+    "json": json_encode,
+}
+if orjson is not None:
+    Encoders["orjson"] = orjson.dumps
+
+
+def color_to_niagara(value: Color) -> dict[str, float]:
+    return {"R": value.r, "G": value.g, "B": value.b, "A": value.a if value.a is not None else 1.0}
+
+
+# Maps Python types to the Niagara function used to set a variable of that type and a function to
+# convert a value to what that function expects.
+NiagaraTypes: dict[type, tuple[str, Callable[[Any], Any]]] = {
+    bool: ("SetNiagaraVariableBool", bool),
+    int: ("SetNiagaraVariableInt", int),
+    float: ("SetNiagaraVariableFloat", float),
+    str: ("SetNiagaraVariableString", str),
+    Color: ("SetNiagaraVariableLinearColor", color_to_niagara),
+}
+
+
+def interpolate(start: Any, end: Any, amount: float) -> Any:
+    if isinstance(start, Color):
+        return Color.mix(start, end, amount)
+
+    return start + (end - start) * amount
+
+
+def difference(first: Any, second: Any) -> float:
+    if isinstance(first, Color):
+        first_alpha = first.a if first.a is not None else 1.0
+        second_alpha = second.a if second.a is not None else 1.0
+        return max(abs(first.r - second.r), abs(first.g - second.g), abs(first.b - second.b), abs(first_alpha - second_alpha))
+
+    return abs(first - second)
+
+
+def get_encoder(name: str) -> Callable[[Any], bytes]:
+    if name == "auto":
+        return Encoders["orjson"] if "orjson" in Encoders else Encoders["json"]
+
+    if name not in Encoders:
+        log.warning(f"Unknown or unavailable JSON encoder {name}, falling back to json")
+        return Encoders["json"]
+
+    return Encoders[name]
+
 
 @dataclass(kw_only = True, frozen = True)
 class Config:
     host: str = "localhost"
     port: int = 30010
+    timeout: float = 2.0
+    reconnect_delay: float = 0.5
+    max_reconnect_delay: float = 10.0
+    json_encoder: str = "auto"
+
+    # Duration in seconds of the transition to new parameters. 0 means parameters are set at once.
+    transition_duration: float = 0.0
+    # Maximum number of transition frames sent to Unreal per second.
+    transition_rate: float = 20.0
+    # Minimum change of a parameter for it to be sent as part of a transition frame.
+    transition_epsilon: float = 0.001
 
 
 @dataclass(kw_only = True)
@@ -103,19 +180,255 @@ class SystemParameters:
         return batch
 
 
+# Parameter values are handled as lists, in the order of the fields of SystemParameters, so
+# modifier programs can address them by index.
+ParameterNames: tuple[str, ...] = tuple(field.name for field in dataclasses.fields(SystemParameters))
+ParameterSlots: dict[str, int] = {name: index for index, name in enumerate(ParameterNames)}
+ParameterFields: dict[str, type] = {field.name: field.type for field in dataclasses.fields(SystemParameters)}
+DefaultValues: tuple[Any, ...] = tuple(getattr(SystemParameters(), name) for name in ParameterNames)
+
+
+@functools.cache
+def effect_programs() -> dict[tuple[str, str], md.Program]:
+    """
+    All entries of the built-in effect table, compiled against the parameter slots.
+
+    The table is compiled on first use, so csv2dict.py can still import this module to regenerate
+    a built-in table that no longer matches SystemParameters.
+    """
+    return md.compile_table(et.effect_index, ParameterSlots)
+
+
+@dataclasses.dataclass(frozen = True, slots = True)
+class Request:
+    template: "RequestTemplate"
+    body: bytes
+
+
+class RequestTemplate:
+    """
+    A pre-encoded Remote Control object call.
+
+    The constant parts of the request body are encoded once, when the template is created. A
+    template can have a single variable parameter, the encoded value of which is spliced into the
+    pre-encoded body when rendering a request.
+    """
+
+    __Placeholder = "@@value@@"
+
+    def __init__(self, object_path: str, function_name: str, *, parameters: dict[str, Any] | None = None, variable: str | None = None, tag: str | None = None) -> None:
+        self.__function_name = function_name
+        self.__tag = tag if tag is not None else function_name
+        self.__parameters = parameters if parameters is not None else {}
+        self.__variable = variable
+
+        data: dict[str, Any] = {
+            "objectPath": object_path,
+            "functionName": function_name,
+        }
+
+        parameters = dict(self.__parameters)
+        if variable is not None:
+            parameters[variable] = self.__Placeholder
+        if parameters:
+            data["parameters"] = parameters
+
+        encoded = json_encode(data)
+        if variable is not None:
+            self.__head, self.__tail = encoded.split(json_encode(self.__Placeholder))
+        else:
+            self.__head, self.__tail = encoded, b""
+
+        self.__request = Request(self, encoded) if variable is None else None
+
+    @property
+    def function_name(self) -> str:
+        return self.__function_name
+
+    @property
+    def parameters(self) -> dict[str, Any]:
+        return self.__parameters
+
+    @property
+    def tag(self) -> str:
+        """
+        The name used to identify calls made with this template in statistics.
+        """
+        return self.__tag
+
+    def render(self, value: bytes | None = None) -> Request:
+        """
+        Create a request from this template.
+
+        :param value: The encoded value of the variable parameter. Must be None for templates
+                      without a variable parameter.
+        """
+        if self.__request is not None:
+            return self.__request
+
+        if value is None:
+            raise ValueError(f"Template for {self.__function_name} requires a value for {self.__variable}")
+
+        return Request(self, self.__head + value + self.__tail)
+
+
+@dataclasses.dataclass(frozen = True, kw_only = True)
+class Command:
+    """
+    A unit of work for the Unreal sender task.
+
+    A command consists of one or more Remote Control calls that are executed in order. Commands
+    with the same key supersede each other: only the most recent command for a key is kept.
+    """
+    key: str
+    calls: list[Request]
+    created: float = dataclasses.field(default_factory = time.perf_counter)
+
+
+@dataclasses.dataclass(kw_only = True)
+class CallStats:
+    latency: Histogram = dataclasses.field(default_factory = Histogram)
+    successes: int = 0
+    http_errors: int = 0
+    timeouts: int = 0
+    connection_errors: int = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "successes": self.successes,
+            "http_errors": self.http_errors,
+            "timeouts": self.timeouts,
+            "connection_errors": self.connection_errors,
+            "latency": self.latency.to_dict(),
+        }
+
+
+class CommandQueue:
+    """
+    An ordered queue of commands that coalesces superseded commands.
+
+    Putting a command removes any pending command with the same key and appends the new command
+    at the end. This is the same as executing the original sequence of commands with all
+    superseded commands left out.
+
+    The queue also remembers the most recent command for each key, so the current state can be
+    replayed after a reconnect.
+    """
+
+    def __init__(self) -> None:
+        self.__pending: dict[str, Command] = {}
+        self.__state: dict[str, Command | Callable[[], Command]] = {}
+
+    def __len__(self) -> int:
+        return len(self.__pending)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.__pending
+
+    @property
+    def pending(self) -> list[Command]:
+        return list(self.__pending.values())
+
+    def put(self, command: Command, state: Command | Callable[[], Command] | None = None) -> None:
+        """
+        Queue a command.
+
+        :param command: The command to queue.
+        :param state: The command to replay for this key after a reconnect, if that is not the
+                      command itself. Used when a command only sends a partial update. This can
+                      be a function that creates the command, which is only called on replay.
+        """
+        self.__pending.pop(command.key, None)
+        self.__pending[command.key] = command
+
+        self.__state.pop(command.key, None)
+        self.__state[command.key] = state if state is not None else command
+
+    def pop(self) -> Command | None:
+        if not self.__pending:
+            return None
+
+        key = next(iter(self.__pending))
+        return self.__pending.pop(key)
+
+    def replay(self) -> None:
+        """
+        Queue the current state of every key again. The replayed commands count as created now.
+        """
+        now = time.perf_counter()
+        self.__pending = {
+            key: state() if callable(state) else dataclasses.replace(state, created = now)
+            for key, state in self.__state.items()
+        }
+
+    def clear(self) -> None:
+        self.__pending.clear()
+        self.__state.clear()
+
+
 class UnrealCommunication(Component):
+    """
+    Communication with the Unreal application through its Remote Control API.
+
+    Calls are not executed directly but put in a coalescing command queue that is processed by a
+    background task. That task also takes care of (re)connecting to Unreal, using an exponential
+    backoff, and replays the current state once a connection has been established.
+
+    When a transition duration is configured, new system parameters are not set at once but
+    animated towards. Transition frames are sent at a bounded rate, contain only the parameters
+    that changed noticeably and are skipped while Unreal is still processing a previous frame.
+    """
+
     SystemObjectPath: str = "/Game/Medical/L_Medical.L_Medical:PersistentLevel.NiagaraActor_1.NiagaraComponent0"
     ControllerObjectPath: str = "/Game/Medical/L_Medical.L_Medical:PersistentLevel.BP_Controller_C_1"
 
+    SetNumbersRequest = RequestTemplate(ControllerObjectPath, "SetNumbers", variable = "Numbers")
+    ClearNumbersRequest = RequestTemplate(ControllerObjectPath, "ClearNumbers")
+    ValidRequest = RequestTemplate(ControllerObjectPath, "Valid")
+    InvalidRequest = RequestTemplate(ControllerObjectPath, "Invalid")
+    MessageRequest = RequestTemplate(ControllerObjectPath, "Message", variable = "Message")
+    ResetRequest = RequestTemplate(ControllerObjectPath, "Reset")
+    ReinitializeRequest = RequestTemplate(SystemObjectPath, "ReinitializeSystem")
+
+    Headers = {"Content-Type": "application/json"}
+
     def __init__(self, config: Config) -> None:
         super().__init__()
         self.__config = config
+        self.__encode = get_encoder(config.json_encoder)
+        self.__parameter_templates = self.parameter_templates()
+        self.__programs: dict[tuple[str, str], md.Program] = effect_programs()
         self.__active = False
         self.__session: aiohttp.ClientSession | None = None
+        self.__connected = asyncio.Event()
+        self.__queue = CommandQueue()
+        self.__wakeup = asyncio.Event()
+        self.__idle = asyncio.Event()
+        self.__idle.set()
+        self.__task: asyncio.Task | None = None
+
+        self.__call_stats: dict[str, CallStats] = {}
+        self.__command_durations: dict[str, Histogram] = {}
+        self.__failed_commands: collections.Counter[str] = collections.Counter()
+        self.__connects = 0
+        self.__disconnects = 0
+
+        self.__sent: dict[str, Any] | None = None
+        self.__transition: asyncio.Task | None = None
+        self.__frames_sent = 0
+        self.__frames_dropped = 0
 
     @property
     def connected(self) -> bool:
-        return self.__session is not None
+        return self.__connected.is_set()
+
+    @property
+    def smooth_transitions(self) -> bool:
+        return self.__config.transition_duration > 0
+
+    @property
+    def transitioning(self) -> bool:
+        return self.__transition is not None and not self.__transition.done()
 
     @property
     def active(self) -> bool:
@@ -127,148 +440,353 @@ class UnrealCommunication(Component):
 
         self.__active = active
 
+    def stats(self) -> dict[str, Any]:
+        """
+        Statistics about the communication with Unreal.
+
+        "calls" contains the latency and outcome of each Remote Control call, by function name and
+        Niagara variable. "commands" contains the time from queueing a command until all of its
+        calls completed, the "parameters" entry of which is the end-to-end parameter push duration.
+        Commands with a failed call are only counted in "failed_commands". All durations are in
+        milliseconds.
+        """
+        return super().stats() | {
+            "connected": self.connected,
+            "connects": self.__connects,
+            "disconnects": self.__disconnects,
+            "pending": len(self.__queue),
+            "calls": {tag: stats.to_dict() for tag, stats in sorted(self.__call_stats.items())},
+            "commands": {key: histogram.to_dict() for key, histogram in sorted(self.__command_durations.items())},
+            "failed_commands": dict(sorted(self.__failed_commands.items())),
+            "transition_frames_sent": self.__frames_sent,
+            "transition_frames_dropped": self.__frames_dropped,
+        }
+
+    def set_effect_table(self, table: EffectTable) -> None:
+        """
+        Replace the effect table used to determine parameters.
+
+        The table should be compiled against ParameterSlots. It is used for all updates after
+        this call, parameters that are currently shown are not changed.
+        """
+        self.__programs = table.programs
+
+    async def wait_connected(self) -> None:
+        await self.__connected.wait()
+
+    async def flush(self) -> None:
+        """
+        Wait until all pending commands have been sent.
+        """
+        await self.__idle.wait()
+
     async def start(self) -> None:
-        self.__session = aiohttp.ClientSession(f"http://{self.__config.host}:{self.__config.port}")
+        self.__session = aiohttp.ClientSession(
+            f"http://{self.__config.host}:{self.__config.port}",
+            timeout = aiohttp.ClientTimeout(total = self.__config.timeout)
+        )
 
-        try:
-            await self.__session.get("/remote/info")
+        await self.reset()
+        await self.message("Enter Code:")
 
-            await self.reset()
-            await self.message("Enter Code:")
-        except aiohttp.ClientConnectionError:
-            await self.__session.close()
-            self.__session = None
-            log.warning("Could not connect to Unreal application")
+        self.__task = asyncio.create_task(self.__run())
 
     async def stop(self):
+        self.__cancel_transition()
+
         await self.clear_numbers()
 
+        if self.connected:
+            try:
+                await asyncio.wait_for(self.flush(), self.__config.timeout)
+            except asyncio.TimeoutError:
+                log.warning("Timed out sending remaining commands to Unreal")
+
+        if self.__task:
+            self.__task.cancel()
+            try:
+                await self.__task
+            except asyncio.CancelledError:
+                pass
+            self.__task = None
+
         if self.__session:
             await self.__session.close()
+            self.__session = None
 
     async def update_from_samples(self, blood_sample: BloodSample, krystal_sample: RefinedSample) -> None:
-        if not self.__session:
-            return
-
-        parameters = SystemParameters()
-
-        blood_modifiers = et.get_modifiers(blood_sample.effect.action, blood_sample.effect.target)
-        if blood_modifiers is None:
-            log.warning(f"Unknown action/target combination for blood sample: {blood_sample.effect.action}/{blood_sample.effect.target}")
-        else:
-            self.apply_modifiers(parameters, blood_modifiers, blood_sample.strength)
-
-        primary_modifiers = et.get_modifiers(krystal_sample.primary_action, krystal_sample.primary_target)
-        if primary_modifiers is None:
-            log.warning(f"Unknown action/target combination for primary: {krystal_sample.primary_action}/{krystal_sample.primary_target}")
-        else:
-            self.apply_modifiers(parameters, primary_modifiers, krystal_sample.strength)
-
-        secondary_modifiers = et.get_modifiers(krystal_sample.secondary_action, krystal_sample.secondary_target)
-        if secondary_modifiers is None:
-            log.warning(f"Unknown action/target combination for secondary: {krystal_sample.secondary_action}/{krystal_sample.secondary_target}")
-        else:
-            self.apply_modifiers(parameters, secondary_modifiers, krystal_sample.strength)
+        steps = [
+            self.__effect_step(blood_sample.effect.action, blood_sample.effect.target, blood_sample.strength, "blood sample"),
+            self.__effect_step(krystal_sample.primary_action, krystal_sample.primary_target, krystal_sample.strength, "primary"),
+            self.__effect_step(krystal_sample.secondary_action, krystal_sample.secondary_target, krystal_sample.strength, "secondary"),
+        ]
 
-        await self.__batch_call(parameters.to_batch())
+        self.__apply_steps(steps)
 
     async def update_from_enlisted(self, enlisted: Enlisted) -> None:
-        if not self.__session:
-            return
-
-        parameters = SystemParameters()
-
-        for effect in enlisted.effects:
-            modifiers = et.get_modifiers(effect.action, effect.target)
-            if modifiers is not None:
-                self.apply_modifiers(parameters, modifiers, effect.strength)
-            else:
-                log.warning(f"Found no modifiers for effect {effect.action}/{effect.target}")
+        steps = [self.__effect_step(effect.action, effect.target, effect.strength, "effect") for effect in enlisted.effects]
 
-        await self.__batch_call(parameters.to_batch())
+        self.__apply_steps(steps)
 
     async def set_numbers(self, numbers: list[int]) -> None:
-        await self.__rpc_call(object_path = self.ControllerObjectPath, function_name = "SetNumbers", Numbers = numbers)
+        self.__put("numbers", self.SetNumbersRequest.render(self.__encode(numbers)))
 
     async def clear_numbers(self) -> None:
-        await self.__rpc_call(object_path = self.ControllerObjectPath, function_name = "ClearNumbers")
+        self.__put("numbers", self.ClearNumbersRequest.render())
 
     async def valid(self):
-        await self.__rpc_call(object_path = self.ControllerObjectPath, function_name = "Valid")
+        self.__put("controller", self.ValidRequest.render())
 
     async def invalid(self):
-        await self.__rpc_call(object_path = self.ControllerObjectPath, function_name = "Invalid")
+        self.__put("controller", self.InvalidRequest.render())
 
     async def reinitialize(self):
-        await self.__rpc_call(object_path = self.SystemObjectPath, function_name = "ReinitializeSystem")
+        self.__put("reinitialize", self.ReinitializeRequest.render())
 
     async def message(self, message: str) -> None:
-        await self.__rpc_call(object_path = self.ControllerObjectPath, function_name = "Message", Message = message)
+        self.__put("message", self.MessageRequest.render(self.__encode(message)))
 
     async def reset(self) -> None:
-        await self.__rpc_call(object_path = self.ControllerObjectPath, function_name = "Reset")
+        self.__put("controller", self.ResetRequest.render())
+
+    def parameter_requests(self, parameters: SystemParameters) -> list[Request]:
+        """
+        Create the requests needed to push all parameters to Unreal.
+        """
+        return self.__render_parameters({name: getattr(parameters, name) for name, _, _ in self.__parameter_templates})
+
+    def __effect_step(self, action: str, target: str, strength: int, description: str) -> tuple[md.Program, int] | None:
+        program = self.__programs.get(et.lookup_key(action, target))
+        if program is None:
+            log.warning(f"Unknown action/target combination for {description}: {action}/{target}")
+            return None
+
+        return program, strength
+
+    def __apply_steps(self, steps: list[tuple[md.Program, int] | None]) -> None:
+        # Fold all effects into a single transform per parameter, so each parameter is only
+        # written once no matter how many effects touch it.
+        values = list(DefaultValues)
+        md.apply_transforms(values, md.fold(step for step in steps if step is not None))
+        self.__apply_parameters(values)
+
+    def __apply_parameters(self, parameter_values: list[Any]) -> None:
+        self.__cancel_transition()
+
+        values = dict(zip(ParameterNames, parameter_values))
+        if not self.smooth_transitions or self.__sent is None or not self.connected:
+            self.__push_parameters(values)
+            return
 
-    async def __rpc_call(self, *, object_path: str, function_name: str, **kwargs) -> bool:
-        if not self.__session:
-            return False
+        self.__transition = asyncio.create_task(self.__transition_to(values))
+
+    def __cancel_transition(self) -> None:
+        if self.__transition is not None:
+            self.__transition.cancel()
+            self.__transition = None
+
+    async def __transition_to(self, target: dict[str, Any]) -> None:
+        start = dict(self.__sent)
+        interval = 1 / self.__config.transition_rate
+        begin = time.perf_counter()
+
+        # Colors are interpolated in one batch per frame, so only colors that actually need to be
+        # sent are turned into Color objects.
+        color_names = [name for name, value in target.items() if isinstance(value, Color)]
+        float_names = [name for name in target if name not in color_names]
+        start_colors = ColorArray.from_colors(start[name] for name in color_names)
+        target_colors = ColorArray.from_colors(target[name] for name in color_names)
+        frame_colors = ColorArray(len(color_names))
+        color_slots = {name: index for index, name in enumerate(color_names)}
+
+        while True:
+            if not self.connected:
+                self.__push_parameters(target)
+                return
+
+            amount = min((time.perf_counter() - begin) / self.__config.transition_duration, 1.0)
+
+            # If Unreal has not yet processed the previous frame, skip this one so we do not fall
+            # further behind. Changes accumulate and will be part of the next frame.
+            if "parameters" in self.__queue:
+                self.__frames_dropped += 1
+            else:
+                floats = {name: interpolate(start[name], target[name], amount) for name in float_names}
+                frame_colors.mix(start_colors, target_colors, amount)
 
-        data: dict[str, Any] = {
-            "objectPath": object_path,
-            "functionName": function_name,
-        }
-        if kwargs:
-            data["parameters"] = kwargs
+                epsilon = self.__config.transition_epsilon if amount < 1.0 else 0.0
+                self.__push_frame(floats, frame_colors, color_slots, epsilon)
+
+                if amount >= 1.0:
+                    return
 
-        async with self.__session.put("/remote/object/call", json = data) as response:
-            if not response.ok:
-                log.warning(f"Remote object call failed ({response.status}): {response.reason} {await response.text()}")
-                return False
+            await asyncio.sleep(interval)
+
+    def __push_frame(self, floats: dict[str, Any], colors: ColorArray, color_slots: dict[str, int], epsilon: float) -> None:
+        calls = []
+        for name, template, convert in self.__parameter_templates:
+            if name in color_slots:
+                index = color_slots[name]
+                if colors.difference(index, self.__sent[name]) <= epsilon:
+                    continue
+                value = colors[index]
             else:
-                return True
+                value = floats[name]
+                if difference(value, self.__sent[name]) <= epsilon:
+                    continue
 
-    async def __batch_call(self, batch: list[dict]) -> bool:
-        if not self.__session:
-            return False
+            calls.append(template.render(self.__encode(convert(value))))
+            self.__sent[name] = value
+
+        if not calls:
+            return
+
+        self.__frames_sent += 1
+        # Only render all parameters when they actually need to be replayed.
+        self.__put_command(Command(key = "parameters", calls = calls), self.__sent_parameters)
 
+    def __push_parameters(self, values: dict[str, Any]) -> None:
         # Can't use actual batch API as it crashes for some reason
-        for entry in batch:
-            async with self.__session.put(entry["URL"], json = entry["Body"]) as response:
+        self.__sent = dict(values)
+        self.__put_command(Command(key = "parameters", calls = self.__render_parameters(values)))
+
+    def __sent_parameters(self) -> Command:
+        return Command(key = "parameters", calls = self.__render_parameters(self.__sent))
+
+    def __render_parameters(self, values: dict[str, Any]) -> list[Request]:
+        requests = []
+        for name, template, convert in self.__parameter_templates:
+            value = values[name]
+            if value is None:
+                continue
+
+            requests.append(template.render(self.__encode(convert(value))))
+
+        return requests
+
+    def __put(self, key: str, request: Request) -> None:
+        self.__put_command(Command(key = key, calls = [request]))
+
+    def __put_command(self, command: Command, state: Command | Callable[[], Command] | None = None) -> None:
+        self.__queue.put(command, state)
+        self.__idle.clear()
+        self.__wakeup.set()
+
+    async def __run(self) -> None:
+        delay = self.__config.reconnect_delay
+
+        while True:
+            if not await self.__connect():
+                log.debug(f"Could not connect to Unreal application, retrying in {delay:.1f} seconds")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.__config.max_reconnect_delay)
+                continue
+
+            log.info("Connected to Unreal application")
+            self.__connects += 1
+            delay = self.__config.reconnect_delay
+            self.__queue.replay()
+            if len(self.__queue) > 0:
+                self.__idle.clear()
+            self.__connected.set()
+
+            try:
+                await self.__send_pending()
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                log.warning("Lost connection to Unreal application")
+                self.__disconnects += 1
+            except aiohttp.ClientError:
+                # Anything else that goes wrong with a request, like a broken response, is handled
+                # like a lost connection, so the sender task keeps running.
+                log.exception("Error communicating with Unreal application, reconnecting")
+                self.__disconnects += 1
+            finally:
+                self.__connected.clear()
+
+    async def __connect(self) -> bool:
+        try:
+            async with self.__session.get("/remote/info") as response:
+                return response.ok
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    async def __send_pending(self) -> None:
+        while True:
+            command = self.__queue.pop()
+            if command is None:
+                self.__idle.set()
+                self.__wakeup.clear()
+                await self.__wakeup.wait()
+                continue
+
+            succeeded = True
+            for call in command.calls:
+                if not await self.__rpc_call(call):
+                    succeeded = False
+                    break
+
+            if not succeeded:
+                self.__failed_commands[command.key] += 1
+                continue
+
+            if command.key not in self.__command_durations:
+                self.__command_durations[command.key] = Histogram()
+            self.__command_durations[command.key].record(time.perf_counter() - command.created)
+
+    async def __rpc_call(self, request: Request) -> bool:
+        tag = request.template.tag
+        if tag not in self.__call_stats:
+            self.__call_stats[tag] = CallStats()
+        stats = self.__call_stats[tag]
+
+        start = time.perf_counter()
+        try:
+            async with self.__session.put("/remote/object/call", data = request.body, headers = self.Headers) as response:
+                stats.latency.record(time.perf_counter() - start)
+
                 if not response.ok:
-                    log.warning(f"Batch execution failed ({response.status}): {response.reason} {await response.text()}")
+                    stats.http_errors += 1
+                    log.warning(f"Remote object call failed ({response.status}): {response.reason} {await response.text()}")
                     return False
+                else:
+                    stats.successes += 1
+                    return True
+        except asyncio.TimeoutError:
+            stats.timeouts += 1
+            raise
+        except aiohttp.ClientError:
+            stats.connection_errors += 1
+            raise
+
+    @classmethod
+    def parameter_templates(cls) -> list[tuple[str, RequestTemplate, Callable[[Any], Any]]]:
+        """
+        Create request templates for all fields of SystemParameters that can be sent to Unreal.
+
+        :return: A list of (field name, template, value conversion function) tuples.
+        """
+        templates = []
+        for field in dataclasses.fields(SystemParameters):
+            if field.type not in NiagaraTypes:
+                continue
 
-        return True
-
-    def apply_modifiers(self, parameters: SystemParameters, modifiers: list[ParameterModifier], strength: int):
-        for modifier in modifiers:
-            current_value = getattr(parameters, modifier.parameter)
-            modifier_strength = 0.05 + ((strength - 2) / 10) * 0.95
-
-            new_value = current_value
-            if modifier.operation == "add":
-                new_value = current_value + modifier.value * modifier_strength
-            elif modifier.operation == "mul":
-                new_value = current_value * (modifier.value * (1.0 + modifier_strength / 2))
-            elif modifier.operation == "set":
-                new_value = modifier.value * modifier_strength
-            elif modifier.operation == "set_unscaled":
-                new_value = modifier.value
-            else:
-                log.warning(f"Unknown modifier operation: {modifier.operation}")
+            niagara_function, convert = NiagaraTypes[field.type]
 
-            setattr(parameters, modifier.parameter, new_value)
+            template = RequestTemplate(
+                cls.SystemObjectPath,
+                niagara_function,
+                parameters = {"InVariableName": field.default.title},
+                variable = "InValue",
+                tag = f"{niagara_function}:{field.default.title}",
+            )
+            templates.append((field.name, template, convert))
+
+        return templates
 
     @staticmethod
     def toNiagara(source_type, value):
-        if source_type == bool:
-            return "SetNiagaraVariableBool", bool(value)
-        elif source_type == int:
-            return "SetNiagaraVariableInt", int(value)
-        elif source_type == float:
-            return "SetNiagaraVariableFloat", float(value)
-        elif source_type == str:
-            return "SetNiagaraVariableString", str(value)
-        elif source_type == Color:
-            return "SetNiagaraVariableLinearColor", {"R": value.r, "G": value.g, "B": value.b, "A": value.a if value.a is not None else 1.0}
-
-        return None, None
+        if source_type not in NiagaraTypes:
+            return None, None
+
+        niagara_function, convert = NiagaraTypes[source_type]
+        return niagara_function, convert(value)
@@ -1,3 +1,4 @@
+import asyncio
 import enum
 import logging
 
@@ -10,27 +11,47 @@ import krystalium
 @pydantic.dataclasses.dataclass(kw_only = True, frozen = True)
 class Config:
     update_rate: int = 60
+    # Seconds to wait for the backend to look up an enlisted before giving up.
+    lookup_timeout: float = 5.0
 
     api: krystalium.api.Config = pydantic.Field(default_factory = krystalium.api.Config)
     unreal: krystalium.unreal.Config = pydantic.Field(default_factory = krystalium.unreal.Config)
     serial: krystalium.serialcontroller.Config = pydantic.Field(default_factory = krystalium.serialcontroller.Config)
+    effects: krystalium.effects.Config = pydantic.Field(default_factory = krystalium.effects.Config)
+    rfid: krystalium.rfid.Config = pydantic.Field(default_factory = krystalium.rfid.Config)
 
 
 class Main(krystalium.component.MainLoop):
+    """
+    The station: reads input from the rotary dial and RFID readers and shows the result in Unreal.
+
+    Nothing in the update waits for the backend. Lookups run as tasks while the station is in a
+    pending state that shows a spinner, and wake the main loop when they complete or time out.
+    A reset with 000 cancels a pending lookup.
+    """
+
     class State(enum.Enum):
         Input = enum.auto()
         InputLocked = enum.auto()
+        EnlistedLookup = enum.auto()
         SampleLookup = enum.auto()
         SampleActive = enum.auto()
         Enlisted = enum.auto()
 
-    def __init__(self):
-        try:
-            with open("config.yml", "r") as f:
-                data = yaml.safe_load(f)
-                self.__config = Config(**data)
-        except FileNotFoundError:
-            self.__config = Config()
+    # Frames of the spinner shown while waiting for the backend, and the seconds per frame.
+    Spinner = "|/-\\"
+    SpinnerInterval = 0.25
+
+    def __init__(self, config: Config | None = None):
+        if config is not None:
+            self.__config = config
+        else:
+            try:
+                with open("config.yml", "r") as f:
+                    data = yaml.safe_load(f)
+                    self.__config = Config(**data)
+            except FileNotFoundError:
+                self.__config = Config()
 
         super().__init__(update_rate = self.__config.update_rate, interval = 0.1)
 
@@ -38,6 +59,14 @@ class Main(krystalium.component.MainLoop):
         self.__input_values = []
         self.__state = self.State.Input
         self.__input_timeout = 0
+        self.__active_samples = (None, None)
+        self.__pending: asyncio.Task | None = None
+        self.__spinner_time = 0.0
+        self.__spinner_frame = -1
+
+    @property
+    def state(self) -> State:
+        return self.__state
 
     async def start(self):
         self.__api = krystalium.api.Api(self.__config.api)
@@ -45,23 +74,37 @@ class Main(krystalium.component.MainLoop):
         self.__unreal = krystalium.unreal.UnrealCommunication(self.__config.unreal)
         self.children.append(self.__unreal)
 
+        self.__effects = krystalium.effects.EffectTableWatcher(
+            self.__config.effects,
+            slots = krystalium.unreal.ParameterSlots,
+            fields = krystalium.unreal.ParameterFields,
+            callback = self.__unreal.set_effect_table
+        )
+        self.children.append(self.__effects)
+
         self.__serial_controller = krystalium.serialcontroller.SerialController(config = self.__config.serial)
         self.children.append(self.__serial_controller)
-        self.__serial_controller.set_callbacks(self.on_serial_device_added, self.on_serial_device_removed)
+        self.__serial_controller.set_callbacks(self.on_serial_device_added, self.on_serial_device_removed, self.on_serial_data)
 
         self.__number_input = krystalium.number_input.NumberInput()
         self.children.append(self.__number_input)
 
-        self.__rfid = krystalium.rfid.Rfid()
+        self.__rfid = krystalium.rfid.Rfid(self.__config.rfid, api = self.__api)
         self.children.append(self.__rfid)
 
         await super().start()
 
+    async def stop(self):
+        self.__cancel_pending()
+        await super().stop()
+
     async def update(self, elapsed: float) -> None:
         if self.__state == self.State.Input:
             await self.input_mode(elapsed)
         elif self.__state == self.State.InputLocked:
             await self.input_locked_mode(elapsed)
+        elif self.__state == self.State.EnlistedLookup:
+            await self.enlisted_lookup(elapsed)
         elif self.__state == self.State.SampleLookup:
             await self.sample_lookup(elapsed)
         elif self.__state == self.State.SampleActive:
@@ -107,19 +150,52 @@ class Main(krystalium.component.MainLoop):
         else:
             number = ''.join(map(str, self.__input_values))
             self.__log.debug(f"Looking up enlisted {number}")
-            enlisted = await self.__api.get_enlisted_by_number(number)
-            if enlisted:
-                await self.__unreal.update_from_enlisted(enlisted)
+            self.__start_pending(self.__api.get_enlisted_by_number(number))
+            self.__state = self.State.EnlistedLookup
+            self.__input_timeout = -1
+            self.__input_values = []
+            self.__number_input.clear()
+
+    async def enlisted_lookup(self, elapsed: float) -> None:
+        if await self.maybe_reset(elapsed):
+            return
+
+        if not self.__pending.done():
+            await self.update_spinner(elapsed)
+            return
+
+        enlisted = None
+        try:
+            enlisted = self.__pending.result()
+        except TimeoutError:
+            self.__log.warning(f"Looking up enlisted timed out after {self.__config.lookup_timeout} seconds")
+        except Exception:
+            self.__log.exception("Looking up enlisted failed")
+        self.__pending = None
+
+        if enlisted:
+            await self.__unreal.update_from_enlisted(enlisted)
+            if not self.__unreal.smooth_transitions:
                 await self.__unreal.reinitialize()
-                await self.__unreal.valid()
-                self.__state = self.State.Enlisted
-                self.__number_input.clear()
-                self.__input_values = []
-            else:
-                await self.__unreal.message("Invalid Input!")
-                await self.__unreal.invalid()
-                self.__input_timeout = 3
-                self.__state = self.State.InputLocked
+            # Replace the spinner with the message that was shown before the lookup, and drop
+            # anything entered while waiting.
+            await self.__unreal.message("Enter Code:")
+            await self.__unreal.valid()
+            self.__state = self.State.Enlisted
+            self.__number_input.clear()
+            self.__input_values = []
+        else:
+            await self.__unreal.message("Invalid Input!")
+            await self.__unreal.invalid()
+            self.__input_timeout = 3
+            self.__state = self.State.InputLocked
+
+    async def update_spinner(self, elapsed: float) -> None:
+        self.__spinner_time += elapsed
+        frame = int(self.__spinner_time / self.SpinnerInterval) % len(self.Spinner)
+        if frame != self.__spinner_frame:
+            self.__spinner_frame = frame
+            await self.__unreal.message(f"Looking Up {self.Spinner[frame]}")
 
     async def input_locked_mode(self, elapsed: float) -> None:
         if await self.update_input(elapsed = elapsed, max = 0, display = False):
@@ -129,6 +205,7 @@ class Main(krystalium.component.MainLoop):
         await self.update_input(elapsed = elapsed, max = 3, display = False)
         if self.__input_values == [0, 0, 0]:
             self.__log.debug("Reset")
+            self.__cancel_pending()
             await self.__unreal.reset()
             await self.__unreal.message("Enter Code:")
             self.__input_values = []
@@ -149,23 +226,57 @@ class Main(krystalium.component.MainLoop):
             return
 
         await self.__unreal.update_from_samples(blood, refined)
-        await self.__unreal.reinitialize()
+        if not self.__unreal.smooth_transitions:
+            await self.__unreal.reinitialize()
         await self.__unreal.valid()
 
+        self.__active_samples = (blood, refined)
         self.__state = self.State.SampleActive
 
     async def sample_active(self, elapsed: float) -> None:
-        await self.maybe_reset(elapsed)
+        if await self.maybe_reset(elapsed):
+            return
+
+        # Apply the backend's records once they replace the samples read from the tags.
+        blood = self.__rfid.blood_sample
+        refined = self.__rfid.refined_sample
+        active_blood, active_refined = self.__active_samples
+        if blood is None or refined is None or (blood, refined) == self.__active_samples:
+            return
+
+        if blood.rfid_id == active_blood.rfid_id and refined.rfid_id == active_refined.rfid_id:
+            await self.__unreal.update_from_samples(blood, refined)
+            self.__active_samples = (blood, refined)
 
     async def enlisted_mode(self, elapsed: float) -> None:
         await self.maybe_reset(elapsed)
 
+    def __start_pending(self, coroutine) -> None:
+        """
+        Run a backend request as a task that wakes the main loop when it is done.
+
+        The task raises TimeoutError when the request takes longer than the lookup timeout.
+        """
+        self.__cancel_pending()
+        self.__spinner_time = 0.0
+        self.__spinner_frame = -1
+        self.__pending = asyncio.create_task(asyncio.wait_for(coroutine, self.__config.lookup_timeout))
+        self.__pending.add_done_callback(lambda task: self.wake())
+
+    def __cancel_pending(self) -> None:
+        if self.__pending is not None:
+            self.__pending.cancel()
+            self.__pending = None
+
     def on_serial_device_added(self, device):
         if device.device_name == "rotary":
             self.__number_input.set_device(device)
         elif device.device_name.startswith("rfid"):
             self.__rfid.add_device(device)
 
+    def on_serial_data(self, device):
+        self.wake()
+
     def on_serial_device_removed(self, device):
         if device.device_name == "rotary":
             self.__number_input.set_device(None)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python
+"""
+Replay serial recordings made with the serial.record_path setting.
+
+Every log is replayed on its own pseudo terminal, which answers the NAME request with the name
+that was recorded and then sends the recorded lines with their original timing, scaled by
+--speed. A speed of 0 sends everything as fast as possible.
+
+By default links to the terminals are created in --link-dir, like setup_virtual_serial.sh does,
+so a running main.py can pick them up. With --station the station itself is run in this process
+against the replayed devices, the fake Unreal server and a stub backend, and the time from
+sending a line until it was handled by the serial device callbacks (NumberInput and Rfid) and
+until the next main.Main update finished is reported.
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import select
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from aiohttp import web
+
+import krystalium
+import main
+from fakeunreal import FakeUnreal
+from krystalium.recorder import read_log
+from krystalium.stats import Histogram
+
+
+log = logging.getLogger(__name__)
+
+
+class Replay:
+    """
+    Replays a single log on a pseudo terminal.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.name_line = f"name: {path.stem}".encode("utf-8")
+        self.lines: list[tuple[float, bytes]] = []
+
+        for timestamp, line in read_log(path):
+            if line.lower().startswith(b"name:"):
+                self.name_line = line
+            elif line.strip():
+                self.lines.append((timestamp, line))
+
+        self.master, self.slave = os.openpty()
+        self.terminal = Path(os.ttyname(self.slave))
+        # Time each line was written, in time.perf_counter() seconds.
+        self.sent: list[float] = []
+        # How late each line was written compared to its schedule.
+        self.lag = Histogram()
+
+    def run(self, speed: float) -> None:
+        self.__wait_for(b"NAME\n")
+        os.write(self.master, self.name_line + b"\n")
+
+        if not self.lines:
+            return
+
+        first = self.lines[0][0]
+        start = time.perf_counter()
+        for timestamp, line in self.lines:
+            if speed > 0:
+                due = start + (timestamp - first) / speed
+                remain = due - time.perf_counter()
+                if remain > 0:
+                    time.sleep(remain)
+                self.lag.record(max(0.0, time.perf_counter() - due))
+
+            self.sent.append(time.perf_counter())
+            os.write(self.master, line + b"\n")
+
+    def close(self) -> None:
+        os.close(self.master)
+        os.close(self.slave)
+
+    def __wait_for(self, request: bytes) -> None:
+        buffer = b""
+        while request not in buffer:
+            select.select([self.master], [], [])
+            buffer += os.read(self.master, 1024)
+
+
+class StationMain(main.Main):
+    """
+    The station, measuring how long replayed lines take to be handled.
+    """
+
+    def __init__(self, config: main.Config, replays: dict[Path, Replay]) -> None:
+        super().__init__(config)
+        self.replays = replays
+        self.delivered: dict[Path, int] = {}
+        self.pending: list[float] = []
+        self.serial = Histogram()
+        self.main = Histogram()
+
+    def on_serial_data(self, device) -> None:
+        # Called after the device handed its lines to NumberInput or Rfid.
+        now = time.perf_counter()
+        replay = self.replays.get(device.path)
+        if replay is not None:
+            delivered = device.stats()["lines"]
+            for sent in replay.sent[self.delivered.get(device.path, 0):delivered]:
+                self.serial.record(now - sent)
+                self.pending.append(sent)
+            self.delivered[device.path] = delivered
+
+        super().on_serial_data(device)
+
+    async def update(self, elapsed: float) -> None:
+        await super().update(elapsed)
+
+        now = time.perf_counter()
+        for sent in self.pending:
+            self.main.record(now - sent)
+        self.pending.clear()
+
+
+async def not_found(request: web.Request) -> web.Response:
+    return web.Response(status = 404)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def print_histogram(name: str, histogram: Histogram | dict) -> None:
+    """
+    Print a summary of a histogram, or of the result of Histogram.to_dict().
+    """
+    data = histogram.to_dict() if isinstance(histogram, Histogram) else histogram
+    if data["count"] == 0:
+        print(f"{name:>20}: no data")
+        return
+
+    print(f"{name:>20}: n={data['count']:<7} mean={data['mean']:8.3f}ms p50={data['p50']:8.3f}ms p99={data['p99']:8.3f}ms max={data['max']:8.3f}ms")
+
+
+def start_replays(replays: list[Replay], speed: float) -> list[threading.Thread]:
+    threads = [threading.Thread(target = replay.run, args = (speed,), daemon = True) for replay in replays]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+async def run_station(replays: list[Replay], args: argparse.Namespace) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        root = Path(directory)
+        links = {}
+        for replay in replays:
+            link = root / replay.path.stem
+            link.symlink_to(replay.terminal)
+            links[link] = replay
+
+        unreal_port = free_port()
+        unreal = FakeUnreal()
+        await unreal.start("localhost", unreal_port)
+
+        # A backend that knows nothing, unless a real one is given.
+        backend = None
+        api_url = args.api
+        if api_url is None:
+            application = web.Application()
+            application.router.add_route("*", "/{path:.*}", not_found)
+            backend = web.AppRunner(application)
+            await backend.setup()
+            api_port = free_port()
+            await web.TCPSite(backend, "localhost", api_port).start()
+            api_url = f"http://localhost:{api_port}/"
+
+        config = main.Config(
+            api = krystalium.api.Config(url = api_url),
+            unreal = krystalium.unreal.Config(port = unreal_port),
+            serial = krystalium.serialcontroller.Config(root_path = root, patterns = ["*"], by_id_path = None),
+            rfid = krystalium.rfid.Config(lookup = args.api is not None),
+        )
+        station = StationMain(config, links)
+        task = asyncio.create_task(station.run_loop())
+
+        start = time.perf_counter()
+        threads = start_replays(replays, args.speed)
+        total = sum(len(replay.lines) for replay in replays)
+        while any(thread.is_alive() for thread in threads) or sum(station.delivered.values()) < total:
+            await asyncio.sleep(0.01)
+            if time.perf_counter() - start > args.timeout:
+                print(f"Timed out after {args.timeout}s")
+                break
+        duration = time.perf_counter() - start
+
+        station.stop_loop()
+        station.wake()
+        await task
+
+        await unreal.stop()
+        if backend is not None:
+            await backend.cleanup()
+
+    print(f"Replayed {total} lines from {len(replays)} devices in {duration:.2f}s ({total / duration:.0f} lines/s)")
+    for replay in replays:
+        print_histogram(f"{replay.path.stem} lag", replay.lag)
+    print_histogram("serial callbacks", station.serial)
+    print_histogram("main update", station.main)
+    print(f"{'unreal calls':>20}: {len(unreal.records)}")
+
+
+def run_links(replays: list[Replay], args: argparse.Namespace) -> None:
+    args.link_dir.mkdir(parents = True, exist_ok = True)
+    links = []
+    for replay in replays:
+        link = args.link_dir / f"{replay.path.stem}-output"
+        link.unlink(missing_ok = True)
+        link.symlink_to(replay.terminal)
+        links.append(link)
+        print(f"Replaying {replay.path} on {link}")
+
+    try:
+        start = time.perf_counter()
+        for thread in start_replays(replays, args.speed):
+            thread.join()
+        duration = time.perf_counter() - start
+    finally:
+        for link in links:
+            link.unlink(missing_ok = True)
+
+    total = sum(len(replay.lines) for replay in replays)
+    print(f"Replayed {total} lines from {len(replays)} devices in {duration:.2f}s")
+    for replay in replays:
+        print_histogram(f"{replay.path.stem} lag", replay.lag)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level = logging.WARNING)
+
+    parser = argparse.ArgumentParser(description = "Replay serial recordings.")
+    parser.add_argument("logs", type = Path, nargs = "+")
+    parser.add_argument("--speed", type = float, default = 1.0, help = "Replay speed, 0 replays as fast as possible")
+    parser.add_argument("--link-dir", type = Path, default = Path("."), help = "Directory to create links to the replayed devices in")
+    parser.add_argument("--station", action = "store_true", help = "Run the station in this process and report processing latency")
+    parser.add_argument("--api", default = None, help = "Backend to use with --station, by default a stub that knows nothing")
+    parser.add_argument("--timeout", type = float, default = 600.0)
+    args = parser.parse_args()
+
+    replays = [Replay(path) for path in args.logs]
+    try:
+        if args.station:
+            asyncio.run(run_station(replays, args))
+        else:
+            run_links(replays, args)
+    finally:
+        for replay in replays:
+            replay.close()
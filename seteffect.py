@@ -45,6 +45,11 @@ class Main(krystalium.component.MainLoop):
 
         await super().start()
 
+        try:
+            await asyncio.wait_for(self.__unreal.wait_connected(), 10)
+        except asyncio.TimeoutError:
+            pass
+
     async def stop(self):
         await super().stop()
 